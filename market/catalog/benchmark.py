@@ -0,0 +1,341 @@
+import math
+import random
+import subprocess
+import time
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Tuple
+from uuid import uuid4
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models.functions import Length
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from catalog.caching import invalidate_catalog_cache
+from catalog.models import OfferSummary
+from catalog.price_stats import ALL_CATEGORIES, build_price_stats, update_price_stats
+from catalog.summary import refresh_offer_summary
+from catalog.utils import Sorter
+from context_processors.menu_context import invalidate_menu_cache
+from products.models import Category, Manufacturer, Product, Review, Tag
+from products.services.category_services import update_category_paths
+from products.services.review_services import update_review_count
+from products.services.search_services import update_search_vector
+from products.services.tag_services import get_tag_scores, update_tags_leaderboard
+from shops.models import DeliveryMethod, Offer, Shop
+from site_settings.models import SiteSettings
+
+User = get_user_model()
+
+BATCH_SIZE: int = 2000
+
+# Слова названий сгенерированных товаров, по ним же выполняется поиск в сценарии search
+WORDS: Tuple[str, ...] = ("phone", "laptop", "camera", "watch", "speaker", "tablet", "monitor", "keyboard")
+MANUFACTURERS: int = 50
+# Карточка каталога выводит превью товара, файл для замеров не нужен
+PREVIEW: str = "img/benchmark.png"
+
+# Номер страницы сценария deep_page (последняя страница, если страниц меньше)
+DEEP_PAGE: int = 20
+
+PERCENTILES: Tuple[int, ...] = (50, 90, 95, 99)
+
+# Кэш для замеров без кэша: отдельный LocMemCache очищается перед каждым запросом, кэш сайта не затрагивается
+COLD_CACHES: Dict[str, Any] = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "catalog-benchmark"}
+}
+CACHE_MODES: Tuple[str, ...] = ("cold", "warm")
+
+
+def create_categories(prefix: str, depth: int, branching: int) -> List[Category]:
+    """Дерево категорий глубины depth, у каждой категории branching потомков. Возвращаются листья"""
+    level: List[Category | None] = [None]
+
+    for number in range(depth):
+        level = Category.objects.bulk_create(
+            [
+                Category(name=f"{prefix} category {number}-{index}", parent=parent)
+                for index, parent in enumerate(parent for parent in level for _ in range(branching))
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+    # пути категорий, созданных без Category.save
+    update_category_paths()
+
+    return level
+
+
+def seed_catalog(
+    products: int = 10000,
+    shops: int = 50,
+    offers: int = 3,
+    depth: int = 4,
+    branching: int = 4,
+    tags: int = 200,
+    tags_per_product: int = 3,
+    reviews: int = 2,
+    random_seed: int = 0,
+) -> Dict[str, int]:
+    """
+    Создание большого каталога для замеров: магазины, дерево категорий, товары в листовых категориях,
+    предложения нескольких магазинов на товар, теги (частота по закону Ципфа) и отзывы.
+    Объекты создаются пакетно без сигналов, затем пересчитываются пути, отзывы, поисковые векторы и сводки.
+    Названия уникальны для каждого запуска, поэтому каталог можно дополнять повторными запусками.
+    :return: количество созданных объектов по типам
+    """
+    rng = random.Random(random_seed)
+    token = uuid4().hex[:8]
+    prefix = f"bench {token}"
+
+    with transaction.atomic():
+        users = User.objects.bulk_create(
+            [User(username=f"{prefix} user {n}", email=f"bench-{token}-{n}@example.com") for n in range(shops)]
+        )
+        shop_list = Shop.objects.bulk_create(
+            [Shop(user=user, name=f"{prefix} shop {n}") for n, user in enumerate(users)]
+        )
+        manufacturers = Manufacturer.objects.bulk_create(
+            [Manufacturer(name=f"{prefix} manufacturer {n}") for n in range(MANUFACTURERS)]
+        )
+        leaves = create_categories(prefix, depth, branching)
+        tag_list = Tag.objects.bulk_create([Tag(name=f"{prefix} tag {n}") for n in range(tags)])
+
+        product_list = Product.objects.bulk_create(
+            [
+                Product(
+                    name=f"{rng.choice(WORDS)} {rng.choice(WORDS)} {prefix} product {n}",
+                    about=" ".join(rng.choices(WORDS, k=5)),
+                    manufacturer=rng.choice(manufacturers),
+                    category=rng.choice(leaves),
+                    popularity=rng.randint(0, 1000),
+                    preview=PREVIEW,
+                )
+                for n in range(products)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+        weights = [1 / (rank + 1) for rank in range(len(tag_list))]
+        product_tags = []
+        for product in product_list if tag_list else []:
+            for tag in set(rng.choices(tag_list, weights=weights, k=tags_per_product)):
+                product_tags.append(Product.tags.through(product=product, tag=tag))
+        Product.tags.through.objects.bulk_create(product_tags, batch_size=BATCH_SIZE)
+
+        offer_list = [
+            Offer(
+                shop=shop,
+                product=product,
+                price=Decimal(str(round(min(rng.lognormvariate(8, 1.5), 500000) + 1, 2))),
+                # около 5% предложений без остатка не выводятся в каталоге
+                remains=0 if rng.random() < 0.05 else rng.randint(1, 100),
+                delivery_method=rng.choice(DeliveryMethod.values),
+            )
+            for product in product_list
+            for shop in rng.sample(shop_list, min(offers, len(shop_list)))
+        ]
+        Offer.objects.bulk_create(offer_list, batch_size=BATCH_SIZE)
+
+        review_list = [
+            Review(user=rng.choice(users), product=product, review_content="review", is_published=rng.random() < 0.8)
+            for product in product_list
+            for _ in range(rng.randint(0, 2 * reviews))
+        ]
+        Review.objects.bulk_create(review_list, batch_size=BATCH_SIZE)
+
+    update_review_count([product.pk for product in product_list])
+    update_search_vector([product.pk for product in product_list])
+    refresh_offer_summary()
+    update_price_stats()
+    update_tags_leaderboard()
+    invalidate_menu_cache()
+    invalidate_catalog_cache()
+
+    return {
+        "shops": len(shop_list),
+        "categories": Category.objects.filter(name__startswith=prefix).count(),
+        "tags": len(tag_list),
+        "products": len(product_list),
+        "offers": len(offer_list),
+        "reviews": len(review_list),
+    }
+
+
+def get_scenarios() -> List[Tuple[str, Dict[str, str]]]:
+    """
+    Сценарии замеров: каждый тип сортировки в обоих направлениях и распространенные комбинации фильтров.
+    Значения фильтров берутся из текущего каталога, сценарии без подходящих данных пропускаются.
+    """
+    scenarios: List[Tuple[str, Dict[str, str]]] = [("default", {})]
+
+    for sort in Sorter.sort_types:
+        scenarios.append((f"sort={sort}", {"sort": sort}))
+        scenarios.append((f"sort={sort}&desc=on", {"sort": sort, "desc": "on"}))
+
+    root = Category.objects.filter(parent=None, is_active=True, archived=False).order_by("pk").first()
+    leaf = Category.objects.filter(is_active=True, archived=False).order_by(Length("path").desc(), "pk").first()
+    # теги и статистика цен рассчитываются по БД: в режиме без кэша рейтинга тегов и статистики в кэше нет
+    scores = get_tag_scores()
+    tags = sorted(scores, key=lambda pk: (-scores[pk], pk))[:2]
+    stats = build_price_stats().get(ALL_CATEGORIES)
+
+    if root:
+        scenarios.append(("category_root", {"category_id": str(root.pk)}))
+    if leaf and leaf != root:
+        scenarios.append(("category_leaf", {"category_id": str(leaf.pk)}))
+    if stats:
+        stop = stats["min"] + (stats["max"] - stats["min"]) / 10
+        scenarios.append(("price", {"price": f"{stats['min']};{stop:.2f}"}))
+    if tags:
+        scenarios.append(("tag", {"tag_id": str(tags[0])}))
+    if len(tags) > 1:
+        tag_id = f"{tags[0]},{tags[1]}"
+        scenarios.append(("tags_all", {"tag_id": tag_id}))
+        scenarios.append(("tags_any", {"tag_id": tag_id, "tag_op": "or"}))
+
+    scenarios.append(("free_delivery", {"free_delivery": "on"}))
+    scenarios.append(("search", {"search": WORDS[2]}))
+    scenarios.append(("title", {"title": WORDS[3]}))
+
+    pages = math.ceil(OfferSummary.objects.filter(remains__gt=0).count() / SiteSettings.load().paginate_by)
+    if pages > 1:
+        scenarios.append(("deep_page", {"page": str(min(pages, DEEP_PAGE))}))
+
+    if root and stats:
+        combined = {"category_id": str(root.pk), "price": f"{stats['min']};{stats['max']}", "free_delivery": "on"}
+        scenarios.append(("combined", {**combined, "sort": "price"}))
+
+    return scenarios
+
+
+def percentile(values: List[float], percent: int) -> float:
+    """Процентиль методом ближайшего ранга"""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(percent / 100 * len(ordered)) - 1, 0)]
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    result = {f"p{percent}": round(percentile(values, percent), 3) for percent in PERCENTILES}
+    result.update(mean=round(sum(values) / len(values), 3), min=round(min(values), 3), max=round(max(values), 3))
+    return result
+
+
+def get_client() -> Client:
+    """Клиент анонимного посетителя с хостом из ALLOWED_HOSTS"""
+    hosts = [host.lstrip(".") for host in settings.ALLOWED_HOSTS if host and host != "*"]
+    return Client(HTTP_HOST=hosts[0] if hosts else "testserver")
+
+
+def measure(client: Client, params: Dict[str, str], repeat: int, cold: bool) -> Dict[str, Any]:
+    """
+    Замер страницы каталога: repeat запросов, время ответа (мс) и количество SQL запросов.
+    Без кэша (cold) кэш очищается перед каждым запросом, с кэшем (warm) первый запрос не учитывается.
+    """
+    path = reverse("catalog:index")
+    timings, queries, statuses = [], [], set()
+
+    if not cold:
+        client.get(path, params)
+
+    for _ in range(repeat):
+        if cold:
+            cache.clear()
+
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            response = client.get(path, params)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        queries.append(len(context.captured_queries))
+        statuses.add(response.status_code)
+
+    return {
+        "status": sorted(statuses),
+        "latency_ms": summarize(timings),
+        "queries": {"min": min(queries), "max": max(queries), "p50": percentile(queries, 50)},
+    }
+
+
+def get_commit() -> str | None:
+    """Текущий коммит git, если проект в репозитории"""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=5
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+    if result.returncode != 0:
+        return None
+
+    return result.stdout.strip() or None
+
+
+def run_benchmark(repeat: int = 20, modes: Iterable[str] = CACHE_MODES) -> Dict[str, Any]:
+    """
+    Замеры страницы каталога по всем сценариям get_scenarios для режимов кэша modes.
+    Статистика запросов каталога (catalog.instrumentation) на время замеров отключается.
+    :return: результат для сохранения в JSON
+    """
+    client = get_client()
+    results = []
+
+    with override_settings(CATALOG_INSTRUMENTATION=False):
+        for mode in modes:
+            caches = COLD_CACHES if mode == "cold" else settings.CACHES
+
+            with override_settings(CACHES=caches):
+                for name, params in get_scenarios():
+                    results.append(
+                        {
+                            "scenario": name,
+                            "cache": mode,
+                            "params": params,
+                            **measure(client, params, repeat, mode == "cold"),
+                        }
+                    )
+
+    return {
+        "created_at": timezone.now().isoformat(),
+        "commit": get_commit(),
+        "database": connection.vendor,
+        "repeat": repeat,
+        "catalog": {
+            "offers": OfferSummary.objects.count(),
+            "products": Product.objects.count(),
+            "categories": Category.objects.count(),
+            "tags": Tag.objects.count(),
+            "shops": Shop.objects.count(),
+        },
+        "results": results,
+    }
+
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Сравнение двух результатов: отношение медианы времени и разница количества запросов по сценариям"""
+    baseline = {(item["scenario"], item["cache"]): item for item in previous["results"]}
+    rows = []
+
+    for item in current["results"]:
+        base = baseline.get((item["scenario"], item["cache"]))
+        if base is None:
+            continue
+
+        base_p50, p50 = base["latency_ms"]["p50"], item["latency_ms"]["p50"]
+        rows.append(
+            {
+                "scenario": item["scenario"],
+                "cache": item["cache"],
+                "p50_ms": (base_p50, p50),
+                "ratio": round(p50 / base_p50, 2) if base_p50 else None,
+                "queries": item["queries"]["max"] - base["queries"]["max"],
+            }
+        )
+
+    return rows
@@ -0,0 +1,48 @@
+import time
+
+from django.core.cache import cache
+
+from catalog.utils import Params
+
+
+VERSION_CACHE_KEY = "catalog_cache_version"
+
+
+def get_catalog_version() -> int:
+    """
+    Текущая версия кэша каталога, входит в ключи кэшированных страниц, фасетов и количества товаров.
+    Начальная версия берется от времени, чтобы после вытеснения ключа версии из кэша
+    не вернуться к версии уже существующих записей.
+    """
+    version = cache.get(VERSION_CACHE_KEY)
+
+    if version is None:
+        cache.add(VERSION_CACHE_KEY, int(time.time() * 1000), timeout=None)
+        version = cache.get(VERSION_CACHE_KEY)
+
+    return version
+
+
+def invalidate_catalog_cache() -> None:
+    """Сброс кэша каталога сменой версии, записи прежней версии вытесняются по таймауту"""
+    try:
+        cache.incr(VERSION_CACHE_KEY)
+    except ValueError:
+        get_catalog_version()
+
+
+def get_catalog_cache_key(prefix: str, params: Params, keys=None) -> str:
+    """Ключ кэша каталога для нормализованных параметров с учетом версии"""
+    return params.cache_key(prefix, keys, version=get_catalog_version())
+
+
+# Параметры URL фильтра каталога
+FILTER_PARAMS = ("category_id", "tag_id", "tag_op", "price", "free_delivery", "remains", "search", "title")
+
+# Параметры URL, от которых зависит список товаров страницы каталога
+PAGE_PARAMS = FILTER_PARAMS + ("sort", "desc", "page", "after", "before")
+PAGE_CACHE_PREFIX = "catalog_page"
+PAGE_CACHE_TIMEOUT = 60 * 5
+
+# Заполнитель CSRF токена в кэшированном фрагменте, заменяется токеном текущего запроса
+CSRF_PLACEHOLDER = "__catalog_csrf_token__"
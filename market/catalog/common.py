@@ -1,9 +1,7 @@
-import random
-
 from typing import List, Tuple
 
-from django.core.cache import cache
 from products.models import Tag
+from products.services.tag_services import get_top_tags
 
 
 def parse_price(price: str | None = None) -> Tuple[float, float] | None:
@@ -24,23 +22,22 @@ def parse_price(price: str | None = None) -> Tuple[float, float] | None:
         return
 
 
-def get_famous_tags(count: int = 6) -> List[Tag]:  # fix: сортировка по популярности
-    """Функция получения популярных тегов"""
-    cache_key = "famous_tags"
-    famous_tags = cache.get(cache_key)
+# Максимальное количество тегов в фильтре каталога, остальные теги запроса отбрасываются
+MAX_TAG_IDS: int = 20
+
 
-    if famous_tags is None:
-        famous_tags = list(Tag.objects.order_by("pk"))
-        cache.set(cache_key, famous_tags)
+def parse_tag_ids(tag_id: str | None = None) -> List[int]:
+    """
+    Функция преобразования тегов из строки "1,2,3" в отсортированный список уникальных идентификаторов
+    (не более MAX_TAG_IDS)
+    """
 
-    tags = []
+    if not tag_id:
+        return []
 
-    for _ in range(count):
-        if not famous_tags:
-            break
+    return sorted({int(value) for value in str(tag_id).split(",") if value.strip().isdigit()})[:MAX_TAG_IDS]
 
-        tag = random.choice(famous_tags)
-        tags.append(tag)
-        famous_tags.remove(tag)
 
-    return tags
+def get_famous_tags(count: int = 6) -> List[Tag]:
+    """Функция получения популярных тегов из рейтинга тегов (products.services.tag_services)"""
+    return get_top_tags(count)
@@ -1,8 +1,11 @@
-from typing import Any, Dict, Generator
+import math
+from typing import Any, Dict, Generator, List, Tuple
 
 from django.http import HttpRequest
 
 from catalog.common import get_famous_tags, parse_price
+from catalog.facets import get_facets
+from catalog.price_stats import get_price_stats
 from catalog.utils import Params, Sorter, Filter
 from context_processors.menu_context import get_categories_list
 from products.models import Category
@@ -46,6 +49,8 @@ class CatalogContextProcessor:
             sort_items - Generator[Tuple[str, str], None, None]\n
             default_price_from - Float\n
             default_price_to - Float\n
+            price_min - Float\n
+            price_max - Float\n
         Optional context keys:
             filter_params - Params\n
             current_category - Category\n
@@ -91,6 +96,32 @@ class CatalogContextProcessor:
         """
         self.context["pagination_range"] = self.__get_pagination_range()
 
+    def set_facets_context(self) -> None:
+        """
+        Назначение счетчиков предложений по значениям фильтров
+        Context keys:
+            facets - Dict[str, Any]\n
+            category_facets - List[Tuple[Category, int]]
+        """
+        facets = get_facets(self.__params)
+
+        self.context["facets"] = facets
+        self.context["category_facets"] = self.__get_category_facets(facets["categories"])
+
+    def __get_category_facets(self, counts: Dict[int, int]) -> List[Tuple[Category, int]]:
+        """Подкатегории текущей категории (корневые категории, если она не выбрана) с предложениями"""
+        category_id = self.__params.get("category_id")
+        result = []
+
+        for category in get_categories_list(self.request):
+            if str(category.parent_id) == str(category_id) or (not category_id and category.parent_id is None):
+                count = counts.get(category.pk, 0)
+
+                if count:
+                    result.append((category, count))
+
+        return result
+
     def __set_tags_context(self) -> None:
         """
         Назначение тегов
@@ -99,10 +130,14 @@ class CatalogContextProcessor:
             tag_params - Params
         """
         tag_id = self.__params.get("tag_id")
+        tag_op = self.__params.get("tag_op")
 
         self.context["famous_tags"] = get_famous_tags(6)
         self.context["tag_params"] = Params(tag_id=tag_id) if tag_id else Params()
 
+        if tag_id and tag_op:
+            self.context["tag_params"].update({"tag_op": tag_op})
+
     def __set_category_context(self) -> None:
         """
         Назначение категорий
@@ -153,10 +188,13 @@ class CatalogContextProcessor:
 
     def __set_price_context(self) -> None:
         """
-        Назначение цены
+        Назначение цены. Границы слайдера - минимальная и максимальная цена предложений текущей категории
+        из статистики цен, если предложений нет - цены по умолчанию из настроек сайта.
         Context keys:
             default_price_from - Float\n
             default_price_to - Float\n
+            price_min - Float\n
+            price_max - Float\n
         Optional context keys:
             start_price - Float\n
             stop_price - Float
@@ -167,8 +205,17 @@ class CatalogContextProcessor:
             self.context["start_price"] = prices[0]
             self.context["stop_price"] = prices[1]
 
-        self.context["default_price_from"] = self.site_settings.default_price_from
-        self.context["default_price_to"] = self.site_settings.default_price_to
+        stats = get_price_stats(self.__params.get("category_id"))
+
+        if stats:
+            price_min, price_max = math.floor(stats["min"]), math.ceil(stats["max"])
+        else:
+            price_min, price_max = self.site_settings.default_price_from, self.site_settings.default_price_to
+
+        self.context["price_min"] = price_min
+        self.context["price_max"] = price_max
+        self.context["default_price_from"] = price_min
+        self.context["default_price_to"] = price_max
 
     def set_filter_context(self, data: Dict[str, Any] | None = None) -> None:
         """
@@ -206,7 +253,8 @@ class CatalogContextProcessor:
 
     def __get_pagination_range(self) -> Generator[str, None, None]:
         """Получение диапазона пагинатора"""
-        page_number = self.request.GET.get("page")
+        page_obj = self.context.get("page_obj")
+        page_number = page_obj.number if page_obj else self.request.GET.get("page")
 
         if not page_number:
             page_number = 1
@@ -0,0 +1,166 @@
+from decimal import Decimal
+from typing import Any, Dict, List
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, Q, QuerySet
+
+from catalog.caching import FILTER_PARAMS, get_catalog_cache_key
+from catalog.common import parse_price
+from catalog.models import OfferSummary
+from catalog.price_stats import get_price_stats, get_range_count, is_price_stats_built
+from catalog.utils import Filter, Params
+from products.models import CATEGORY_PATH_SEPARATOR
+from shops.models import DeliveryMethod
+
+
+# Параметры URL, от которых зависят счетчики фасетов (сортировка и страница не влияют)
+FACET_PARAMS = FILTER_PARAMS
+
+# Границы ценовых диапазонов, последний диапазон не ограничен сверху.
+# Границы должны совпадать с границами столбцов гистограммы цен (catalog.price_stats.HISTOGRAM_EDGES)
+PRICE_BUCKETS = (0, 1000, 5000, 10000, 50000, 100000)
+MAX_PRICE = Decimal("99999999.99")
+
+FACETS_CACHE_PREFIX = "catalog_facets"
+FACETS_CACHE_TIMEOUT = 60 * 5
+
+
+def get_base_queryset(params: Params, *exclude: str) -> QuerySet:
+    """
+    Предложения каталога с остатком, отфильтрованные по параметрам без exclude.
+    Фильтр самого фасета не применяется, иначе в фасете осталось бы только выбранное значение.
+    """
+    filter_ = Filter(Params(**{key: value for key, value in params.to_dict().items() if key not in exclude}))
+
+    queryset = OfferSummary.objects.filter(remains__gt=0)
+    queryset = filter_.filter_offer(queryset)
+    queryset = filter_.filter_category(queryset)
+    queryset = filter_.filter_tags(queryset)
+    return filter_.filter_prodict(queryset).order_by()
+
+
+def get_tag_counts(queryset: QuerySet) -> Dict[int, int]:
+    """Количество предложений по тегам одним запросом: массивы тегов сводок разворачиваются unnest без M2M"""
+    sql, params = queryset.values("tag_ids").query.sql_with_params()
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT tag, COUNT(*) FROM ({sql}) AS offers, unnest(offers.tag_ids) AS tag GROUP BY tag", params
+        )
+        return dict(cursor.fetchall())
+
+
+def get_category_counts(params: Params) -> Dict[int, int]:
+    """
+    Количество предложений по категориям.
+    Для родительских категорий учитываются предложения всех потомков, как в Filter.filter_category.
+    """
+    rows = get_base_queryset(params, "category_id").values("category", "category_path")
+    counts: Dict[int, int] = {}
+
+    for row in rows.annotate(count=Count("pk")):
+        # путь категории содержит pk всех её родителей и её собственный
+        path = row["category_path"].strip(CATEGORY_PATH_SEPARATOR)
+        pks = [int(pk) for pk in path.split(CATEGORY_PATH_SEPARATOR)] if path else [row["category"]]
+
+        for pk in pks:
+            counts[pk] = counts.get(pk, 0) + row["count"]
+
+    return counts
+
+
+def get_price_ranges() -> List[Dict[str, Any]]:
+    """Ценовые диапазоны фасета и значения параметра price для них"""
+    ranges = []
+    edges = PRICE_BUCKETS + (None,)
+
+    for start, stop in zip(edges, edges[1:]):
+        stop_value = MAX_PRICE if stop is None else Decimal(stop) - Decimal("0.01")
+        ranges.append({"from": start, "to": stop, "value": f"{start};{stop_value}"})
+
+    return ranges
+
+
+def get_precomputed_counts(params: Params) -> Dict[str, Any] | None:
+    """
+    Количество предложений по способам доставки и ценовым диапазонам из статистики цен категории
+    (catalog.price_stats) без запроса к предложениям. Возможно, только если кроме категории фильтры не заданы
+    и статистика уже рассчитана.
+    """
+    if any(params.get(key) for key in FACET_PARAMS if key != "category_id"):
+        return None
+
+    if not is_price_stats_built():
+        return None
+
+    stats = get_price_stats(params.get("category_id")) or {"count": 0, "delivery": {}, "buckets": {}}
+
+    return {
+        "total": stats["count"],
+        "delivery": {method: stats["delivery"].get(method, 0) for method in DeliveryMethod.values},
+        "prices": [
+            dict(price_range, count=get_range_count(stats, price_range["from"], price_range["to"]))
+            for price_range in get_price_ranges()
+        ],
+    }
+
+
+def get_offer_counts(params: Params) -> Dict[str, Any]:
+    """
+    Количество предложений по способам доставки и ценовым диапазонам одним запросом.
+    Запрос строится без фильтров цены и доставки, они применяются в условиях агрегатов:
+    счетчики доставки учитывают выбранную цену, счетчики цены - выбранную доставку.
+    Без фильтров счетчики берутся из статистики цен.
+    """
+    counts = get_precomputed_counts(params)
+
+    if counts is not None:
+        return counts
+
+    price_q = Q()
+    prices = parse_price(params.get("price"))
+
+    if prices:
+        price_q = Q(price__range=prices)
+
+    delivery_q = Q(delivery_method=DeliveryMethod.FREE) if params.get("free_delivery") else Q()
+    ranges = get_price_ranges()
+
+    aggregates = {"total": Count("pk", filter=price_q & delivery_q)}
+
+    for method in DeliveryMethod.values:
+        aggregates[f"delivery_{method}"] = Count("pk", filter=price_q & Q(delivery_method=method))
+
+    for number, price_range in enumerate(ranges):
+        range_q = Q(price__gte=price_range["from"])
+        if price_range["to"] is not None:
+            range_q &= Q(price__lt=price_range["to"])
+        aggregates[f"price_{number}"] = Count("pk", filter=delivery_q & range_q)
+
+    result = get_base_queryset(params, "price", "free_delivery").aggregate(**aggregates)
+
+    return {
+        "total": result["total"],
+        "delivery": {method: result[f"delivery_{method}"] for method in DeliveryMethod.values},
+        "prices": [dict(price_range, count=result[f"price_{n}"]) for n, price_range in enumerate(ranges)],
+    }
+
+
+def get_facets(params: Params) -> Dict[str, Any]:
+    """
+    Счетчики предложений каталога по категориям, тегам, способам доставки и ценовым диапазонам
+    для текущего состояния фильтра. Один сгруппированный запрос на фасет вместо COUNT на каждое
+    значение, результат кэшируется по нормализованным параметрам.
+    :return: словарь с ключами total, categories, tags, delivery и prices
+    """
+    cache_key = get_catalog_cache_key(FACETS_CACHE_PREFIX, params, FACET_PARAMS)
+    facets = cache.get(cache_key)
+
+    if facets is None:
+        facets = get_offer_counts(params)
+        facets["categories"] = get_category_counts(params)
+        facets["tags"] = get_tag_counts(get_base_queryset(params, "tag_id", "tag_op"))
+        cache.set(cache_key, facets, timeout=FACETS_CACHE_TIMEOUT)
+
+    return facets
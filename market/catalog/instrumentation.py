@@ -0,0 +1,201 @@
+import json
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Any, Dict, Iterator, List
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.template.response import TemplateResponse
+from django.utils import timezone
+
+from catalog.caching import PAGE_PARAMS
+from catalog.common import parse_tag_ids
+from catalog.utils import Params
+from products.services.tag_services import get_redis
+
+
+STATS_CACHE_KEY: str = "catalog_stats:{hour}"
+
+# Статистика хранится по часам, в отчет попадают последние WINDOW_HOURS часов
+WINDOW_HOURS: int = 24
+
+# Накапливаемые показатели: количество запросов страницы, SQL запросов, время БД, рендеринга и общее (мс)
+METRICS = ("count", "sql", "db", "render", "time")
+
+
+class QueryStats:
+    """Обертка выполнения SQL запросов (connection.execute_wrapper): количество запросов и время БД"""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.time += time.perf_counter() - start
+
+
+class Measurement:
+    """
+    Показатели одного запроса страницы каталога: SQL запросы и время обработки во view и при рендеринге шаблона.
+    Отключается настройкой CATALOG_INSTRUMENTATION.
+    """
+
+    def __init__(self, params: Params) -> None:
+        self.params = params
+        self.queries = QueryStats()
+        self.times = {"view": 0.0, "render": 0.0}
+        self.enabled = getattr(settings, "CATALOG_INSTRUMENTATION", True)
+
+    @contextmanager
+    def measure(self, part: str) -> Iterator[None]:
+        """Учет SQL запросов и времени части обработки запроса (view или render)"""
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+
+        try:
+            with connection.execute_wrapper(self.queries):
+                yield
+        finally:
+            self.times[part] += time.perf_counter() - start
+
+    def save(self) -> None:
+        """Добавление показателей в статистику сигнатуры параметров"""
+        if not self.enabled:
+            return
+
+        values = {
+            "count": 1,
+            "sql": self.queries.count,
+            "db": self.queries.time * 1000,
+            "render": self.times["render"] * 1000,
+            "time": (self.times["view"] + self.times["render"]) * 1000,
+        }
+        record(get_signature(self.params), self.params.normalize(PAGE_PARAMS), values)
+
+
+class InstrumentedTemplateResponse(TemplateResponse):
+    """Ответ, который учитывает рендеринг шаблона в показателях запроса и сохраняет их после рендеринга"""
+
+    measurement: Measurement | None = None
+
+    @property
+    def rendered_content(self) -> str:
+        if self.measurement is None:
+            return super().rendered_content
+
+        with self.measurement.measure("render"):
+            content = super().rendered_content
+
+        self.measurement.save()
+
+        return content
+
+
+def get_signature(params: Params) -> str:
+    """
+    Нормализованная сигнатура параметров каталога: набор заданных фильтров без значений,
+    количество тегов, сортировка и режим пагинации. Запросы с одной сигнатурой строятся одинаково.
+    """
+    params = params.normalize(PAGE_PARAMS).to_dict()
+    parts = []
+
+    for key in sorted(params):
+        if key == "tag_id":
+            parts.append(f"tag_id:{len(parse_tag_ids(params[key]))}")
+        elif key in ("sort", "desc", "tag_op"):
+            parts.append(f"{key}={params[key]}")
+        elif key in ("after", "before"):
+            parts.append("keyset")
+        elif key != "page" or params[key] != "1":
+            parts.append(key)
+
+    return "&".join(parts) or "-"
+
+
+def get_hours(hours: int) -> List[str]:
+    """Ключи часов статистики, начиная с текущего"""
+    now = timezone.now()
+    return [(now - timedelta(hours=offset)).strftime("%Y%m%d%H") for offset in range(hours)]
+
+
+def record(signature: str, sample: Params, values: Dict[str, float]) -> None:
+    """
+    Добавление показателей запроса в статистику текущего часа.
+    В Redis статистика часа - хеш с полями "сигнатура показатель", значения увеличиваются атомарно.
+    Для других кэшей статистика часа хранится словарем.
+    """
+    cache_key = STATS_CACHE_KEY.format(hour=get_hours(1)[0])
+    timeout = WINDOW_HOURS * 60 * 60
+    redis = get_redis()
+
+    if redis is None:
+        stats = cache.get(cache_key) or {}
+        item = stats.setdefault(signature, dict.fromkeys(METRICS, 0))
+        for metric, value in values.items():
+            item[metric] += value
+        item["sample"] = sample.to_dict()
+        cache.set(cache_key, stats, timeout=timeout)
+        return
+
+    key = cache.make_key(cache_key)
+    pipeline = redis.pipeline(transaction=False)
+    for metric, value in values.items():
+        pipeline.hincrbyfloat(key, f"{signature} {metric}", value)
+    pipeline.hset(key, f"{signature} sample", json.dumps(sample.to_dict()))
+    pipeline.expire(key, timeout)
+    pipeline.execute()
+
+
+def load_hour(cache_key: str, redis) -> Dict[str, Dict[str, Any]]:
+    """Статистика часа: словарь сигнатура - показатели"""
+    if redis is None:
+        return cache.get(cache_key) or {}
+
+    stats: Dict[str, Dict[str, Any]] = {}
+
+    for field, value in redis.hgetall(cache.make_key(cache_key)).items():
+        signature, metric = field.decode().rsplit(" ", 1)
+        stats.setdefault(signature, {})[metric] = json.loads(value) if metric == "sample" else float(value)
+
+    return stats
+
+
+def get_report(hours: int = WINDOW_HOURS, limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    Самые медленные сигнатуры параметров каталога за последние hours часов
+    по среднему времени обработки запроса страницы.
+    :return: список словарей с сигнатурой, количеством запросов, средними показателями и примером параметров
+    """
+    redis = get_redis()
+    totals: Dict[str, Dict[str, Any]] = {}
+
+    # часы просматриваются от старых к новым, поэтому пример параметров - из последнего запроса
+    for hour in reversed(get_hours(hours)):
+        for signature, item in load_hour(STATS_CACHE_KEY.format(hour=hour), redis).items():
+            total = totals.setdefault(signature, dict.fromkeys(METRICS, 0))
+            for metric in METRICS:
+                total[metric] += item.get(metric, 0)
+            total["sample"] = item.get("sample", total.get("sample"))
+
+    report = []
+
+    for signature, total in totals.items():
+        count = total["count"] or 1
+        averages = {metric: total[metric] / count for metric in METRICS if metric != "count"}
+        report.append({"signature": signature, "count": int(total["count"]), "sample": total["sample"], **averages})
+
+    report.sort(key=lambda item: item["time"], reverse=True)
+    del report[limit:]
+
+    return report
@@ -0,0 +1,73 @@
+import json
+
+from django.core.management import BaseCommand, CommandError
+
+from catalog.benchmark import CACHE_MODES, compare, run_benchmark, seed_catalog
+
+
+class Command(BaseCommand):
+    """
+    Команда замера страницы каталога: время ответа по процентилям и количество SQL запросов
+    для всех типов сортировки и распространенных фильтров. Результат сохраняется в JSON для сравнения коммитов.
+    Каталог для замеров создается опцией --seed, ее следует запускать только на отдельной базе.
+    """
+
+    help = "Benchmarks the catalog listing for every sort type and common filters and writes the results as JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", default="catalog_benchmark.json", help="JSON file for the results")
+        parser.add_argument("--compare", help="Previous JSON results to compare with")
+        parser.add_argument("--repeat", type=int, default=20, help="Requests per scenario")
+        parser.add_argument("--cache", choices=CACHE_MODES, help="Measure only with cold or warm cache")
+        parser.add_argument("--seed", action="store_true", help="Generate a large catalogue before measuring")
+        parser.add_argument("--products", type=int, default=10000)
+        parser.add_argument("--shops", type=int, default=50)
+        parser.add_argument("--offers", type=int, default=3, help="Offers per product")
+        parser.add_argument("--depth", type=int, default=4, help="Category tree depth")
+        parser.add_argument("--branching", type=int, default=4, help="Subcategories per category")
+        parser.add_argument("--tags", type=int, default=200)
+        parser.add_argument("--reviews", type=int, default=2, help="Average reviews per product")
+        parser.add_argument("--random-seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        if options["repeat"] < 1 or options["depth"] < 1 or options["branching"] < 1:
+            raise CommandError("--repeat, --depth and --branching must be positive")
+
+        if options["seed"]:
+            created = seed_catalog(
+                products=options["products"],
+                shops=options["shops"],
+                offers=options["offers"],
+                depth=options["depth"],
+                branching=options["branching"],
+                tags=options["tags"],
+                reviews=options["reviews"],
+                random_seed=options["random_seed"],
+            )
+            self.stdout.write("Создано: %s" % ", ".join("%s %d" % item for item in created.items()))
+
+        modes = [options["cache"]] if options["cache"] else CACHE_MODES
+        result = run_benchmark(repeat=options["repeat"], modes=modes)
+
+        with open(options["output"], "w", encoding="utf-8") as file:
+            json.dump(result, file, ensure_ascii=False, indent=2)
+
+        for item in result["results"]:
+            latency, queries = item["latency_ms"], item["queries"]
+            self.stdout.write(
+                "%-24s %-5s p50 %8.1f мс  p95 %8.1f мс  SQL %d-%d"
+                % (item["scenario"], item["cache"], latency["p50"], latency["p95"], queries["min"], queries["max"])
+            )
+
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as file:
+                previous = json.load(file)
+
+            self.stdout.write("Сравнение с %s (%s):" % (options["compare"], previous.get("commit") or "-"))
+            for row in compare(previous, result):
+                self.stdout.write(
+                    "%-24s %-5s p50 %8.1f -> %8.1f мс (x%s)  SQL %+d"
+                    % (row["scenario"], row["cache"], *row["p50_ms"], row["ratio"], row["queries"])
+                )
+
+        self.stdout.write("Результаты сохранены в %s" % options["output"])
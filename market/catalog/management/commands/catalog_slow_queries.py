@@ -0,0 +1,59 @@
+from typing import Dict
+from urllib.parse import urlencode
+
+from django.core.management import BaseCommand
+from django.http import HttpRequest, QueryDict
+
+from catalog.instrumentation import WINDOW_HOURS, get_report
+from catalog.views import CatalogListView
+
+
+class Command(BaseCommand):
+    """
+    Команда вывода самых медленных сигнатур параметров каталога и планов их запросов.
+    """
+
+    help = "Lists the slowest catalog filter signatures recorded by catalog.instrumentation with EXPLAIN plans."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=WINDOW_HOURS, help="Report period in hours")
+        parser.add_argument("--limit", type=int, default=10, help="Number of signatures")
+        parser.add_argument("--explain", action="store_true", help="Print EXPLAIN of the listing query")
+        parser.add_argument("--analyze", action="store_true", help="Print EXPLAIN ANALYZE (executes the query)")
+
+    def handle(self, *args, **options):
+        report = get_report(hours=options["hours"], limit=options["limit"])
+
+        if not report:
+            self.stdout.write("Статистика запросов каталога пуста")
+            return
+
+        for number, item in enumerate(report, 1):
+            self.stdout.write(
+                "%d. %s: запросов %d, SQL %.1f, БД %.1f мс, рендеринг %.1f мс, всего %.1f мс"
+                % (number, item["signature"], item["count"], item["sql"], item["db"], item["render"], item["time"])
+            )
+            self.stdout.write("   Пример: %s" % (urlencode(item["sample"]) or "-"))
+
+            if options["explain"] or options["analyze"]:
+                self.stdout.write(self.explain(item["sample"], analyze=options["analyze"]))
+
+    def explain(self, sample: Dict[str, str], analyze: bool = False) -> str:
+        """План запроса списка каталога для параметров sample (страница по номеру, без keyset)"""
+        request = HttpRequest()
+        request.GET = QueryDict(urlencode(sample))
+
+        view = CatalogListView()
+        view.setup(request)
+        queryset = view.get_queryset()
+        per_page = view.get_paginate_by(queryset)
+
+        try:
+            page = max(int(sample.get("page", 1)), 1)
+        except ValueError:
+            page = 1
+
+        start = (page - 1) * per_page
+        stop = start + per_page
+
+        return queryset[start:stop].explain(analyze=analyze)
@@ -0,0 +1,15 @@
+from django.core.management import BaseCommand
+
+from catalog.summary import refresh_offer_summary
+
+
+class Command(BaseCommand):
+    """
+    Команда полного пересчета сводок предложений каталога.
+    """
+
+    help = "Rebuilds catalog.OfferSummary rows used by the catalog listing."
+
+    def handle(self, *args, **options):
+        refreshed = refresh_offer_summary()
+        self.stdout.write("Сводки каталога обновлены для %d предложений" % refreshed)
@@ -0,0 +1,154 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:39
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+import django.db.models.deletion
+
+SUMMARY_FIELDS = {
+    "product_id": "product_id",
+    "shop_id": "shop_id",
+    "category_id": "product__category_id",
+    "price": "price",
+    "remains": "remains",
+    "delivery_method": "delivery_method",
+    "name": "product__name",
+    "about": "product__about",
+    "preview": "product__preview",
+    "category_name": "product__category__name",
+    "category_path": "product__category__path",
+    "manufacturer_modified_at": "product__manufacturer__modified_at",
+    "popularity": "product__popularity",
+    "review_count": "product__review_count",
+}
+
+
+def fill_offer_summary(apps, schema_editor):
+    """Заполнение сводок существующих предложений каталога"""
+    Offer = apps.get_model("shops", "Offer")
+    Product = apps.get_model("products", "Product")
+    OfferSummary = apps.get_model("catalog", "OfferSummary")
+
+    offers = Offer.objects.filter(product__category__is_active=True, product__category__archived=False)
+    tags = {}
+
+    for product_id, tag_id in Product.tags.through.objects.order_by("tag_id").values_list("product_id", "tag_id"):
+        tags.setdefault(product_id, []).append(tag_id)
+
+    summaries = [
+        OfferSummary(
+            offer_id=row["pk"],
+            tag_ids=tags.get(row["product_id"], []),
+            **{field: row[source] for field, source in SUMMARY_FIELDS.items()},
+        )
+        for row in offers.values("pk", *SUMMARY_FIELDS.values()).iterator(chunk_size=2000)
+    ]
+    OfferSummary.objects.bulk_create(summaries, batch_size=2000)
+
+    vectors = Product.objects.filter(pk=models.OuterRef("product_id")).values("search_vector")[:1]
+    OfferSummary.objects.update(search_vector=models.Subquery(vectors))
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        ("products", "0008_category_path"),
+        ("shops", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OfferSummary",
+            fields=[
+                (
+                    "offer",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="summary",
+                        serialize=False,
+                        to="shops.offer",
+                        verbose_name="предложение",
+                    ),
+                ),
+                ("price", models.DecimalField(db_index=True, decimal_places=2, max_digits=10, verbose_name="цена")),
+                ("remains", models.PositiveIntegerField(verbose_name="остаток")),
+                (
+                    "delivery_method",
+                    models.CharField(
+                        choices=[
+                            ("FREE", "Бесплатная доставка"),
+                            ("REGULAR", "Обычная доставка"),
+                            ("EXPRESS", "Экспресс доставка"),
+                        ],
+                        max_length=128,
+                        verbose_name="способ доставки",
+                    ),
+                ),
+                ("name", models.CharField(max_length=512, verbose_name="наименование")),
+                ("about", models.TextField(blank=True, verbose_name="краткое описание")),
+                ("preview", models.ImageField(blank=True, null=True, upload_to="", verbose_name="превью")),
+                ("category_name", models.CharField(max_length=128, verbose_name="наименование категории")),
+                ("category_path", models.CharField(db_index=True, max_length=255, verbose_name="путь категории")),
+                (
+                    "manufacturer_modified_at",
+                    models.DateTimeField(db_index=True, verbose_name="дата изменения производителя"),
+                ),
+                ("popularity", models.PositiveIntegerField(db_index=True, default=0, verbose_name="популярность")),
+                (
+                    "review_count",
+                    models.PositiveIntegerField(db_index=True, default=0, verbose_name="количество отзывов"),
+                ),
+                (
+                    "tag_ids",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.IntegerField(), blank=True, default=list, size=None, verbose_name="теги"
+                    ),
+                ),
+                (
+                    "search_vector",
+                    django.contrib.postgres.search.SearchVectorField(null=True, verbose_name="поисковый вектор"),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="products.category",
+                        verbose_name="категория",
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="products.product",
+                        verbose_name="продукт",
+                    ),
+                ),
+                (
+                    "shop",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="shops.shop",
+                        verbose_name="магазин",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "сводка предложения",
+                "verbose_name_plural": "сводки предложений",
+                "indexes": [
+                    django.contrib.postgres.indexes.GinIndex(fields=["tag_ids"], name="catalog_summary_tags_gin"),
+                    django.contrib.postgres.indexes.GinIndex(
+                        fields=["search_vector"], name="catalog_summary_search_gin"
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(fill_offer_summary, migrations.RunPython.noop),
+    ]
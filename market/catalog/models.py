@@ -0,0 +1,51 @@
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from products.models import Category, Product
+from shops.models import DeliveryMethod, Offer, Shop
+
+
+class OfferSummary(models.Model):
+    """
+    Сводка предложения для каталога (read-модель).
+    Одна строка на предложение в активной неархивированной категории, в строке копии полей
+    карточки, фильтров и сортировок каталога, поэтому список каталога выбирается без соединений.
+    Предложения без остатка исключаются при запросе (remains__gt=0).
+    Обновляется catalog.summary.refresh_offer_summary.
+    """
+
+    offer = models.OneToOneField(
+        Offer, primary_key=True, on_delete=models.CASCADE, related_name="summary", verbose_name=_("предложение")
+    )
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="+", verbose_name=_("продукт"))
+    shop = models.ForeignKey(Shop, on_delete=models.CASCADE, related_name="+", verbose_name=_("магазин"))
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name="+", verbose_name=_("категория"))
+    price = models.DecimalField(max_digits=10, decimal_places=2, db_index=True, verbose_name=_("цена"))
+    remains = models.PositiveIntegerField(verbose_name=_("остаток"))
+    delivery_method = models.CharField(
+        choices=DeliveryMethod.choices, max_length=128, verbose_name=_("способ доставки")
+    )
+    name = models.CharField(max_length=512, verbose_name=_("наименование"))
+    about = models.TextField(blank=True, verbose_name=_("краткое описание"))
+    preview = models.ImageField(null=True, blank=True, verbose_name=_("превью"))
+    category_name = models.CharField(max_length=128, verbose_name=_("наименование категории"))
+    category_path = models.CharField(max_length=255, db_index=True, verbose_name=_("путь категории"))
+    manufacturer_modified_at = models.DateTimeField(db_index=True, verbose_name=_("дата изменения производителя"))
+    popularity = models.PositiveIntegerField(default=0, db_index=True, verbose_name=_("популярность"))
+    review_count = models.PositiveIntegerField(default=0, db_index=True, verbose_name=_("количество отзывов"))
+    tag_ids = ArrayField(models.IntegerField(), default=list, blank=True, verbose_name=_("теги"))
+    search_vector = SearchVectorField(null=True, verbose_name=_("поисковый вектор"))
+
+    class Meta:
+        verbose_name = _("сводка предложения")
+        verbose_name_plural = _("сводки предложений")
+        indexes = [
+            GinIndex(fields=["tag_ids"], name="catalog_summary_tags_gin"),
+            GinIndex(fields=["search_vector"], name="catalog_summary_search_gin"),
+        ]
+
+    def __str__(self) -> str:
+        return f"Сводка предложения (pk={self.pk}, name={self.name!r})"
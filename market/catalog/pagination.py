@@ -0,0 +1,261 @@
+import base64
+import datetime
+import json
+from typing import Any, Generator, List, Tuple
+
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, FloatField, Q, QuerySet
+from django.db.models.expressions import OrderBy
+from django.db.models.functions import Cast
+from django.utils.functional import cached_property
+
+from catalog.caching import get_catalog_cache_key
+from catalog.facets import FACET_PARAMS
+from catalog.utils import Params
+
+
+COUNT_CACHE_PREFIX = "catalog_count"
+COUNT_CACHE_TIMEOUT = 60 * 5
+
+KEYSET_PREFIX = "keyset_"
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """Кодирование значений ключа пагинации без потери точности (DjangoJSONEncoder обрезает время до миллисекунд)"""
+
+    def default(self, o: Any) -> Any:
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+
+        return super().default(o)
+
+
+def get_cached_count(queryset: QuerySet, params: Params) -> int:
+    """
+    Количество предложений каталога, кэшируется по нормализованным параметрам фильтра.
+    Между обновлениями кэша количество может быть неточным, это не влияет на выборку страниц.
+    """
+    cache_key = get_catalog_cache_key(COUNT_CACHE_PREFIX, params, FACET_PARAMS)
+    count = cache.get(cache_key)
+
+    if count is None:
+        count = queryset.order_by().count()
+        cache.set(cache_key, count, timeout=COUNT_CACHE_TIMEOUT)
+
+    return count
+
+
+class CatalogPage(Page):
+    """Страница каталога с параметрами ссылок на соседние страницы"""
+
+    def previous_page_params(self) -> Params:
+        return Params(page=self.previous_page_number())
+
+    def next_page_params(self) -> Params:
+        return Params(page=self.next_page_number())
+
+
+class CatalogPaginator(Paginator):
+    """Пагинатор по номеру страницы с заранее известным количеством объектов"""
+
+    def __init__(self, object_list: QuerySet, per_page: int, count: int | None = None, **kwargs) -> None:
+        super().__init__(object_list, per_page, **kwargs)
+        self._count = count
+
+    @cached_property
+    def count(self) -> int:
+        if self._count is not None:
+            return self._count
+
+        return super().count
+
+    def validate_number(self, number: int | str) -> int:
+        """
+        Проверка номера страницы. Кэшированное количество может быть меньше реального,
+        поэтому допускается страница сразу за последней по количеству.
+        """
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if self._count is None or int(number) > self.num_pages + 1:
+                raise
+            return int(number)
+
+    def page(self, number: int | str) -> CatalogPage:
+        """Страница без ограничения выборки количеством объектов, которое может быть неточным"""
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        return self._get_page(self.object_list[bottom:top], number, self)
+
+    def _get_page(self, *args, **kwargs) -> CatalogPage:
+        return CatalogPage(*args, **kwargs)
+
+
+class KeysetPage(CatalogPage):
+    """
+    Страница пагинации по ключу.
+    Ссылки на соседние страницы содержат ключ первого или последнего объекта страницы.
+    """
+
+    def __init__(
+        self, object_list: List, number: int, paginator: "KeysetPaginator", has_next: bool, has_previous: bool
+    ):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def has_next(self) -> bool:
+        return self._has_next
+
+    def has_previous(self) -> bool:
+        return self._has_previous
+
+    def next_page_number(self) -> int:
+        return self.number + 1
+
+    def previous_page_number(self) -> int:
+        return max(self.number - 1, 1)
+
+    def next_page_params(self) -> Params:
+        return Params(page=self.next_page_number(), after=self.paginator.get_cursor(self.object_list[-1]))
+
+    def previous_page_params(self) -> Params:
+        if self.previous_page_number() == 1:
+            return Params(page=1)
+
+        return Params(page=self.previous_page_number(), before=self.paginator.get_cursor(self.object_list[0]))
+
+
+class KeysetPaginator(CatalogPaginator):
+    """
+    Пагинатор по ключу (keyset): страница выбирается условием на значения сортировки
+    и pk последнего объекта предыдущей страницы вместо OFFSET, поэтому глубокие страницы
+    не требуют просмотра всех предыдущих строк.
+    Ключ строится по текущей сортировке запроса, в конец добавляется pk.
+    Номер страницы передается в ссылках только для отображения.
+    """
+
+    def __init__(
+        self,
+        object_list: QuerySet,
+        per_page: int,
+        count: int | None = None,
+        after: str | None = None,
+        before: str | None = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(object_list, per_page, count, **kwargs)
+        self.after = after
+        self.before = before
+
+    @cached_property
+    def keys(self) -> List[Tuple[str, Any, bool]]:
+        """Ключ пагинации: название аннотации, выражение и направление сортировки"""
+        ordering = []
+
+        for item in self.object_list.query.order_by:
+            if isinstance(item, str):
+                ordering.append((F(item.lstrip("-")), item.startswith("-")))
+            elif isinstance(item, OrderBy):
+                ordering.append((item.expression, item.descending))
+            elif isinstance(item, F):
+                ordering.append((item, False))
+            else:
+                raise ValueError(f"Unsupported ordering for keyset pagination: {item!r}")
+
+        if not ordering or not (isinstance(ordering[-1][0], F) and ordering[-1][0].name in ("pk", "id")):
+            ordering.append((F("pk"), False))
+
+        keys = [(f"{KEYSET_PREFIX}{number}", expression, desc) for number, (expression, desc) in enumerate(ordering)]
+        annotations = self.object_list.annotate(**{name: expression for name, expression, _ in keys}).query.annotations
+
+        # ранг поиска PostgreSQL имеет тип real, значение из ссылки совпадает с рангом строки только в double precision
+        return [
+            (name, Cast(expression, FloatField()), desc)
+            if isinstance(annotations[name].output_field, FloatField)
+            else (name, expression, desc)
+            for name, expression, desc in keys
+        ]
+
+    @cached_property
+    def queryset(self) -> QuerySet:
+        """Запрос с ключом пагинации в аннотациях и сортировкой по нему"""
+        queryset = self.object_list.annotate(**{name: expression for name, expression, _ in self.keys})
+        return queryset.order_by(*[F(name).desc() if desc else F(name).asc() for name, _, desc in self.keys])
+
+    def get_cursor(self, obj: Any) -> str:
+        """Ключ объекта для ссылки на соседнюю страницу"""
+        values = [getattr(obj, name) for name, *_ in self.keys]
+        data = json.dumps(values, cls=CursorEncoder, separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+    def parse_cursor(self, cursor: str) -> List[Any] | None:
+        """Значения ключа из ссылки, None если ключ некорректен"""
+        try:
+            data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            values = json.loads(data)
+            if not isinstance(values, list) or len(values) != len(self.keys):
+                return None
+
+            annotations = self.queryset.query.annotations
+            return [annotations[name].output_field.to_python(value) for (name, *_), value in zip(self.keys, values)]
+
+        except Exception:
+            return None
+
+    def get_condition(self, values: List[Any], backward: bool = False) -> Q:
+        """Условие на объекты после (или перед) объектом с ключом values"""
+        condition, equal = Q(), Q()
+
+        for (name, _, desc), value in zip(self.keys, values):
+            lookup = "lt" if desc != backward else "gt"
+            condition |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+
+        return condition
+
+    def page(self, number: int | str) -> KeysetPage:
+        number = max(int(number), 1)
+        queryset = self.queryset
+        limit = self.per_page + 1
+
+        after = self.parse_cursor(self.after) if self.after else None
+        before = self.parse_cursor(self.before) if self.before and after is None else None
+
+        if before is not None:
+            reverse_ordering = [F(name).asc() if desc else F(name).desc() for name, _, desc in self.keys]
+            rows = list(queryset.filter(self.get_condition(before, backward=True)).order_by(*reverse_ordering)[:limit])
+            has_previous = len(rows) > self.per_page
+            if has_previous:
+                rows.pop()
+            rows.reverse()
+            return KeysetPage(rows, number if has_previous else 1, self, True, has_previous)
+
+        if after is not None:
+            queryset = queryset.filter(self.get_condition(after))
+        else:
+            number = 1
+
+        rows = list(queryset[:limit])
+        has_next = len(rows) > self.per_page
+        if has_next:
+            rows.pop()
+        return KeysetPage(rows, number, self, has_next, after is not None)
+
+    def get_elided_page_range(self, number: int | str = 1, *args, **kwargs) -> Generator[Any, None, None]:
+        """Ссылка есть только на первую страницу, остальные доступны через соседние страницы"""
+        try:
+            number = max(int(number), 1)
+        except (TypeError, ValueError):
+            number = 1
+
+        yield 1
+
+        if number > 2:
+            yield self.ELLIPSIS
+
+        if number > 1:
+            yield number
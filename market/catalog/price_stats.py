@@ -0,0 +1,122 @@
+from decimal import Decimal
+from typing import Any, Dict, Tuple
+
+from django.contrib.postgres.fields import ArrayField
+from django.core.cache import cache
+from django.db.models import Count, DecimalField, F, Func, IntegerField, Max, Min, Value
+
+from catalog.models import OfferSummary
+from products.models import CATEGORY_PATH_SEPARATOR
+
+
+STATS_CACHE_KEY: str = "catalog_price_stats:{category_id}"
+CATEGORIES_CACHE_KEY: str = "catalog_price_stats_categories"
+BUILT_CACHE_KEY: str = "catalog_price_stats_built"
+
+# Статистика по всем предложениям каталога хранится под этим идентификатором категории
+ALL_CATEGORIES: int = 0
+
+# Границы столбцов гистограммы цен: ряд 1-2-5 от 1 до 50 000 000.
+# Границы одинаковы для всех категорий, поэтому гистограмма родительской категории - сумма гистограмм потомков,
+# а ценовые диапазоны фасета (catalog.facets.PRICE_BUCKETS) совпадают с границами столбцов
+HISTOGRAM_EDGES: Tuple[Decimal, ...] = (Decimal(0),) + tuple(
+    Decimal(mantissa) * 10**exponent for exponent in range(8) for mantissa in (1, 2, 5)
+)
+
+
+class WidthBucket(Func):
+    """
+    Номер столбца гистограммы: i, если thresholds[i - 1] <= значение < thresholds[i] (PostgreSQL width_bucket)
+    """
+
+    function = "width_bucket"
+    output_field = IntegerField()
+
+
+def get_edges_value() -> Value:
+    return Value(list(HISTOGRAM_EDGES), output_field=ArrayField(DecimalField(max_digits=12, decimal_places=2)))
+
+
+def get_bucket_range(bucket: int) -> Tuple[Decimal, Decimal | None]:
+    """Границы столбца гистограммы [от, до), у последнего столбца нет верхней границы"""
+    stop = HISTOGRAM_EDGES[bucket] if bucket < len(HISTOGRAM_EDGES) else None
+    return HISTOGRAM_EDGES[bucket - 1], stop
+
+
+def build_price_stats() -> Dict[int, Dict[str, Any]]:
+    """
+    Статистика цен предложений каталога с остатком по категориям одним сгруппированным запросом:
+    минимальная и максимальная цена, количество предложений по способам доставки и гистограмма цен.
+    Статистика родительской категории включает предложения всех потомков, как в Filter.filter_category.
+    """
+    rows = (
+        OfferSummary.objects.filter(remains__gt=0)
+        .order_by()
+        .values("category", "category_path", "delivery_method", bucket=WidthBucket(F("price"), get_edges_value()))
+        .annotate(count=Count("pk"), min=Min("price"), max=Max("price"))
+    )
+    stats: Dict[int, Dict[str, Any]] = {}
+
+    for row in rows:
+        # путь категории содержит pk всех её родителей и её собственный
+        path = row["category_path"].strip(CATEGORY_PATH_SEPARATOR)
+        pks = [int(pk) for pk in path.split(CATEGORY_PATH_SEPARATOR)] if path else [row["category"]]
+
+        for pk in (ALL_CATEGORIES, *pks):
+            item = stats.setdefault(
+                pk, {"min": row["min"], "max": row["max"], "count": 0, "delivery": {}, "buckets": {}}
+            )
+            item["min"] = min(item["min"], row["min"])
+            item["max"] = max(item["max"], row["max"])
+            item["count"] += row["count"]
+            item["delivery"][row["delivery_method"]] = item["delivery"].get(row["delivery_method"], 0) + row["count"]
+            item["buckets"][row["bucket"]] = item["buckets"].get(row["bucket"], 0) + row["count"]
+
+    return stats
+
+
+def update_price_stats() -> int:
+    """
+    Пересчет статистики цен. Статистика каждой категории хранится в кэше отдельно,
+    поэтому на странице каталога загружается только статистика текущей категории.
+    :return: количество категорий со статистикой (включая все предложения каталога)
+    """
+    stats = build_price_stats()
+    previous = cache.get(CATEGORIES_CACHE_KEY) or []
+
+    cache.set_many({STATS_CACHE_KEY.format(category_id=pk): item for pk, item in stats.items()}, timeout=None)
+    cache.delete_many([STATS_CACHE_KEY.format(category_id=pk) for pk in set(previous).difference(stats)])
+    cache.set_many({CATEGORIES_CACHE_KEY: list(stats), BUILT_CACHE_KEY: True}, timeout=None)
+
+    return len(stats)
+
+
+def is_price_stats_built() -> bool:
+    """Статистика цен рассчитана (ключи статистики могли быть вытеснены из кэша)"""
+    return bool(cache.get(BUILT_CACHE_KEY))
+
+
+def get_price_stats(category_id: int | str | None = None) -> Dict[str, Any] | None:
+    """
+    Статистика цен категории (всех предложений каталога, если категория не задана) из кэша.
+    Статистика только читается, пересчитывается она задачей catalog.tasks.update_catalog_price_stats.
+    :return: словарь с ключами min, max, count, delivery и buckets или None, если в категории нет предложений
+    """
+    try:
+        category_id = int(category_id or ALL_CATEGORIES)
+    except ValueError:
+        return None
+
+    return cache.get(STATS_CACHE_KEY.format(category_id=category_id))
+
+
+def get_range_count(stats: Dict[str, Any], start: Decimal | int, stop: Decimal | int | None) -> int:
+    """Количество предложений с ценой в диапазоне [start, stop), границы должны совпадать с границами столбцов"""
+    count = 0
+
+    for bucket, value in stats["buckets"].items():
+        bucket_start, _ = get_bucket_range(bucket)
+        if bucket_start >= start and (stop is None or bucket_start < stop):
+            count += value
+
+    return count
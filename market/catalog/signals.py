@@ -0,0 +1,88 @@
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from catalog.caching import invalidate_catalog_cache
+from catalog.summary import refresh_offer_summary
+from catalog.tag_index import invalidate_tag_index
+from catalog.tasks import schedule_price_stats_update
+from products.models import Category, Manufacturer, Product, Tag
+from shops.models import Offer
+
+
+@receiver(post_save, sender=Offer, dispatch_uid="catalog_offer_saved")
+@receiver(post_delete, sender=Offer, dispatch_uid="catalog_offer_deleted")
+@receiver(post_save, sender=Product, dispatch_uid="catalog_product_saved")
+@receiver(post_delete, sender=Product, dispatch_uid="catalog_product_deleted")
+@receiver(post_save, sender=Category, dispatch_uid="catalog_category_saved")
+@receiver(post_delete, sender=Category, dispatch_uid="catalog_category_deleted")
+def catalog_cache_handler(sender, **kwargs):
+    """Функция сброса кэша каталога после фиксации изменений предложений, товаров и категорий"""
+
+    transaction.on_commit(invalidate_catalog_cache)
+
+
+@receiver(post_save, sender=Offer, dispatch_uid="catalog_offer_summary_saved")
+def offer_summary_handler(sender, instance: Offer, **kwargs):
+    """Функция обновления сводки предложения при его сохранении"""
+
+    refresh_offer_summary(Q(pk=instance.pk))
+
+
+@receiver(post_delete, sender=Offer, dispatch_uid="catalog_offer_summary_deleted")
+def offer_summary_deleted_handler(sender, **kwargs):
+    """Функция сброса индекса тегов и пересчета статистики цен при удалении предложения (сводка удаляется каскадно)"""
+
+    transaction.on_commit(invalidate_tag_index)
+    schedule_price_stats_update()
+
+
+@receiver(post_save, sender=Product, dispatch_uid="catalog_product_summary_saved")
+def product_summary_handler(sender, instance: Product, **kwargs):
+    """Функция обновления сводок предложений товара при его сохранении"""
+
+    refresh_offer_summary(Q(product_id=instance.pk))
+
+
+@receiver(m2m_changed, sender=Product.tags.through, dispatch_uid="catalog_product_tags_summary_changed")
+def product_tags_summary_handler(sender, instance, action: str, reverse: bool, pk_set=None, **kwargs):
+    """Функция обновления тегов в сводках предложений при изменении тегов товара"""
+
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    transaction.on_commit(invalidate_catalog_cache)
+
+    if not reverse:
+        refresh_offer_summary(Q(product_id=instance.pk))
+    elif pk_set:
+        refresh_offer_summary(Q(product_id__in=pk_set))
+    elif action == "post_clear":
+        # при очистке со стороны тега товары неизвестны, обновляются сводки с этим тегом
+        refresh_offer_summary(Q(summary__tag_ids__contains=[instance.pk]))
+
+
+@receiver(post_delete, sender=Tag, dispatch_uid="catalog_tag_summary_deleted")
+def tag_summary_handler(sender, instance: Tag, **kwargs):
+    """Функция удаления тега из сводок предложений (связи товаров с тегом удаляются без m2m_changed)"""
+
+    transaction.on_commit(invalidate_catalog_cache)
+    refresh_offer_summary(Q(summary__tag_ids__contains=[instance.pk]))
+
+
+@receiver(post_save, sender=Category, dispatch_uid="catalog_category_summary_saved")
+def category_summary_handler(sender, instance: Category, **kwargs):
+    """Функция обновления сводок предложений категории и её потомков (название, активность, путь)"""
+
+    if instance.path:
+        refresh_offer_summary(Q(product__category__path__startswith=instance.path))
+    else:
+        refresh_offer_summary(Q(product__category=instance))
+
+
+@receiver(post_save, sender=Manufacturer, dispatch_uid="catalog_manufacturer_summary_saved")
+def manufacturer_summary_handler(sender, instance: Manufacturer, **kwargs):
+    """Функция обновления сводок предложений производителя (дата изменения для сортировки по новизне)"""
+
+    refresh_offer_summary(Q(product__manufacturer=instance))
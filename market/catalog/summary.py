@@ -0,0 +1,152 @@
+from collections import defaultdict
+from typing import Dict, List, Set
+
+from django.db import connection, transaction
+from django.db.models import OuterRef, Q, QuerySet, Subquery
+
+from catalog.models import OfferSummary
+from catalog.tag_index import invalidate_tag_index
+from catalog.tasks import schedule_price_stats_update
+from products.models import Product
+from shops.models import Offer
+
+
+# Поля сводки, перезаписываемые при обновлении, и поля предложения, из которых они копируются
+SUMMARY_FIELDS: Dict[str, str] = {
+    "product_id": "product_id",
+    "shop_id": "shop_id",
+    "category_id": "product__category_id",
+    "price": "price",
+    "remains": "remains",
+    "delivery_method": "delivery_method",
+    "name": "product__name",
+    "about": "product__about",
+    "preview": "product__preview",
+    "category_name": "product__category__name",
+    "category_path": "product__category__path",
+    "manufacturer_modified_at": "product__manufacturer__modified_at",
+    "popularity": "product__popularity",
+    "review_count": "product__review_count",
+}
+
+BATCH_SIZE: int = 2000
+
+# Поля сводки, при изменении которых сбрасывается индекс тегов и пересчитывается статистика цен.
+# Остаток отслеживается только при переходе через ноль: в каталоге и статистике цен учитываются предложения с остатком
+TRACKED_FIELDS = ("tag_ids", "price", "category_path", "delivery_method", "remains")
+PRICE_STATS_FIELDS = {"price", "category_path", "delivery_method", "remains"}
+
+
+def get_active_offers() -> QuerySet:
+    """
+    Предложения, у которых есть сводка: все предложения активной неархивированной категории.
+    Предложения без остатка тоже хранятся в сводке, остаток фильтруется при запросе
+    """
+    return Offer.objects.filter(product__category__is_active=True, product__category__archived=False)
+
+
+def get_tracked_value(field: str, value):
+    """Значение отслеживаемого поля для сравнения: для остатка - только его наличие"""
+    return value > 0 if field == "remains" else value
+
+
+def build_summaries(offer_ids: List[int]) -> List[OfferSummary]:
+    """Сводки предложений двумя запросами: поля предложений с соединениями и теги их товаров"""
+    rows = list(Offer.objects.filter(pk__in=offer_ids).values("pk", *SUMMARY_FIELDS.values()))
+    tags = defaultdict(list)
+
+    for product_id, tag_id in (
+        Product.tags.through.objects.filter(product_id__in={row["product_id"] for row in rows})
+        .order_by("tag_id")
+        .values_list("product_id", "tag_id")
+    ):
+        tags[product_id].append(tag_id)
+
+    return [
+        OfferSummary(
+            offer_id=row["pk"],
+            tag_ids=tags[row["product_id"]],
+            **{field: row[source] for field, source in SUMMARY_FIELDS.items()},
+        )
+        for row in rows
+    ]
+
+
+def get_changed_fields(summaries: List[OfferSummary]) -> Set[str]:
+    """Поля TRACKED_FIELDS, которые изменятся при записи сводок (у новых сводок - все, кроме пустых тегов)"""
+    rows = OfferSummary.objects.filter(pk__in=[summary.pk for summary in summaries]).values_list("pk", *TRACKED_FIELDS)
+    previous = {pk: values for pk, *values in rows}
+    changed = set()
+
+    for summary in summaries:
+        values = previous.get(summary.pk)
+
+        if values is None:
+            changed.update(field for field in TRACKED_FIELDS if field != "tag_ids" or summary.tag_ids)
+        else:
+            changed.update(
+                field
+                for field, value in zip(TRACKED_FIELDS, values)
+                if get_tracked_value(field, getattr(summary, field)) != get_tracked_value(field, value)
+            )
+
+    return changed
+
+
+def write_summaries(summaries: List[OfferSummary]) -> Set[str]:
+    """
+    Создание и обновление сводок, поисковый вектор копируется из товара одним запросом.
+    :return: измененные поля TRACKED_FIELDS
+    """
+    fields = [*SUMMARY_FIELDS, "tag_ids"]
+    changed = get_changed_fields(summaries)
+
+    if connection.features.supports_update_conflicts_with_target:
+        OfferSummary.objects.bulk_create(
+            summaries, update_conflicts=True, unique_fields=["offer"], update_fields=fields
+        )
+    else:
+        OfferSummary.objects.filter(pk__in=[summary.pk for summary in summaries]).delete()
+        OfferSummary.objects.bulk_create(summaries)
+
+    vectors = Product.objects.filter(pk=OuterRef("product_id")).values("search_vector")[:1]
+    OfferSummary.objects.filter(pk__in=[summary.pk for summary in summaries]).update(search_vector=Subquery(vectors))
+
+    return changed
+
+
+def refresh_offer_summary(condition: Q | None = None) -> int:
+    """
+    Обновление сводок предложений каталога.
+    Сводки предложений, которые больше не выводятся в каталоге, удаляются, остальные создаются или перезаписываются.
+    :param condition: условие на предложения (например, Q(product_id__in=...)), если не задано - обновляются все
+    :return: количество записанных сводок
+    """
+    offers = Offer.objects.all() if condition is None else Offer.objects.filter(condition)
+    active = get_active_offers().filter(pk__in=offers.values("pk"))
+
+    stale = OfferSummary.objects.filter(offer__in=offers.values("pk")).exclude(offer__in=active.values("pk"))
+    changed = set()
+
+    if stale.exclude(tag_ids=[]).exists():
+        changed.add("tag_ids")
+
+    if stale.delete()[0]:
+        changed.update(PRICE_STATS_FIELDS)
+
+    offer_ids = list(active.order_by("pk").values_list("pk", flat=True))
+
+    for start in range(0, len(offer_ids), BATCH_SIZE):
+        stop = start + BATCH_SIZE
+        changed |= write_summaries(build_summaries(offer_ids[start:stop]))
+
+    # битовые карты тегов меняются только при изменении набора сводок с тегами.
+    # Индекс сбрасывается, а статистика цен пересчитывается после фиксации транзакции, иначе параллельный
+    # запрос построит их по еще не измененным строкам и сохранит под новой версией
+    if "tag_ids" in changed:
+        transaction.on_commit(invalidate_tag_index)
+
+    if changed & PRICE_STATS_FIELDS:
+        schedule_price_stats_update()
+
+    return len(offer_ids)
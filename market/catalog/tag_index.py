@@ -0,0 +1,120 @@
+import time
+from array import array
+from typing import Any, Dict, List
+
+from django.core.cache import cache
+
+from catalog.models import OfferSummary
+from products.models import Tag
+
+
+TAG_CACHE_KEY: str = "catalog_tag_index:{version}:{tag_id}"
+VERSION_CACHE_KEY: str = "catalog_tag_index_version"
+
+# Если предложений в результате больше, то фильтр выполняется по массиву тегов сводки (GIN индекс),
+# а не списком pk, чтобы не передавать в запрос слишком длинный список
+MAX_IDS: int = 5000
+
+# Сколько тегов хранится в памяти процесса, при переполнении копия очищается
+MAX_LOCAL_TAGS: int = 1000
+
+BATCH_SIZE: int = 5000
+
+# Копии списков pk загруженных тегов в памяти процесса, сбрасываются при изменении версии индекса в кэше
+_local: Dict[str, Any] = {"version": None, "tags": {}}
+
+
+def build_tag_ids(tag_id: int) -> array:
+    """
+    Отсортированный массив pk сводок предложений каталога с тегом (поиск по GIN индексу массива тегов).
+    Размер массива пропорционален количеству предложений с тегом.
+    """
+    rows = OfferSummary.objects.filter(tag_ids__contains=[tag_id]).order_by("pk").values_list("pk", flat=True)
+    return array("q", rows.iterator(chunk_size=BATCH_SIZE))
+
+
+def invalidate_tag_index() -> None:
+    """Сброс индекса тегов сменой версии, массивы прежней версии вытесняются из кэша"""
+    try:
+        cache.incr(VERSION_CACHE_KEY)
+    except ValueError:
+        cache.add(VERSION_CACHE_KEY, int(time.time() * 1000), timeout=None)
+
+
+def get_version() -> int:
+    """Текущая версия индекса тегов, входит в ключи массивов тегов"""
+    version = cache.get(VERSION_CACHE_KEY)
+
+    if version is None:
+        cache.add(VERSION_CACHE_KEY, int(time.time() * 1000), timeout=None)
+        version = cache.get(VERSION_CACHE_KEY)
+
+    return version
+
+
+def get_tags_ids(tag_ids: List[int]) -> Dict[int, array]:
+    """
+    Массивы pk предложений тегов tag_ids. Загружаются только запрошенные теги: из памяти процесса,
+    затем одним запросом к кэшу, отсутствующие в кэше строятся и сохраняются каждый под своим ключом.
+    Массивы строятся только для существующих тегов (проверяются одним запросом), у несуществующих массив пустой
+    и не сохраняется.
+    """
+    version = get_version()
+
+    if version != _local["version"] or len(_local["tags"]) > MAX_LOCAL_TAGS:
+        _local.update(version=version, tags={})
+
+    tags = _local["tags"]
+    missing = [tag_id for tag_id in tag_ids if tag_id not in tags]
+
+    if missing:
+        keys = {TAG_CACHE_KEY.format(version=version, tag_id=tag_id): tag_id for tag_id in missing}
+        cached = cache.get_many(list(keys))
+        uncached = [tag_id for key, tag_id in keys.items() if key not in cached]
+        existing = set(Tag.objects.filter(pk__in=uncached).values_list("pk", flat=True)) if uncached else set()
+        built = {}
+
+        for key, tag_id in keys.items():
+            if key in cached:
+                tags[tag_id] = cached[key]
+            elif tag_id in existing:
+                tags[tag_id] = built[key] = build_tag_ids(tag_id)
+
+        if built:
+            cache.set_many(built, timeout=None)
+
+    return {tag_id: tags.get(tag_id, array("q")) for tag_id in tag_ids}
+
+
+def get_tag_offer_ids(tag_ids: List[int], any_: bool = False) -> List[int]:
+    """
+    Отсортированные pk предложений с тегами tag_ids.
+    :param tag_ids: идентификаторы тегов
+    :param any_: предложения с любым из тегов (OR), по умолчанию - со всеми тегами (AND)
+    """
+    arrays = sorted(get_tags_ids(tag_ids).values(), key=len)
+
+    if any_:
+        return sorted(set().union(*arrays))
+
+    # пересечение начинается с самого короткого массива
+    result = set(arrays[0])
+    for ids in arrays[1:]:
+        if not result:
+            break
+        result.intersection_update(ids)
+
+    return sorted(result)
+
+
+def get_tag_filter(tag_ids: List[int], any_: bool = False) -> Dict[str, Any]:
+    """
+    Фильтр сводок предложений по тегам: пересечение (объединение) списков pk тегов без запроса к БД.
+    Небольшой результат передается списком pk, большой - условием на массив тегов сводки.
+    """
+    ids = get_tag_offer_ids(tag_ids, any_)
+
+    if len(ids) > MAX_IDS:
+        return {"tag_ids__overlap" if any_ else "tag_ids__contains": tag_ids}
+
+    return {"pk__in": ids}
@@ -0,0 +1,47 @@
+from django.core.cache import cache
+from django.db import DatabaseError, transaction
+from config.celery import app
+from celery.utils.log import get_task_logger
+
+from catalog.price_stats import update_price_stats
+
+
+logger = get_task_logger(__name__)
+
+# Пока задача пересчета статистики цен ожидает в очереди, новые задачи не ставятся.
+# Таймаут снимает отметку, если задача потеряна
+PRICE_STATS_PENDING_CACHE_KEY: str = "catalog_price_stats_pending"
+PRICE_STATS_PENDING_TIMEOUT: int = 60 * 10
+
+
+@app.task(ignore_result=True, name="catalog.tasks.update_catalog_price_stats")
+def update_catalog_price_stats():
+    """
+    Задача Сelery. Пересчет статистики цен каталога по категориям для ценового слайдера и фасета цен.
+    """
+    logger.info("Запущен пересчет статистики цен каталога")
+    # изменения после снятия отметки поставят новую задачу
+    cache.delete(PRICE_STATS_PENDING_CACHE_KEY)
+
+    try:
+        count = update_price_stats()
+
+    except DatabaseError as e:
+        logger.error("Ошибка %s: %s" % (type(e), e))
+
+    else:
+        logger.info("Пересчет статистики цен завершен успешно, категорий со статистикой: %d" % count)
+
+
+def enqueue_price_stats_update() -> None:
+    """Постановка задачи пересчета статистики цен, если она еще не ожидает в очереди"""
+    if cache.add(PRICE_STATS_PENDING_CACHE_KEY, True, timeout=PRICE_STATS_PENDING_TIMEOUT):
+        update_catalog_price_stats.delay()
+
+
+def schedule_price_stats_update() -> None:
+    """
+    Пересчет статистики цен в задаче Celery после фиксации транзакции,
+    запрос страницы каталога только читает сохраненную статистику.
+    """
+    transaction.on_commit(enqueue_price_stats_update)
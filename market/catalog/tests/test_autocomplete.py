@@ -0,0 +1,50 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from catalog.views import AutocompleteView
+from products.models import Category, Manufacturer, Product
+from products.services.autocomplete_services import INDEX_CACHE_KEY, VERSION_CACHE_KEY, autocomplete
+
+
+class AutocompleteTest(TestCase):
+    """Тесты подсказок строки поиска"""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.path = reverse("catalog:autocomplete")
+        manufacturer = Manufacturer.objects.create(name="Hisense")
+        category = Category.objects.create(name="Телевизоры")
+        cls.product = Product.objects.create(name="Hisense 55A6K", manufacturer=manufacturer, category=category)
+
+    def setUp(self) -> None:
+        cache.delete_many([INDEX_CACHE_KEY, VERSION_CACHE_KEY])
+
+    def test_autocomplete(self) -> None:
+        response = self.client.get(self.path, {"q": "hisense 55"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            {
+                "query": "hisense 55",
+                "results": [{"type": "product", "label": self.product.name, "url": self.product.get_absolute_url()}],
+            },
+        )
+
+    def test_bad_limit(self) -> None:
+        response = self.client.get(self.path, {"q": "his", "limit": "много"})
+
+        self.assertEqual(len(response.json()["results"]), 2)
+
+    def test_limit_is_clamped(self) -> None:
+        with mock.patch("catalog.views.autocomplete", wraps=autocomplete) as call:
+            self.client.get(self.path, {"q": "his", "limit": "100000"})
+
+        call.assert_called_once_with("his", AutocompleteView.max_limit)
+
+    def test_non_positive_limit(self) -> None:
+        for limit in ("0", "-5"):
+            self.assertEqual(self.client.get(self.path, {"q": "his", "limit": limit}).status_code, 400)
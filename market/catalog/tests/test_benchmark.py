@@ -0,0 +1,78 @@
+import io
+import json
+import os
+import tempfile
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from catalog.benchmark import get_scenarios, percentile, seed_catalog
+from catalog.models import OfferSummary
+from catalog.utils import Sorter
+from products.models import Category
+
+
+class BenchmarkTest(TestCase):
+    """Тесты замеров страницы каталога"""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cache.clear()
+        cls.created = seed_catalog(products=30, shops=3, offers=2, depth=3, branching=2, tags=5, reviews=1)
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def tearDown(self) -> None:
+        cache.clear()
+
+    def test_seed_catalog(self) -> None:
+        self.assertEqual(self.created["categories"], 2 + 4 + 8)
+        self.assertEqual(self.created["offers"], 60)
+        self.assertTrue(OfferSummary.objects.exists())
+        self.assertFalse(Category.objects.filter(path="").exists())
+
+    def test_scenarios(self) -> None:
+        names = [name for name, _ in get_scenarios()]
+
+        for sort in Sorter.sort_types:
+            self.assertIn(f"sort={sort}", names)
+            self.assertIn(f"sort={sort}&desc=on", names)
+
+        for name in ("category_root", "category_leaf", "price", "tags_all", "tags_any", "search", "combined"):
+            self.assertIn(name, names)
+
+    def test_percentile(self) -> None:
+        values = list(range(1, 101))
+
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 95), 7)
+
+    def test_command_writes_json(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "result.json")
+            call_command("catalog_benchmark", "--repeat", "2", "--output", output, stdout=io.StringIO())
+            call_command(
+                "catalog_benchmark",
+                "--repeat",
+                "1",
+                "--cache",
+                "cold",
+                "--output",
+                output,
+                "--compare",
+                output,
+                stdout=io.StringIO(),
+            )
+
+            with open(output, encoding="utf-8") as file:
+                result = json.load(file)
+
+        self.assertEqual(result["catalog"]["offers"], OfferSummary.objects.count())
+        self.assertEqual({item["cache"] for item in result["results"]}, {"cold"})
+        for item in result["results"]:
+            self.assertEqual(item["status"], [200], item["scenario"])
+            self.assertGreater(item["queries"]["max"], 0)
+            self.assertEqual(set(item["latency_ms"]), {"p50", "p90", "p95", "p99", "mean", "min", "max"})
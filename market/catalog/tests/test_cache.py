@@ -0,0 +1,92 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import translation
+
+from catalog.caching import CSRF_PLACEHOLDER, get_catalog_version
+from catalog.tests.utils import create_offers, create_shop
+from catalog.views import CatalogListView
+from shops.models import Offer
+
+
+class CatalogCacheTest(TestCase):
+    """Тесты кэша страницы каталога"""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.path = reverse("catalog:index")
+        shop = create_shop()
+        cls.user = shop.user
+        create_offers(
+            *({"name": f"product {n}", "price": 100 * (n + 1), "preview": "img/preview.png"} for n in range(3)),
+            shop=shop,
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def tearDown(self) -> None:
+        cache.clear()
+
+    def get(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.path, params)
+
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_anonymous_page_is_cached(self) -> None:
+        _, first = self.get(sort="price")
+        cached, second = self.get(sort="price", page="1")
+
+        self.assertIsNotNone(cache.get(self.get_page_cache_key(cached.wsgi_request)))
+
+        self.assertLess(second, first)
+        self.assertIn("product 0", cached.context_data["catalog_content"])
+
+    def test_offer_change_invalidates_cache(self) -> None:
+        self.get(sort="price")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Offer.objects.filter(product__name="product 0").get().delete()
+
+        response, _ = self.get(sort="price")
+
+        self.assertNotIn("product 0", response.context_data["catalog_content"])
+
+    def test_cache_is_invalidated_after_commit(self) -> None:
+        version = get_catalog_version()
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            Offer.objects.filter(product__name="product 0").get().delete()
+            self.assertEqual(get_catalog_version(), version)
+
+        for callback in callbacks:
+            callback()
+
+        self.assertNotEqual(get_catalog_version(), version)
+
+    def test_csrf_placeholder_is_replaced(self) -> None:
+        self.get()
+        response, _ = self.get()
+
+        self.assertNotIn(CSRF_PLACEHOLDER.encode(), response.content)
+        self.assertIn(b"csrfmiddlewaretoken", response.content)
+
+    def test_authenticated_page_is_not_cached(self) -> None:
+        self.client.force_login(self.user)
+        response, _ = self.get()
+
+        self.assertNotIn("catalog_content", response.context_data)
+        self.assertIsNone(cache.get(self.get_page_cache_key(response.wsgi_request)))
+
+    @staticmethod
+    def get_page_cache_key(request) -> str:
+        """Ключ кэша страницы, под которым был бы сохранен фрагмент для запроса"""
+        view = CatalogListView()
+        view.setup(request)
+
+        with translation.override(request.LANGUAGE_CODE):
+            return view.get_page_cache_key()
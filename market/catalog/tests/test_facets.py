@@ -0,0 +1,84 @@
+from django.core.cache import cache
+from django.template.response import TemplateResponse
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from catalog.facets import get_facets
+from catalog.tests.utils import create_offers
+from catalog.utils import Params
+from catalog.views import CatalogListView
+from products.models import Category, Tag
+
+
+class FacetsTest(TestCase):
+    """Тесты счетчиков фасетов каталога"""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.parent = Category.objects.create(name="электроника")
+        cls.phones = Category.objects.create(name="телефоны", parent=cls.parent)
+        cls.tv = Category.objects.create(name="телевизоры", parent=cls.parent)
+        cls.books = Category.objects.create(name="книги")
+        cls.tag = Tag.objects.create(name="новинка")
+
+        create_offers(
+            {"category": cls.phones, "price": 500, "delivery_method": "FREE", "tags": [cls.tag]},
+            {"category": cls.phones, "price": 2000, "delivery_method": "REGULAR"},
+            {"category": cls.tv, "price": 60000, "delivery_method": "FREE", "tags": [cls.tag]},
+            {"category": cls.books, "price": 300, "delivery_method": "EXPRESS"},
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_counts(self) -> None:
+        facets = get_facets(Params())
+
+        self.assertEqual(facets["total"], 4)
+        self.assertEqual(facets["categories"], {self.phones.pk: 2, self.tv.pk: 1, self.books.pk: 1, self.parent.pk: 3})
+        self.assertEqual(facets["tags"], {self.tag.pk: 2})
+        self.assertEqual(facets["delivery"], {"FREE": 2, "REGULAR": 1, "EXPRESS": 1})
+        self.assertEqual([price_range["count"] for price_range in facets["prices"]], [2, 1, 0, 0, 1, 0])
+
+    def test_facet_ignores_own_filter(self) -> None:
+        facets = get_facets(Params(category_id=str(self.phones.pk), free_delivery="on"))
+
+        self.assertEqual(facets["total"], 1)
+        # категории считаются с фильтром доставки, но без фильтра категории
+        self.assertEqual(facets["categories"], {self.phones.pk: 1, self.tv.pk: 1, self.parent.pk: 2})
+        # доставка считается с фильтром категории, но без фильтра доставки
+        self.assertEqual(facets["delivery"], {"FREE": 1, "REGULAR": 1, "EXPRESS": 0})
+        self.assertEqual([price_range["count"] for price_range in facets["prices"]], [1, 0, 0, 0, 0, 0])
+
+    def test_queries_and_cache(self) -> None:
+        params = Params(price="0;10000", search="товар", sort="price")
+
+        with self.assertNumQueries(3):
+            facets = get_facets(params)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_facets(Params(search=" товар ", price="0;10000", page="2")), facets)
+
+    def test_catalog_context(self) -> None:
+        request = RequestFactory().get(reverse("catalog:index"), {"category_id": self.parent.pk})
+        response: TemplateResponse = CatalogListView.as_view()(request)
+
+        self.assertEqual(response.context_data["facets"]["total"], 3)
+        self.assertEqual(response.context_data["category_facets"], [(self.phones, 2), (self.tv, 1)])
+
+
+class ParamsNormalizeTest(TestCase):
+    """Тесты нормализации параметров"""
+
+    def test_normalize(self) -> None:
+        params = Params(title="  Новый   телефон ", price="", category_id="3", sort="price")
+
+        self.assertEqual(params.normalize().to_dict(), {"category_id": "3", "sort": "price", "title": "Новый телефон"})
+        self.assertEqual(params.normalize(["title", "price"]).to_dict(), {"title": "Новый телефон"})
+
+    def test_cache_key(self) -> None:
+        key = Params(category_id="3", title="телефон").cache_key("prefix")
+
+        self.assertTrue(key.startswith("prefix:"))
+        self.assertEqual(Params(title=" телефон", category_id="3", price="").cache_key("prefix"), key)
+        self.assertNotEqual(Params(title="телефон").cache_key("prefix"), key)
@@ -1,14 +1,16 @@
-from typing import Dict
+from typing import Dict, List
 
 from django.template.response import TemplateResponse
 from django.test import TestCase, RequestFactory
 from django.urls import reverse
 
 from catalog.tests.utils import (
+    create_offers,
     get_fixtures_list,
     # echo_sql,
 )
 from catalog.views import CatalogListView
+from products.models import Category
 
 
 class FilterChecker:
@@ -214,3 +216,63 @@ class FilterTest(TestCase, FilterChecker):
 
         self.check_filter_by_search(response, search)
         self.check_filter_by_category(response, category_id, category_name)
+
+
+class SearchTest(TestCase):
+    """Тесты полнотекстового поиска каталога"""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.path = reverse("catalog:index")
+        create_offers(
+            *(
+                {"name": name, "about": about}
+                for name, about in (("Case", "for phones"), ("Phone", "smartphone"), ("Headphones", "wireless"))
+            )
+        )
+
+    def setUp(self) -> None:
+        self.factory = RequestFactory()
+
+    def get_result(self, params: Dict[str, str]) -> List[str]:
+        request = self.factory.get(self.path, params)
+        response: TemplateResponse = CatalogListView.as_view()(request)
+        return [offer.product.name for offer in response.context_data["object_list"]]
+
+    def test_search_is_ranked(self) -> None:
+        self.assertEqual(self.get_result({"search": "phones"}), ["Phone", "Case"])
+
+    def test_title_with_explicit_sort(self) -> None:
+        self.assertEqual(sorted(self.get_result({"title": "PHONE", "sort": "price"})), ["Case", "Phone"])
+
+    def test_rank_sort_without_search(self) -> None:
+        self.assertEqual(sorted(self.get_result({"sort": "rank"})), ["Case", "Headphones", "Phone"])
+
+
+class CategorySubtreeTest(TestCase):
+    """Тесты фильтра по поддереву категорий"""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.path = reverse("catalog:index")
+        cls.root = Category.objects.create(name="электроника")
+        cls.phones = Category.objects.create(name="телефоны", parent=cls.root)
+        cls.smartphones = Category.objects.create(name="смартфоны", parent=cls.phones)
+        books = Category.objects.create(name="книги")
+
+        create_offers(
+            {"name": "root", "category": cls.root},
+            {"name": "phone", "category": cls.phones},
+            {"name": "smartphone", "category": cls.smartphones},
+            {"name": "book", "category": books},
+        )
+
+    def get_result(self, category: Category) -> List[str]:
+        request = RequestFactory().get(self.path, {"category_id": category.pk})
+        response: TemplateResponse = CatalogListView.as_view()(request)
+        return sorted(offer.product.name for offer in response.context_data["object_list"])
+
+    def test_subtree_at_any_depth(self) -> None:
+        self.assertEqual(self.get_result(self.root), ["phone", "root", "smartphone"])
+        self.assertEqual(self.get_result(self.phones), ["phone", "smartphone"])
+        self.assertEqual(self.get_result(self.smartphones), ["smartphone"])
@@ -0,0 +1,71 @@
+import io
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from catalog.instrumentation import get_report, get_signature
+from catalog.tests.utils import create_offers
+from catalog.utils import Params
+
+
+class SignatureTest(TestCase):
+    """Тесты сигнатур параметров каталога"""
+
+    def test_values_are_dropped(self) -> None:
+        first = get_signature(Params(price="10;100", category_id="3", sort="price", desc="on"))
+        second = get_signature(Params(price=" 20;300 ", category_id="7", sort="price", desc="on", page="1"))
+
+        self.assertEqual(first, second)
+        self.assertEqual(first, "category_id&desc=on&price&sort=price")
+
+    def test_tags_pages_and_empty(self) -> None:
+        self.assertEqual(get_signature(Params(tag_id="5,1,5", page="3")), "page&tag_id:2")
+        self.assertEqual(get_signature(Params(after="abc")), "keyset")
+        self.assertEqual(get_signature(Params(utm="ad")), "-")
+
+
+class InstrumentationTest(TestCase):
+    """Тесты статистики запросов страницы каталога"""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        [offer] = create_offers({"name": "item", "preview": "img/preview.png"})
+        cls.category = offer.product.category
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def tearDown(self) -> None:
+        cache.clear()
+
+    def test_requests_are_recorded(self) -> None:
+        for price in ("10;100", "20;200"):
+            self.client.get(reverse("catalog:index"), {"price": price, "category_id": self.category.pk})
+        self.client.get(reverse("catalog:index"))
+
+        report = {item["signature"]: item for item in get_report()}
+
+        self.assertEqual(set(report), {"category_id&price", "-"})
+        self.assertEqual(report["category_id&price"]["count"], 2)
+        self.assertEqual(
+            report["category_id&price"]["sample"], {"category_id": str(self.category.pk), "price": "20.0;200.0"}
+        )
+        self.assertGreater(report["-"]["sql"], 0)
+        self.assertGreaterEqual(report["-"]["time"], report["-"]["render"])
+
+    @override_settings(CATALOG_INSTRUMENTATION=False)
+    def test_disabled(self) -> None:
+        self.client.get(reverse("catalog:index"))
+
+        self.assertEqual(get_report(), [])
+
+    def test_command_with_explain(self) -> None:
+        self.client.get(reverse("catalog:index"), {"category_id": self.category.pk, "sort": "price"})
+        out = io.StringIO()
+
+        call_command("catalog_slow_queries", "--explain", stdout=out)
+
+        self.assertIn("1. category_id&sort=price: запросов 1", out.getvalue())
+        self.assertIn("catalog_offersummary", out.getvalue())
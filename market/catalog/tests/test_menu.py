@@ -0,0 +1,48 @@
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+
+from context_processors.menu_context import categories_menu
+from products.models import Category
+
+
+class CategoriesMenuTest(TestCase):
+    """Тесты кэша меню категорий"""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.root = Category.objects.create(name="electronics")
+        cls.child = Category.objects.create(name="phones", parent=cls.root)
+        Category.objects.create(name="hidden", parent=cls.root, is_active=False)
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.request = RequestFactory().get("/")
+
+    def tearDown(self) -> None:
+        cache.clear()
+
+    def test_menu_tree(self) -> None:
+        menu = list(categories_menu(self.request)["menu"])
+
+        self.assertEqual([item["category"] for item in menu], [self.root])
+        self.assertEqual([item["category"] for item in menu[0]["submenu"]], [self.child])
+
+    def test_menu_html_is_cached(self) -> None:
+        html = str(categories_menu(self.request)["menu_html"])
+        self.assertIn("phones", html)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(str(categories_menu(self.request)["menu_html"]), html)
+
+    def test_category_save_invalidates_menu(self) -> None:
+        str(categories_menu(self.request)["menu_html"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.child.name = "smartphones"
+            self.child.save()
+
+        self.assertIn("smartphones", str(categories_menu(self.request)["menu_html"]))
+
+    def test_menu_is_lazy(self) -> None:
+        with self.assertNumQueries(0):
+            categories_menu(self.request)
@@ -0,0 +1,110 @@
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from django.core.cache import cache
+from django.template.response import TemplateResponse
+from django.test import TestCase, RequestFactory
+from django.urls import reverse
+
+from catalog.pagination import CatalogPaginator, KeysetPaginator
+from catalog.summary import refresh_offer_summary
+from catalog.tests.utils import create_offers
+from catalog.views import CatalogListView
+from products.models import Manufacturer
+from shops.models import Offer
+from site_settings.models import PaginationMode, SiteSettings
+
+
+class KeysetPaginationTest(TestCase):
+    """Тесты пагинации каталога по ключу"""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.path = reverse("catalog:index")
+        SiteSettings.objects.create(paginate_by=3, pagination_mode=PaginationMode.KEYSET)
+        create_offers(
+            *(
+                {"price": price, "popularity": popularity}
+                for price, popularity in ((300, 1), (100, 5), (200, 5), (100, 0), (500, 3), (200, 2), (100, 9))
+            )
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def tearDown(self) -> None:
+        # SiteSettings.load кэширует настройки теста
+        cache.clear()
+
+    def get_response(self, params: Dict[str, str]) -> TemplateResponse:
+        request = self.factory.get(self.path, params)
+        return CatalogListView.as_view()(request)
+
+    def walk(self, params: Dict[str, str]) -> List[int]:
+        """Обход всех страниц по ссылкам вперед, затем назад, возвращает pk предложений"""
+        forward, pages = [], []
+        page_params = {}
+
+        while True:
+            page = self.get_response({**params, **page_params}).context_data["page_obj"]
+            self.assertIsInstance(page.paginator, KeysetPaginator)
+            pages.append([offer.pk for offer in page.object_list])
+            forward.extend(pages[-1])
+            if not page.has_next():
+                break
+            page_params = page.next_page_params().to_dict()
+
+        self.assertEqual(page.number, len(pages))
+
+        while page.has_previous():
+            page = self.get_response({**params, **page.previous_page_params().to_dict()}).context_data["page_obj"]
+            self.assertEqual([offer.pk for offer in page.object_list], pages[page.number - 1])
+
+        self.assertEqual(page.number, 1)
+        return forward
+
+    def expected(self, *ordering: str) -> List[int]:
+        return list(Offer.objects.order_by(*ordering).values_list("pk", flat=True))
+
+    def test_sort_by_price(self) -> None:
+        self.assertEqual(self.walk({"sort": "price"}), self.expected("price", "pk"))
+        self.assertEqual(self.walk({"sort": "price", "desc": "on"}), self.expected("-price", "pk"))
+
+    def test_default_sort(self) -> None:
+        self.assertEqual(self.walk({}), self.expected("-product__popularity", "pk"))
+
+    def test_sort_by_recency_with_tied_keys(self) -> None:
+        # у всех предложений один производитель, время изменения с микросекундами
+        Manufacturer.objects.update(modified_at=datetime(2024, 1, 1, 12, 0, 0, 123456, tzinfo=timezone.utc))
+        refresh_offer_summary()
+
+        self.assertEqual(self.walk({"sort": "recency"}), self.expected("pk"))
+        self.assertEqual(self.walk({"sort": "recency", "desc": "on"}), self.expected("pk"))
+
+    def test_search_rank_with_tied_keys(self) -> None:
+        # названия товаров отличаются только номером, ранг поиска у всех предложений одинаковый
+        self.assertEqual(self.walk({"search": "товар"}), self.expected("pk"))
+
+    def test_invalid_cursor_is_first_page(self) -> None:
+        page = self.get_response({"sort": "price", "page": "2", "after": "не ключ"}).context_data["page_obj"]
+
+        self.assertEqual(page.number, 1)
+        self.assertFalse(page.has_previous())
+
+    def test_page_without_cursor_uses_offset(self) -> None:
+        page = self.get_response({"sort": "famous", "page": "2"}).context_data["page_obj"]
+
+        self.assertIsInstance(page.paginator, CatalogPaginator)
+        self.assertNotIsInstance(page.paginator, KeysetPaginator)
+        self.assertEqual([offer.pk for offer in page.object_list], self.expected("product__popularity", "pk")[3:6])
+
+    def test_count_is_cached(self) -> None:
+        response = self.get_response({"sort": "price"})
+        self.assertEqual(response.context_data["paginator"].count, 7)
+
+        # изменение без сигналов моделей не сбрасывает кэш каталога
+        Offer.objects.filter(pk=Offer.objects.first().pk).update(remains=0)
+
+        response = self.get_response({"sort": "price", "desc": "on"})
+        self.assertEqual(response.context_data["paginator"].count, 7)
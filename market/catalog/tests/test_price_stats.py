@@ -0,0 +1,107 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from catalog.facets import get_offer_counts
+from catalog.price_stats import ALL_CATEGORIES, build_price_stats, get_price_stats, get_range_count, update_price_stats
+from catalog.tests.utils import create_offers
+from catalog.utils import Params
+from catalog.views import CatalogListView
+from config.celery import app
+from products.models import Category
+
+
+class PriceStatsTest(TestCase):
+    """Тесты статистики цен каталога"""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.parent = Category.objects.create(name="электроника")
+        cls.phones = Category.objects.create(name="телефоны", parent=cls.parent)
+        cls.tv = Category.objects.create(name="телевизоры", parent=cls.parent)
+
+        cls.offers = create_offers(
+            *(
+                {"name": f"item {number}", "category": category, "price": price, "delivery_method": delivery}
+                for number, (category, price, delivery) in enumerate(
+                    ((cls.phones, "499.50", "FREE"), (cls.phones, "1000", "REGULAR"), (cls.tv, "60000", "FREE"))
+                )
+            )
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+        update_price_stats()
+        self.always_eager = app.conf.task_always_eager
+        app.conf.task_always_eager = True
+
+    def tearDown(self) -> None:
+        app.conf.task_always_eager = self.always_eager
+        cache.clear()
+
+    def test_stats_roll_up_to_parents(self) -> None:
+        stats = build_price_stats()
+
+        self.assertEqual(set(stats), {ALL_CATEGORIES, self.parent.pk, self.phones.pk, self.tv.pk})
+        self.assertEqual((stats[self.phones.pk]["min"], stats[self.phones.pk]["max"]), (Decimal("499.5"), 1000))
+        self.assertEqual((stats[self.parent.pk]["min"], stats[self.parent.pk]["max"]), (Decimal("499.5"), 60000))
+        self.assertEqual(stats[self.parent.pk]["count"], 3)
+        self.assertEqual(stats[self.parent.pk]["delivery"], {"FREE": 2, "REGULAR": 1})
+
+    def test_histogram_ranges(self) -> None:
+        stats = get_price_stats(self.parent.pk)
+
+        self.assertEqual(get_range_count(stats, 0, 1000), 1)
+        self.assertEqual(get_range_count(stats, 1000, 5000), 1)
+        self.assertEqual(get_range_count(stats, 50000, None), 1)
+        self.assertEqual(sum(stats["buckets"].values()), 3)
+
+    def test_unknown_category(self) -> None:
+        self.assertIsNone(get_price_stats(10**6))
+        self.assertIsNone(get_price_stats("abc"))
+
+    def test_stats_follow_offer_changes(self) -> None:
+        self.assertEqual(get_price_stats(self.phones.pk)["max"], 1000)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.offers[1].price = 2500
+            self.offers[1].save()
+        self.assertEqual(get_price_stats(self.phones.pk)["max"], 2500)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.offers[0].remains = 0
+            self.offers[0].save()
+        self.assertEqual(get_price_stats(self.phones.pk)["min"], 2500)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.offers[1].delete()
+        self.assertIsNone(get_price_stats(self.phones.pk))
+
+    def test_request_reads_stored_stats(self) -> None:
+        # пересчет ставится в очередь после фиксации, до этого читается сохраненная статистика
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.offers[1].delete()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_price_stats(self.phones.pk)["count"], 2)
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(get_price_stats(self.phones.pk)["count"], 1)
+
+    def test_unfiltered_counts_without_offer_queries(self) -> None:
+        params = Params(category_id=str(self.parent.pk))
+
+        with self.assertNumQueries(0):
+            counts = get_offer_counts(params)
+
+        filtered = get_offer_counts(Params(category_id=str(self.parent.pk), title="item"))
+        self.assertEqual(counts, filtered)
+
+    def test_slider_bounds(self) -> None:
+        request = RequestFactory().get(reverse("catalog:index"), {"category_id": self.phones.pk})
+        context = CatalogListView.as_view()(request).context_data
+
+        self.assertEqual((context["price_min"], context["price_max"]), (499, 1000))
@@ -1,10 +1,11 @@
-from typing import List
+from typing import Dict, List
 
 from django.template.response import TemplateResponse
 from django.test import TestCase, RequestFactory
 from django.urls import reverse
 
 from catalog.tests.utils import (
+    create_offers,
     get_fixtures_list,
     # echo_sql,
 )
@@ -109,3 +110,29 @@ class SortTest(TestCase, SortChecker):
         result = [offer.product.manufacturer.modified_at for offer in response.context_data["object_list"]]
 
         self.check_sort(result, desc=True)
+
+
+class FamousSortTest(TestCase, SortChecker):
+    """Тесты сортировки по популярности"""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.path = reverse("catalog:index")
+        create_offers(*({"name": f"товар {popularity}", "popularity": popularity} for popularity in (5, 20, 0, 10)))
+
+    def setUp(self) -> None:
+        self.factory = RequestFactory()
+
+    def get_result(self, params: Dict[str, str]) -> List[int]:
+        request = self.factory.get(self.path, params)
+        response: TemplateResponse = CatalogListView.as_view()(request)
+        return [offer.product.popularity for offer in response.context_data["object_list"]]
+
+    def test_sort_by_famous_asc(self) -> None:
+        self.check_sort(self.get_result({"sort": "famous"}))
+
+    def test_sort_by_famous_desc(self) -> None:
+        self.check_sort(self.get_result({"sort": "famous", "desc": "on"}), desc=True)
+
+    def test_default_sort_is_famous_desc(self) -> None:
+        self.assertEqual(self.get_result({}), [20, 10, 5, 0])
@@ -0,0 +1,82 @@
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from catalog.models import OfferSummary
+from catalog.summary import refresh_offer_summary
+from catalog.tests.utils import create_offers
+from catalog.views import CatalogListView
+from products.models import Category, Tag
+from shops.models import Offer
+
+
+class OfferSummaryTest(TestCase):
+    """Тесты сводок предложений каталога"""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.parent = Category.objects.create(name="электроника")
+        cls.category = Category.objects.create(name="телефоны", parent=cls.parent)
+        [cls.offer] = create_offers({"name": "phone", "category": cls.category, "remains": 5})
+        cls.product = cls.offer.product
+
+    def test_summary_is_created(self) -> None:
+        summary = OfferSummary.objects.get(pk=self.offer.pk)
+
+        self.assertEqual(summary.name, "phone")
+        self.assertEqual(summary.category_name, "телефоны")
+        self.assertEqual(summary.category_path, self.category.path)
+        self.assertEqual(summary.manufacturer_modified_at, self.product.manufacturer.modified_at)
+
+    def test_summary_follows_changes(self) -> None:
+        tag = Tag.objects.create(name="новинка")
+        self.product.tags.add(tag)
+        self.product.name = "smartphone"
+        self.product.save()
+        self.offer.price = 200
+        self.offer.save()
+
+        summary = OfferSummary.objects.get(pk=self.offer.pk)
+        self.assertEqual((summary.name, summary.price, summary.tag_ids), ("smartphone", 200, [tag.pk]))
+
+    def test_out_of_stock_offer_is_filtered_at_query_time(self) -> None:
+        self.offer.remains = 0
+        self.offer.save()
+        self.assertEqual(OfferSummary.objects.get(pk=self.offer.pk).remains, 0)
+
+        request = RequestFactory().get(reverse("catalog:index"))
+        self.assertFalse(CatalogListView.as_view()(request).context_data["object_list"])
+
+    def test_inactive_offers_are_removed(self) -> None:
+        self.category.is_active = False
+        self.category.save()
+        self.assertFalse(OfferSummary.objects.exists())
+
+    def test_moved_category_path(self) -> None:
+        root = Category.objects.create(name="новый корень")
+        self.parent.parent = root
+        self.parent.save()
+
+        self.assertEqual(
+            OfferSummary.objects.get(pk=self.offer.pk).category_path, Category.objects.get(pk=self.category.pk).path
+        )
+
+    def test_refresh_without_signals(self) -> None:
+        Offer.objects.filter(pk=self.offer.pk).update(price=300)
+        OfferSummary.objects.all().delete()
+
+        self.assertEqual(refresh_offer_summary(), 1)
+        self.assertEqual(OfferSummary.objects.get(pk=self.offer.pk).price, 300)
+
+    def test_listing_queries_single_table(self) -> None:
+        request = RequestFactory().get(reverse("catalog:index"), {"category_id": self.parent.pk, "sort": "price"})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = CatalogListView.as_view()(request)
+            offers = list(response.context_data["object_list"])
+
+        self.assertEqual([offer.pk for offer in offers], [self.offer.pk])
+        listing = [query["sql"] for query in queries if 'FROM "catalog_offersummary"' in query["sql"]]
+        self.assertTrue(listing)
+        self.assertFalse([sql for sql in listing if "JOIN" in sql and "products_product_tags" not in sql])
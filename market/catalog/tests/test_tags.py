@@ -0,0 +1,102 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from catalog import tag_index
+from catalog.common import MAX_TAG_IDS, parse_tag_ids
+from catalog.models import OfferSummary
+from catalog.tag_index import TAG_CACHE_KEY, get_tag_filter, get_version
+from catalog.tests.utils import create_offers
+from catalog.utils import Filter, Params
+from products.models import Tag
+
+
+class TagFilterTest(TestCase):
+    """Тесты фильтрации каталога по нескольким тегам"""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        # pk тегов подобраны так, что строка одного является подстрокой другого
+        cls.tag = Tag.objects.create(pk=901, name="tag")
+        cls.other_tag = Tag.objects.create(pk=9010, name="other")
+
+        tags = {"first": [cls.tag], "second": [cls.other_tag], "both": [cls.tag, cls.other_tag]}
+        offers = create_offers(*({"name": name, "tags": value, "remains": 1} for name, value in tags.items()))
+        cls.offers = {offer.product.name: offer for offer in offers}
+
+    def setUp(self) -> None:
+        cache.clear()
+        tag_index._local.update(version=None, tags={})
+
+    def tearDown(self) -> None:
+        cache.clear()
+
+    def get_offers(self, **params) -> set:
+        queryset = Filter(Params(**params)).filter_tags(OfferSummary.objects.filter(remains__gt=0))
+        return {summary.name for summary in queryset}
+
+    def test_exact_tag(self) -> None:
+        self.assertEqual(self.get_offers(tag_id=str(self.tag.pk)), {"first", "both"})
+
+    def test_all_tags(self) -> None:
+        self.assertEqual(self.get_offers(tag_id=f"{self.tag.pk},{self.other_tag.pk}"), {"both"})
+
+    def test_any_tag(self) -> None:
+        tag_id = f"{self.tag.pk},{self.other_tag.pk}"
+        self.assertEqual(self.get_offers(tag_id=tag_id, tag_op="or"), {"first", "second", "both"})
+
+    def test_index_follows_tag_changes(self) -> None:
+        self.assertEqual(self.get_offers(tag_id=str(self.other_tag.pk)), {"second", "both"})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.offers["first"].product.tags.add(self.other_tag)
+        self.assertEqual(self.get_offers(tag_id=str(self.other_tag.pk)), {"first", "second", "both"})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.offers["both"].remains = 0
+            self.offers["both"].save()
+        self.assertEqual(self.get_offers(tag_id=str(self.other_tag.pk)), {"first", "second"})
+
+    def test_deleted_tag(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other_tag.delete()
+
+        self.assertEqual(self.get_offers(tag_id="9010"), set())
+        self.assertFalse(OfferSummary.objects.filter(tag_ids__contains=[9010]).exists())
+
+    def test_small_result_uses_ids(self) -> None:
+        self.assertEqual(get_tag_filter([self.tag.pk]), {"pk__in": [self.offers["first"].pk, self.offers["both"].pk]})
+
+    def test_only_requested_tags_are_loaded(self) -> None:
+        get_tag_filter([self.tag.pk])
+        version = get_version()
+
+        self.assertEqual(list(tag_index._local["tags"]), [self.tag.pk])
+        self.assertIsNotNone(cache.get(TAG_CACHE_KEY.format(version=version, tag_id=self.tag.pk)))
+        self.assertIsNone(cache.get(TAG_CACHE_KEY.format(version=version, tag_id=self.other_tag.pk)))
+
+        # теги, уже загруженные в память процесса, не запрашиваются из кэша и БД
+        with self.assertNumQueries(0):
+            get_tag_filter([self.tag.pk])
+
+    def test_unknown_tags_are_not_built(self) -> None:
+        unknown = 10**6
+
+        self.assertEqual(get_tag_filter([self.tag.pk, unknown]), {"pk__in": []})
+        self.assertEqual(
+            get_tag_filter([self.tag.pk, unknown], any_=True),
+            {"pk__in": [self.offers["first"].pk, self.offers["both"].pk]},
+        )
+        self.assertNotIn(unknown, tag_index._local["tags"])
+        self.assertIsNone(cache.get(TAG_CACHE_KEY.format(version=get_version(), tag_id=unknown)))
+
+    def test_tag_ids_are_capped(self) -> None:
+        tag_ids = parse_tag_ids(",".join(map(str, range(1, 100001))))
+
+        self.assertEqual(tag_ids, list(range(1, MAX_TAG_IDS + 1)))
+
+    @patch("catalog.tag_index.MAX_IDS", 1)
+    def test_large_result_uses_array_filter(self) -> None:
+        self.assertEqual(get_tag_filter([self.tag.pk]), {"tag_ids__contains": [self.tag.pk]})
+        self.assertEqual(get_tag_filter([self.tag.pk], any_=True), {"tag_ids__overlap": [self.tag.pk]})
@@ -1,10 +1,22 @@
 from contextlib import suppress
+from itertools import count
 from pathlib import Path
-from typing import List, Callable
+from typing import Any, Dict, List, Callable
 from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.db import connection
 from django.test.utils import CaptureQueriesContext
 
+from products.models import Category, Manufacturer, Product
+from shops.models import Offer, Shop
+
+User = get_user_model()
+
+# Поля элемента create_offers, которые относятся к предложению, остальные - поля товара
+OFFER_FIELDS = ("price", "remains", "delivery_method")
+
+_users = count()
+
 
 def get_fixtures_list() -> List[str]:
     base_dir: Path = settings.BASE_DIR
@@ -24,3 +36,46 @@ def echo_sql(func) -> Callable:
         return
 
     return wrap
+
+
+def create_shop() -> Shop:
+    """Функция создания продавца с магазином для тестов каталога"""
+    number = next(_users)
+    user = User.objects.create(username=f"test_catalog_user_{number}", email=f"catalog_{number}@mail.com")
+
+    return Shop.objects.create(user=user, name="магазин")
+
+
+def create_offers(
+    *items: Dict[str, Any],
+    shop: Shop | None = None,
+    manufacturer: Manufacturer | None = None,
+    category: Category | None = None,
+) -> List[Offer]:
+    """
+    Функция создания предложений каталога для тестов, по одному товару на каждый элемент items.
+    В элементе задаются поля товара (name, category, about, popularity, preview, tags) и предложения
+    (price, remains, delivery_method). Не заданные магазин, производитель и категория создаются один раз на вызов.
+    """
+    shop = shop or create_shop()
+    manufacturer = manufacturer or Manufacturer.objects.create(name="производитель")
+    offers = []
+
+    for number, item in enumerate(items):
+        fields = dict(item)
+        offer_fields = {"price": 100, "remains": 10, **{key: fields.pop(key) for key in OFFER_FIELDS if key in fields}}
+        tags = fields.pop("tags", None)
+
+        if "category" not in fields:
+            category = category or Category.objects.create(name="категория")
+            fields["category"] = category
+
+        fields.setdefault("name", f"товар {number}")
+        product = Product.objects.create(manufacturer=manufacturer, **fields)
+
+        if tags:
+            product.tags.set(tags)
+
+        offers.append(Offer.objects.create(shop=shop, product=product, **offer_fields))
+
+    return offers
@@ -1,9 +1,10 @@
 from django.urls import path
 
-from .views import CatalogHomeView
+from .views import AutocompleteView, CatalogHomeView
 
 app_name = "catalog"
 
 urlpatterns = [
     path("", CatalogHomeView.as_view(), name="index"),
+    path("autocomplete/", AutocompleteView.as_view(), name="autocomplete"),
 ]
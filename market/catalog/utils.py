@@ -1,9 +1,12 @@
-from typing import Tuple, Any, Dict, Generator, List
+import hashlib
+from typing import Tuple, Any, Dict, Generator, Iterable, List
 
-from django.db.models import QuerySet, Count, F, Q
+from django.db.models import QuerySet, F
 from django.utils.translation import gettext as _
-from catalog.common import parse_price
+from catalog.common import parse_price, parse_tag_ids
+from catalog.tag_index import get_tag_filter
 from products.models import Category
+from products.services.search_services import search_products
 
 
 class Params:
@@ -61,6 +64,44 @@ class Params:
         """Преобразование в словарь"""
         return self.__items
 
+    def normalize(self, keys: Iterable[str] | None = None) -> "Params":
+        """
+        Нормализованная копия параметров: без пустых значений, с ключами по алфавиту,
+        схлопнутыми пробелами в строках и ценой в едином формате (некорректная цена отбрасывается).
+        Если заданы keys, то остаются только эти ключи.
+        """
+        items = {}
+
+        for key in sorted(self.__items):
+            if keys is not None and key not in keys:
+                continue
+
+            value = self.__items[key]
+
+            if isinstance(value, str):
+                value = " ".join(value.split())
+
+            if key == "price":
+                prices = parse_price(value)
+                value = "%s;%s" % prices if prices else None
+
+            if key == "tag_id":
+                value = ",".join(map(str, parse_tag_ids(value)))
+
+            if value:
+                items[key] = value
+
+        return Params(**items)
+
+    def cache_key(self, prefix: str, keys: Iterable[str] | None = None, version: int | None = None) -> str:
+        """Ключ кэша для нормализованных параметров"""
+        digest = hashlib.md5(self.normalize(keys).to_string().encode("utf-8")).hexdigest()
+
+        if version is not None:
+            return f"{prefix}:{version}:{digest}"
+
+        return f"{prefix}:{digest}"
+
     def to_string(self, first_char: str | None = None) -> str:
         """Преобразование в словарь"""
         if self:
@@ -102,7 +143,7 @@ class Params:
 
 
 class Filter:
-    """Класс для фильтрации"""
+    """Класс для фильтрации сводок предложений каталога (catalog.models.OfferSummary)"""
 
     def __init__(self, params: Params) -> None:
         self.params = params
@@ -126,31 +167,13 @@ class Filter:
 
         return {field: "FREE"}
 
-    def __product_search_filter(
-        self,
-        value: str,
-        fields: List[str] | Tuple[str, str] | None = None,
-    ) -> Q:
-        """Фильтр по товару"""
-        if not fields:
-            fields = "about", "name"
-
-        return Q(**{f"product__{fields[0]}__contains": value}) | Q(**{f"product__{fields[1]}__contains": value})
-
-    def __category_available_filter(self) -> Dict[str, bool]:
-        """Фильтр доступности категории"""
-        return {
-            "product__category__is_active": True,
-            "product__category__archived": False,
-        }
-
     def __category_filter(self, value: str) -> Dict[str, Any]:
-        """Фильтр по категории"""
-        categories = Category.objects.filter(parent=Category.objects.get(pk=value))
+        """Фильтр по категории и всем её потомкам (префикс материализованного пути)"""
+        path = Category.objects.filter(pk=value).values_list("path", flat=True).first()
 
-        if categories:
-            return {"product__category__pk__in": [str(category.pk) for category in categories]}
-        return {"product__category__pk": value}
+        if path:
+            return {"category_path__startswith": path}
+        return {"category_id": value}
 
     def __remain_filter(self, field: str | None = None) -> Dict[str, int]:
         """Фильтр по остатку"""
@@ -159,12 +182,17 @@ class Filter:
 
         return {f"{field}__gte": 1}
 
-    def __tag_filter(self, value: str, field: str | None = None) -> Dict[str, str]:
-        """Фильтр по тегам"""
-        if not field:
-            field = "product__tags__pk__contains"
+    def __tag_filter(self, value: str, operator: str | None = None) -> Dict[str, Any]:
+        """
+        Фильтр по тегам "1,2,3": предложения со всеми тегами или, если operator = "or", с любым из них.
+        Пересечение тегов вычисляется по спискам pk индекса тегов (catalog.tag_index).
+        """
+        tag_ids = parse_tag_ids(value)
+
+        if not tag_ids:
+            return {"pk__in": []}
 
-        return {field: value}
+        return get_tag_filter(tag_ids, any_=operator == "or")
 
     def filter_offer(self, queryset: QuerySet) -> QuerySet:
         """Фильтрация заказа"""
@@ -187,19 +215,22 @@ class Filter:
 
         return queryset.filter(**filter_)
 
-    def filter_prodict(self, queryset: QuerySet) -> QuerySet:
-        """Фильтрация товара"""
-        filter_args = []
+    @property
+    def search_value(self) -> str | None:
+        """Строка поиска товара"""
+        return self.params.get("title", self.params.get("search"))
 
-        search_or_title_value = self.params.get("title", self.params.get("search"))
+    def filter_prodict(self, queryset: QuerySet) -> QuerySet:
+        """Фильтрация товара (полнотекстовый поиск с рангом search_rank)"""
+        search_or_title_value = self.search_value
 
         if search_or_title_value:
-            filter_args.append(self.__product_search_filter(search_or_title_value))
+            return search_products(queryset, search_or_title_value)
 
-        return queryset.filter(*filter_args)
+        return queryset
 
     def filter_category(self, queryset: QuerySet) -> QuerySet:
-        """Фильтрация категории"""
+        """Фильтрация категории (сводки есть только у предложений активных категорий)"""
         filter_: Dict[str, Any] = {}
 
         category_id = self.params.get("category_id")
@@ -207,8 +238,6 @@ class Filter:
         if category_id:
             filter_.update(self.__category_filter(category_id))
 
-        filter_.update(self.__category_available_filter())
-
         return queryset.filter(**filter_)
 
     def filter_tags(self, queryset: QuerySet) -> QuerySet:
@@ -218,13 +247,13 @@ class Filter:
         tag_id = self.params.get("tag_id")
 
         if tag_id:
-            filter_.update(self.__tag_filter(tag_id))
+            filter_.update(self.__tag_filter(tag_id, self.params.get("tag_op")))
 
         return queryset.filter(**filter_)
 
 
 class Sorter:
-    """Класс для сортировки"""
+    """Класс для сортировки сводок предложений каталога (catalog.models.OfferSummary)"""
 
     default_sort = "pk"
 
@@ -263,9 +292,21 @@ class Sorter:
         if sort == "recency":
             return self._sort_by_recency(queryset, desc)
 
+        if sort == "rank":
+            return self._sort_by_rank(queryset)
+
+    def _sort_by_rank(self, queryset: QuerySet) -> QuerySet:
+        """Сортировка по релевантности поиска (search_rank добавляет Filter.filter_prodict)"""
+        return queryset.order_by(F("search_rank").desc(), self.default_sort)
+
     def _sort_by_famous(self, queryset: QuerySet, desc: str) -> QuerySet:
-        """Сортировки по популярности"""
-        return queryset.order_by(self.default_sort)  # fix: добавить сортировку по популярности
+        """Сортировки по популярности (Product.popularity обновляется задачей update_products_popularity)"""
+        if desc == "on":
+            param = F("popularity").desc()
+        else:
+            param = F("popularity").asc()
+
+        return queryset.order_by(param, self.default_sort)
 
     def _sort_by_price(self, queryset: QuerySet, desc: str) -> QuerySet:
         """Сортировки по цене"""
@@ -283,13 +324,14 @@ class Sorter:
         else:
             param = F("review_count").asc()
 
-        return queryset.annotate(review_count=Count(F("product__review"))).order_by(param)
+        # Product.review_count поддерживается сигналами и действиями админки, см. update_review_count
+        return queryset.order_by(param)
 
     def _sort_by_recency(self, queryset: QuerySet, desc: str) -> QuerySet:
         """Сортировки по новизне"""
         if desc == "on":
-            param = F("product__manufacturer__modified_at").desc()
+            param = F("manufacturer_modified_at").desc()
         else:
-            param = F("product__manufacturer__modified_at").asc()
+            param = F("manufacturer_modified_at").asc()
 
         return queryset.order_by(param)
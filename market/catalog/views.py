@@ -1,24 +1,40 @@
 from typing import Any, Dict
-from django.db.models import QuerySet, Prefetch
-from django.http import HttpRequest, HttpResponse
+from django.core.cache import cache
+from django.db.models import QuerySet
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.middleware.csrf import get_token
 from django.shortcuts import redirect
+from django.template.loader import render_to_string
 from django.urls import reverse
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
 from django.views import View
 from django.views.generic import ListView
 
+from catalog.caching import (
+    CSRF_PLACEHOLDER,
+    PAGE_CACHE_PREFIX,
+    PAGE_CACHE_TIMEOUT,
+    PAGE_PARAMS,
+    get_catalog_cache_key,
+)
 from catalog.context import CatalogContextProcessor
+from catalog.instrumentation import InstrumentedTemplateResponse, Measurement
+from catalog.pagination import CatalogPaginator, KeysetPaginator, get_cached_count
 from catalog.utils import Params
 from catalog.forms import CatalogFilterForm
-from products.models import Tag
-from shops.models import Offer
-from site_settings.models import SiteSettings
+from catalog.models import OfferSummary
+from products.services.autocomplete_services import autocomplete
+from site_settings.models import PaginationMode, SiteSettings
 
 
 class CatalogListView(ListView):
     """Страница каталога товаров"""
 
     template_name = "catalog/catalog.jinja2"
+    content_template_name = "catalog/catalog_content.jinja2"
     context_object_name = "object_list"
+    response_class = InstrumentedTemplateResponse
 
     @property
     def site_settings(self) -> SiteSettings:
@@ -26,7 +42,9 @@ class CatalogListView(ListView):
         return SiteSettings.load()
 
     def get_queryset(self) -> QuerySet:
-        """Создание запроса"""
+        """
+        Создание запроса к сводкам предложений с остатком, список каталога выбирается без соединений
+        """
         fields = [
             "pk",
             "price",
@@ -34,34 +52,17 @@ class CatalogListView(ListView):
             "product_id",
             "remains",
             "delivery_method",
-            "product__name",
-            "product__about",
-            "product__preview",
-            "product__review",
-            "product__manufacturer",
-            "product__manufacturer__modified_at",
-            "product__manufacturer__archived",
-            "product__category",
-            "product__category__name",
-            "product__category__is_active",
-            "product__category__archived",
-        ]
-        select_related_fields = [
-            "product",
-            "product__manufacturer",
-            "product__category",
-            "shop",
+            "name",
+            "about",
+            "preview",
+            "category_id",
+            "category_name",
         ]
 
-        queryset = Offer.objects.select_related(*select_related_fields).filter(remains__gt=0)
+        queryset = OfferSummary.objects.filter(remains__gt=0)
         params = Params(**self.request.GET.dict())
         context_proc = CatalogContextProcessor(self.request, {}, params, self.site_settings)
 
-        tag_id = params.get("tag_id")
-
-        if tag_id:
-            queryset = queryset.prefetch_related(self.__get_tags_prefetch(tag_id))
-
         queryset = self._filter(queryset, context_proc)
         queryset = self._sort(queryset, context_proc)
 
@@ -71,11 +72,22 @@ class CatalogListView(ListView):
         """Получение лимита пагинации"""
         return self.site_settings.paginate_by
 
-    def __get_tags_prefetch(self, tag_id: str) -> Prefetch:
-        """Получение тегов"""
-        fields = ["pk", "name"]
-        queryset = Tag.objects.filter(pk=tag_id).only(*fields)
-        return Prefetch("product__tags", queryset=queryset)
+    def get_paginator(self, queryset: QuerySet, per_page: int, **kwargs) -> CatalogPaginator:
+        """
+        Получение пагинатора. Количество товаров берется из кэша.
+        В режиме keyset страницы выбираются по ключу соседней страницы (параметры after и before),
+        ссылки на страницы без ключа (кроме первой) обрабатываются пагинацией по номеру страницы.
+        """
+        params = Params(**self.request.GET.dict())
+        count = get_cached_count(queryset, params)
+
+        if self.site_settings.pagination_mode == PaginationMode.KEYSET:
+            after, before = params.get("after"), params.get("before")
+
+            if after or before or params.get("page", "1") == "1":
+                return KeysetPaginator(queryset, per_page, count, after=after, before=before, **kwargs)
+
+        return CatalogPaginator(queryset, per_page, count, **kwargs)
 
     def _filter(self, queryset: QuerySet, proc: CatalogContextProcessor) -> QuerySet:
         """Фильтрация запроса"""
@@ -88,12 +100,84 @@ class CatalogListView(ListView):
         """Сортировка запроса"""
         sort_ = proc.params.get("sort")
         desc_ = proc.params.get("desc")
+
+        if sort_ == "rank" and not proc.filter.search_value:
+            # ранг search_rank есть только у результатов поиска
+            sort_ = None
+
+        if not sort_ and proc.filter.search_value:
+            # результаты поиска без явно выбранной сортировки упорядочиваются по релевантности
+            sort_ = "rank"
+
+        if not sort_:
+            sort_ = self.site_settings.default_sort_type
+            desc_ = desc_ or self.site_settings.default_sort_desc
+
         return proc.sorter.sort(self.site_settings.default_sort, queryset, sort_, desc_)
 
+    def get(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        """
+        Обработка GET запроса с записью статистики SQL запросов и времени обработки (catalog.instrumentation).
+        Статистика сохраняется после рендеринга шаблона ответа.
+        """
+        measurement = Measurement(Params(**request.GET.dict()))
+
+        with measurement.measure("view"):
+            response = self.get_response(request, *args, **kwargs)
+
+        if isinstance(response, InstrumentedTemplateResponse):
+            response.measurement = measurement
+
+        return response
+
+    def get_response(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        """
+        Формирование ответа на GET запрос.
+        Для анонимных пользователей список товаров с сортировкой и пагинацией (catalog_content)
+        берется из кэша, запрос предложений при этом не выполняется. CSRF токены форм фрагмента
+        кэшируются заполнителем и заменяются токеном текущего запроса.
+        """
+        user = getattr(request, "user", None)
+
+        if user is None or not user.is_anonymous:
+            return super().get(request, *args, **kwargs)
+
+        cache_key = self.get_page_cache_key()
+        content = cache.get(cache_key)
+        # запрос ленивый и выполняется только при построении фрагмента
+        self.object_list = self.get_queryset()
+
+        if content is None:
+            context = self.get_context_data()
+            content = render_to_string(
+                self.content_template_name,
+                {**context, "request": request, "csrf_token": CSRF_PLACEHOLDER},
+            )
+            cache.set(cache_key, content, timeout=PAGE_CACHE_TIMEOUT)
+        else:
+            context = self.get_catalog_context({"view": self})
+
+        context["catalog_content"] = mark_safe(content.replace(CSRF_PLACEHOLDER, get_token(request)))
+
+        return self.render_to_response(context)
+
+    def get_page_cache_key(self) -> str:
+        """Ключ кэша страницы по нормализованным параметрам (первая страница без номера)"""
+        params = Params(**self.request.GET.dict())
+
+        if params.get("page") == "1":
+            params.pop("page")
+
+        return get_catalog_cache_key(f"{PAGE_CACHE_PREFIX}:{get_language()}", params, PAGE_PARAMS)
+
     def get_context_data(self, *, object_list=None, **kwargs) -> Dict[str, Any]:
         """Формирование контекста"""
         context = super().get_context_data(object_list=object_list, **kwargs)
 
+        return self.get_catalog_context(context, pagination=True)
+
+    def get_catalog_context(self, context: Dict[str, Any], pagination: bool = False) -> Dict[str, Any]:
+        """Формирование контекста фильтра, фасетов и сортировки (и пагинации, если pagination)"""
         context_proc = CatalogContextProcessor(
             self.request,
             context,
@@ -101,7 +185,11 @@ class CatalogListView(ListView):
             self.site_settings,
         )
         context_proc.set_filter_context()
-        context_proc.set_pagination_context()
+
+        if pagination:
+            context_proc.set_pagination_context()
+
+        context_proc.set_facets_context()
         context_proc.set_context()
 
         return context_proc.context
@@ -149,3 +237,24 @@ class CatalogHomeView(View):
         """Обработка POST запроса"""
         view = CatalogFilteredView.as_view()
         return view(request, *args, **kwargs)
+
+
+class AutocompleteView(View):
+    """Подсказки строки поиска"""
+
+    default_limit = 10
+    max_limit = 50
+
+    def get(self, request: HttpRequest, *args, **kwargs) -> JsonResponse:
+        """Обработка GET запроса. Количество подсказок limit ограничено max_limit, limit < 1 - ошибка запроса"""
+        query = request.GET.get("q", "")
+
+        try:
+            limit = int(request.GET.get("limit", self.default_limit))
+        except ValueError:
+            limit = self.default_limit
+
+        if limit < 1:
+            return JsonResponse({"error": "limit должен быть положительным числом"}, status=400)
+
+        return JsonResponse({"query": query, "results": autocomplete(query, min(limit, self.max_limit))})
@@ -28,6 +28,28 @@ app.conf.beat_schedule = {
         "task": "discount.tasks.update_discount_status",
         "schedule": crontab(minute=0, hour=0),
     },
+    "update-products-popularity-every-15-minutes": {
+        "task": "products.tasks.update_products_popularity",
+        "schedule": crontab(minute="*/15"),
+    },
+    "recalculate-products-popularity-every-night": {
+        "task": "products.tasks.update_products_popularity",
+        "schedule": crontab(minute=30, hour=3),
+        "kwargs": {"full": True},
+    },
+    "update-tags-rating-every-hour": {
+        "task": "products.tasks.update_tags_rating",
+        "schedule": crontab(minute=20),
+    },
+    "update-catalog-price-stats-every-hour": {
+        "task": "catalog.tasks.update_catalog_price_stats",
+        "schedule": crontab(minute=40),
+    },
+    "rebuild-autocomplete-index-every-night": {
+        "task": "products.tasks.update_autocomplete_index",
+        "schedule": crontab(minute=45, hour=3),
+        "kwargs": {"full": True},
+    },
 }
 
 # Load task modules from all registered Django apps.
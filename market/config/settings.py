@@ -161,6 +161,9 @@ CACHES = {
     }
 }
 
+# Статистика запросов страницы каталога (catalog.instrumentation, команда catalog_slow_queries)
+CATALOG_INSTRUMENTATION = True
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -262,3 +265,9 @@ EMAIL_HOST_PASSWORD = config["EMAIL_HOST_PASSWORD"]
 
 # Set the import folder for importadata app
 IMPORT_FOLDER = "import_folder"
+# Import lease timeout, renewed on every progress update
+IMPORT_LEASE_TIMEOUT = 60 * 10
+# Number of threads copying product images during import
+IMPORT_IMAGE_WORKERS = 4
+# Number of processes validating upcoming batches during batched import, 0 - validate inline
+IMPORT_VALIDATION_WORKERS = 0
@@ -1,20 +1,39 @@
-from typing import List
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List
 
 from django.core.cache import cache
 from django.http import HttpRequest
+from django.template.loader import render_to_string
+from django.utils.functional import SimpleLazyObject, lazy
+from django.utils.safestring import SafeString, mark_safe
+from django.utils.translation import get_language
 
 from products.models import Category
 from site_settings.models import SiteSettings
 
 
-def get_categories_list(request: HttpRequest) -> List[Category]:
-    """Получение списка категорий"""
+CATEGORIES_CACHE_KEY = "categories_data_export"
+MENU_VERSION_CACHE_KEY = "categories_menu_version"
+MENU_CACHE_KEY = "categories_menu"
+MENU_HTML_CACHE_KEY = "categories_menu_html:{language}"
+
+MENU_TEMPLATE_NAME = "menu_items.jinja2"
+
+
+def get_categories_cache_timeout(request: HttpRequest) -> int:
+    """Время кэширования категорий из настроек сайта"""
     try:
-        timeout = request.site_settings.categories_list_cache_timeout
+        return request.site_settings.categories_list_cache_timeout
     except AttributeError:
-        timeout = SiteSettings.load().categories_list_cache_timeout
+        return SiteSettings.load().categories_list_cache_timeout
+
+
+def get_categories_list(request: HttpRequest) -> List[Category]:
+    """Получение списка категорий"""
+    timeout = get_categories_cache_timeout(request)
 
-    cache_key = "categories_data_export"
+    cache_key = CATEGORIES_CACHE_KEY
     categories_list = cache.get(cache_key)
 
     if categories_list is None:
@@ -24,25 +43,78 @@ def get_categories_list(request: HttpRequest) -> List[Category]:
     return categories_list
 
 
-def categories_menu(request: HttpRequest):
+def invalidate_menu_cache() -> None:
     """
-    Контекстный процессор добавления дерева Категорий в список 'context_processors'
-    с оптимизацией кеширования данных
+    Сброс кэша категорий и меню. Меню сбрасывается сменой версии,
+    записи прежней версии не используются и вытесняются по таймауту.
+    """
+    cache.delete(CATEGORIES_CACHE_KEY)
 
-    doc: https://docs.djangoproject.com/en/4.2/ref/templates/api/#writing-your-own-context-processors
+    try:
+        cache.incr(MENU_VERSION_CACHE_KEY)
+    except ValueError:
+        cache.add(MENU_VERSION_CACHE_KEY, int(time.time() * 1000), timeout=None)
+
+
+def get_versioned(request: HttpRequest, cache_key: str, build: Callable[[], Any]) -> Any:
+    """
+    Значение из кэша с проверкой версии меню. Версия и значение читаются одним обращением к кэшу,
+    значение хранится вместе с версией, для которой оно построено.
     """
-    categories_list = get_categories_list(request)
+    values = cache.get_many([MENU_VERSION_CACHE_KEY, cache_key])
+    version = values.get(MENU_VERSION_CACHE_KEY)
+    entry = values.get(cache_key)
 
-    def menu(objects, parent=None):
-        """Функция создания дерева Категорий"""
+    if version is not None and entry is not None and entry[0] == version:
+        return entry[1]
 
-        _menu = []
+    if version is None:
+        cache.add(MENU_VERSION_CACHE_KEY, int(time.time() * 1000), timeout=None)
+        version = cache.get(MENU_VERSION_CACHE_KEY)
 
-        for category in objects:
-            if category.parent == parent:
-                submenu = menu(objects, category)
-                _menu.append({"category": category, "submenu": submenu})
+    value = build()
+    cache.set(cache_key, (version, value), timeout=get_categories_cache_timeout(request))
 
-        return _menu
+    return value
 
-    return {"menu": menu(categories_list)}
+
+def build_menu(categories_list: List[Category]) -> List[Dict[str, Any]]:
+    """Построение дерева Категорий, каждая категория просматривается один раз"""
+    children = defaultdict(list)
+
+    for category in categories_list:
+        children[category.parent_id].append(category)
+
+    def menu(parent_id=None):
+        return [{"category": category, "submenu": menu(category.pk)} for category in children[parent_id]]
+
+    return menu()
+
+
+def get_menu(request: HttpRequest) -> List[Dict[str, Any]]:
+    """Дерево Категорий из кэша"""
+    return get_versioned(request, MENU_CACHE_KEY, lambda: build_menu(get_categories_list(request)))
+
+
+def get_menu_html(request: HttpRequest, language: str) -> SafeString:
+    """HTML дерева Категорий из кэша, ссылки меню зависят от языка"""
+    html = get_versioned(
+        request,
+        MENU_HTML_CACHE_KEY.format(language=language),
+        lambda: render_to_string(MENU_TEMPLATE_NAME, {"menu": get_menu(request)}),
+    )
+    return mark_safe(html)
+
+
+def categories_menu(request: HttpRequest):
+    """
+    Контекстный процессор добавления дерева Категорий в список 'context_processors'
+    с оптимизацией кеширования данных.
+    Дерево (menu) и его HTML (menu_html) вычисляются лениво, только в шаблонах, которые их выводят.
+
+    doc: https://docs.djangoproject.com/en/4.2/ref/templates/api/#writing-your-own-context-processors
+    """
+    return {
+        "menu": SimpleLazyObject(lambda: get_menu(request)),
+        "menu_html": lazy(get_menu_html, SafeString)(request, get_language()),
+    }
@@ -0,0 +1,114 @@
+import json
+import random
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from django.db import connection
+
+
+BENCH_PREFIX: str = "bench"
+
+
+class FeedGenerator:
+    """
+    Генератор синтетического файла импорта, соответствующего ProductBaseModel.
+    Данные продукта зависят только от seed и номера продукта, поэтому
+    продукт можно сгенерировать повторно (например, для предварительной загрузки).
+    """
+
+    def __init__(
+        self,
+        shop: str,
+        preview: str,
+        tags: int = 3,
+        tag_pool: int = 100,
+        details: int = 5,
+        detail_pool: int = 50,
+        categories: int = 20,
+        category_depth: int = 2,
+        manufacturers: int = 20,
+        seed: int = 0,
+    ) -> None:
+        self.shop = shop
+        self.preview = preview
+        self.tags = min(tags, tag_pool)
+        self.tag_pool = tag_pool
+        self.details = min(details, detail_pool)
+        self.detail_pool = detail_pool
+        self.categories = categories
+        self.category_depth = category_depth
+        self.manufacturers = manufacturers
+        self.seed = seed
+
+    def category(self, number: int) -> Dict[str, Optional[str]]:
+        """
+        Категория продукта. При глубине 2 у каждой категории есть родительская категория.
+        """
+        category = {"category": "%s category %d" % (BENCH_PREFIX, number), "cat_slug": "bench-category-%d" % number}
+        if self.category_depth > 1:
+            parent = number % max(self.categories // 5, 1)
+            category.update(subcategory="%s group %d" % (BENCH_PREFIX, parent), sub_slug="bench-group-%d" % parent)
+        return category
+
+    def product(self, number: int) -> Dict[str, Any]:
+        rnd = random.Random("%s:%d" % (self.seed, number))
+        manufacturer = rnd.randrange(self.manufacturers)
+
+        return {
+            "shop": self.shop,
+            "name": "%s product %d" % (BENCH_PREFIX, number),
+            "about": "about product %d" % number,
+            "description": "description of product %d " % number * 4,
+            "preview": self.preview,
+            "tags": ["%s tag %d" % (BENCH_PREFIX, tag) for tag in rnd.sample(range(self.tag_pool), self.tags)],
+            "offer": {
+                "price": "%d.%02d" % (rnd.randint(1, 10000), rnd.randrange(100)),
+                "quantity": rnd.randint(1, 50),
+            },
+            "details": [
+                {"name": "%s detail %d" % (BENCH_PREFIX, detail), "value": "value %d" % rnd.randrange(1000)}
+                for detail in rnd.sample(range(self.detail_pool), self.details)
+            ],
+            "manufacturer": {
+                "name": "%s manufacturer %d" % (BENCH_PREFIX, manufacturer),
+                "slug": "bench-%d" % manufacturer,
+            },
+            "category": self.category(rnd.randrange(self.categories)),
+        }
+
+    def products(self, count: int, start: int = 0) -> Iterator[Dict[str, Any]]:
+        for number in range(start, start + count):
+            yield self.product(number)
+
+    def write(self, file_path: str, count: int) -> None:
+        """
+        Запись файла импорта из count продуктов. Продукты пишутся по одному,
+        поэтому размер файла не ограничен памятью.
+        """
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write("[")
+            for number, product in enumerate(self.products(count)):
+                if number:
+                    f.write(",\n")
+                json.dump(product, f, ensure_ascii=False)
+            f.write("]")
+
+
+class QueryCounter:
+    """
+    Подсчет запросов к БД без сохранения их текста.
+    """
+
+    def __init__(self) -> None:
+        self.count: int = 0
+
+    def __call__(self, execute: Callable, sql: str, params: Any, many: bool, context: Dict[str, Any]) -> Any:
+        self.count += 1
+        return execute(sql, params, many, context)
+
+    def __enter__(self) -> "QueryCounter":
+        self._wrapper = connection.execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self._wrapper.__exit__(*args)
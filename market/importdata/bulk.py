@@ -0,0 +1,707 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from celery.utils.log import get_task_logger
+from django.conf import settings
+from django.db import connection, transaction, IntegrityError
+from django.db.models import Q
+from pydantic import ValidationError
+
+from catalog.summary import refresh_offer_summary
+from products.models import Product, ProductDetail, ProductImage, Detail, Manufacturer, Category, Tag
+from products.services.search_services import SEARCH_FIELDS, update_search_vector
+from shops.models import Offer, Shop
+from importdata.images import ImageStore, is_content_addressed
+from importdata.models import ProductFingerprint
+from importdata.readers import RecordError, record_validator, with_offset
+from importdata.services import (
+    ProductBaseModel,
+    detail_must_be_unique_validator,
+    parse_img_name_and_validate,
+    product_fingerprint,
+)
+
+
+logger = get_task_logger(__name__)
+
+DEFAULT_BATCH_SIZE: int = 500
+
+PRODUCT_UPDATE_FIELDS: List[str] = ["category", "manufacturer", "about", "description"]
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    """
+    Разбиение последовательности на списки заданного размера.
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def validate_record(
+    product_data: Dict[str, Any]
+) -> Tuple[Optional[ProductBaseModel], Optional[Tuple], Optional[Exception]]:
+    """
+    Валидация записи файла импорта без обращения к БД.
+    Возвращает модель продукта, название и путь изображения или ошибку валидации.
+    """
+    try:
+        record_validator(product_data)
+        obj: ProductBaseModel = ProductBaseModel(**product_data)
+        detail_must_be_unique_validator(obj.details)
+        img = parse_img_name_and_validate(obj.preview)
+
+    except (ValidationError, ValueError, FileNotFoundError) as e:
+        return None, None, e
+
+    return obj, img, None
+
+
+def validate_chunk(batch: List[Dict[str, Any]]) -> List[Tuple]:
+    """
+    Валидация пачки записей. Выполняется в процессах пула валидации.
+    """
+    return [validate_record(product_data) for product_data in batch]
+
+
+class BulkLoader:
+    """
+    Пакетный импорт продуктов.
+    Магазины, производители, теги, категории и свойства всей пачки получаются
+    несколькими запросами с IN, продукты, их свойства и предложения записываются
+    через bulk_create/bulk_update.
+    Если задан workers, то валидация следующих пачек выполняется в пуле процессов,
+    пока текущая пачка записывается в БД.
+    Для каждого продукта сохраняется отпечаток его данных. В режиме delta продукты,
+    отпечаток которых не изменился, не перезаписываются, обновляются только их предложения.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        progress: Optional[Callable[..., None]] = None,
+        delta: bool = False,
+        workers: Optional[int] = None,
+    ) -> None:
+        self.batch_size = batch_size
+        self.progress = progress
+        self.delta = delta
+        self.workers: int = settings.IMPORT_VALIDATION_WORKERS if workers is None else workers
+        self.total_objects: int = 0
+        self.loaded_object_count: int = 0
+        self.failed_object_count: int = 0
+        self.unchanged_object_count: int = 0
+        self.excp: List[Exception] = []
+        self._categories: Dict[str, Category] = {}
+        self._resolved_categories: Dict[Tuple, Category] = {}
+        self._offsets: Dict[int, int] = {}
+        self._fingerprints: Dict[int, str] = {}
+        self.images: Optional[ImageStore] = None
+
+    def load(self, products: Iterable[Dict[str, Any]]) -> Tuple[int, int, int, List[Optional[Exception]]]:
+        """
+        Импорт продуктов пачками по batch_size штук.
+        """
+        with ImageStore() as self.images:
+            for batch, results in self.validated(chunked(products, self.batch_size)):
+                self.load_batch(batch, results)
+                if self.progress:
+                    self.progress(
+                        loaded=self.loaded_object_count,
+                        failed=self.failed_object_count,
+                        unchanged=self.unchanged_object_count,
+                        total=self.total_objects,
+                    )
+
+        if self.total_objects == self.failed_object_count:
+            raise ValueError("Ни один продукт не был добавлен")
+
+        return self.loaded_object_count, self.failed_object_count, self.total_objects, self.excp
+
+    def validated(
+        self, batches: Iterable[List[Dict[str, Any]]]
+    ) -> Iterator[Tuple[List[Dict[str, Any]], Optional[List]]]:
+        """
+        Получение пачек с результатами их валидации.
+        Без пула процессов пачки валидируются при импорте (результат None), с пулом
+        валидация выполняется на workers пачек вперед.
+        """
+        if not self.workers:
+            for batch in batches:
+                yield batch, None
+            return
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            pending = deque()
+            for batch in batches:
+                pending.append((batch, pool.submit(validate_chunk, batch)))
+                if len(pending) > self.workers:
+                    batch, future = pending.popleft()
+                    yield batch, future.result()
+
+            while pending:
+                batch, future = pending.popleft()
+                yield batch, future.result()
+
+    def load_batch(self, batch: List[Dict[str, Any]], results: Optional[List] = None) -> None:
+        """
+        Импорт одной пачки продуктов.
+        results - результаты валидации пачки, если она уже провалидирована в пуле процессов.
+        """
+        items = self.validate(batch, results)
+        if not items:
+            return
+
+        items = self.resolve_shops(items)
+        items, unchanged = self.split_unchanged(items)
+        for _, obj, (img_name, img_path), _ in items:
+            self.images.submit(img_path)
+
+        manufacturers = self.get_or_create_manufacturers(items)
+        tags = self.get_or_create_tags(items)
+        items = self.resolve_categories(items)
+        details = self.get_or_create_details(items)
+
+        if not items and not unchanged:
+            return
+
+        try:
+            with transaction.atomic():
+                created = self.write(items, unchanged, manufacturers, tags, details)
+
+        except IntegrityError:
+            # пачка записывается заново по одному продукту, ошибку получают только продукты с конфликтом
+            items, unchanged, created = self.write_rows(items, unchanged, manufacturers, tags, details)
+
+        for number, obj, *_ in items:
+            self.loaded_object_count += 1
+            if obj.name in created:
+                logger.info("Продукт №%d(%s) импортирован успешно" % (number, obj.name))
+            else:
+                logger.info("Продукт №%d(%s) обновлен успешно" % (number, obj.name))
+
+        for number, obj, *_ in unchanged:
+            self.loaded_object_count += 1
+            self.unchanged_object_count += 1
+            logger.info("Продукт №%d(%s) не изменился, обновлено предложение" % (number, obj.name))
+
+    def validate(
+        self, batch: List[Dict[str, Any]], results: Optional[List] = None
+    ) -> List[Tuple[int, ProductBaseModel, Tuple[str, str]]]:
+        """
+        Учет результатов валидации продуктов пачки.
+        Возвращает список из номера продукта, модели продукта и названия и пути изображения.
+        """
+        items = []
+        self._offsets.clear()
+
+        if results is None:
+            results = validate_chunk(batch)
+
+        for product_data, (obj, img, error) in zip(batch, results):
+            self.total_objects += 1
+            number = self.total_objects
+            logger.info("Импорт продукта №%d..." % number)
+
+            offset = getattr(product_data, "offset", None)
+            if offset is not None:
+                self._offsets[number] = offset
+
+            if isinstance(error, ValidationError):
+                self.failed_object_count += 1
+                self.excp.append(with_offset(error, product_data))
+                logger.error(
+                    "Продукт №%d не импортирован. %s: продукт содержит ошибки валидации в кол-ве: %s шт"
+                    % (number, type(error), error.error_count())
+                )
+
+            elif error is not None:
+                self.fail(number, product_data.get("name"), error)
+
+            else:
+                items.append((number, obj, img))
+
+        return items
+
+    def fail(self, number: int, name: Optional[str], e: Exception) -> None:
+        """
+        Учет продукта, который не удалось импортировать.
+        """
+        offset = self._offsets.get(number)
+        self.failed_object_count += 1
+        self.excp.append(RecordError(e, offset) if offset is not None else e)
+        logger.error("Продукт №%d(%s) не импортирован: %s %s" % (number, name, type(e), e))
+
+    def resolve_shops(self, items: List[Tuple]) -> List[Tuple]:
+        """
+        Получение магазинов пачки, продукты без магазина в БД отбрасываются.
+        """
+        names = {obj.shop for _, obj, _ in items}
+        shops = {shop.name: shop for shop in Shop.objects.filter(name__in=names).order_by("-pk")}
+
+        resolved = []
+        for number, obj, img in items:
+            shop = shops.get(obj.shop)
+            if shop is None:
+                self.fail(number, obj.name, ValueError("Магазина '%s' нет базе данных" % obj.shop))
+            else:
+                resolved.append((number, obj, img, shop))
+
+        return resolved
+
+    def split_unchanged(self, items: List[Tuple]) -> Tuple[List[Tuple], List[Tuple]]:
+        """
+        Вычисление отпечатков продуктов пачки.
+        В режиме delta отделяются продукты, отпечаток которых совпадает с сохраненным при прошлом импорте.
+        Если продукт встречается в пачке несколько раз, то он считается неизмененным, только если
+        не изменилось ни одно вхождение.
+        """
+        self._fingerprints = {number: product_fingerprint(obj) for number, obj, *_ in items}
+
+        if not self.delta:
+            return items, []
+
+        stored = dict(
+            ProductFingerprint.objects.filter(product__name__in={obj.name for _, obj, *_ in items}).values_list(
+                "product__name", "fingerprint"
+            )
+        )
+        changed = {obj.name for number, obj, *_ in items if stored.get(obj.name) != self._fingerprints[number]}
+
+        return (
+            [item for item in items if item[1].name in changed],
+            [item for item in items if item[1].name not in changed],
+        )
+
+    def get_or_create_manufacturers(self, items: List[Tuple]) -> Dict[str, Manufacturer]:
+        """
+        Получение или создание производителей пачки.
+        """
+        slugs = {obj.manufacturer.name: obj.manufacturer.slug for _, obj, *_ in items}
+        manufacturers = {m.name: m for m in Manufacturer.objects.filter(name__in=slugs)}
+
+        missing = [Manufacturer(name=name, slug=slug) for name, slug in slugs.items() if name not in manufacturers]
+        if missing:
+            Manufacturer.objects.bulk_create(missing, ignore_conflicts=True)
+            created = Manufacturer.objects.filter(name__in=[m.name for m in missing])
+            manufacturers.update({m.name: m for m in created})
+
+        return manufacturers
+
+    def get_or_create_tags(self, items: List[Tuple]) -> Dict[str, Tag]:
+        """
+        Получение или создание тегов пачки.
+        """
+        names = {name for _, obj, *_ in items for name in obj.tags or []}
+        tags = {tag.name: tag for tag in Tag.objects.filter(name__in=names)}
+
+        missing = [Tag(name=name) for name in names if name not in tags]
+        if missing:
+            # тег мог быть создан параллельным импортом, поэтому созданные теги выбираются повторно
+            Tag.objects.bulk_create(missing, ignore_conflicts=True)
+            tags.update({tag.name: tag for tag in Tag.objects.filter(name__in=[tag.name for tag in missing])})
+
+        return tags
+
+    def get_or_create_details(self, items: List[Tuple]) -> Dict[str, Detail]:
+        """
+        Получение или создание свойств продуктов пачки.
+        """
+        names = {item.name for _, obj, *_ in items for item in obj.details}
+        details = {detail.name: detail for detail in Detail.objects.filter(name__in=names)}
+
+        missing = [Detail(name=name) for name in names if name not in details]
+        if missing:
+            Detail.objects.bulk_create(missing, ignore_conflicts=True)
+            created = Detail.objects.filter(name__in=[detail.name for detail in missing])
+            details.update({detail.name: detail for detail in created})
+
+        return details
+
+    def resolve_categories(self, items: List[Tuple]) -> List[Tuple]:
+        """
+        Получение или создание категорий пачки.
+        Категории загружаются одним запросом, создаются только отсутствующие.
+        """
+        names = set()
+        for _, obj, *_ in items:
+            names.update(name for name in (obj.category.category, obj.category.subcategory) if name)
+
+        names.difference_update(self._categories)
+        self._categories.update({c.name: c for c in Category.objects.filter(name__in=names)})
+
+        resolved = []
+        for number, obj, img, shop in items:
+            key = tuple(obj.category.model_dump().values())
+            category = self._resolved_categories.get(key)
+            if category is not None:
+                resolved.append((number, obj, img, shop, category))
+                continue
+
+            try:
+                with transaction.atomic():
+                    category = self.category_create(obj)
+
+            except IntegrityError as e:
+                # откат точки сохранения мог отменить создание категорий, закэшированных выше
+                touched = [name for name in (obj.category.category, obj.category.subcategory) if name]
+                for name in touched:
+                    self._categories.pop(name, None)
+                self._categories.update({c.name: c for c in Category.objects.filter(name__in=touched)})
+                self._resolved_categories.clear()
+                self.fail(number, obj.name, e)
+
+            else:
+                self._resolved_categories[key] = category
+                resolved.append((number, obj, img, shop, category))
+
+        return resolved
+
+    def category_create(self, obj: ProductBaseModel) -> Category:
+        """
+        Получение или создание сущности Категория.
+        Логика совпадает с importdata.tasks.category_create.
+        """
+        if obj.category.subcategory:
+            main_category = self.main_category_create(obj.category.subcategory, obj.category.sub_slug)
+            category = self._categories.get(obj.category.category)
+
+            if category is None:
+                category, created = Category.objects.get_or_create(
+                    name=obj.category.category, defaults={"slug": obj.category.cat_slug, "parent": main_category}
+                )
+                self._categories[category.name] = category
+                if created:
+                    return category
+
+            if category.parent_id != main_category.pk:
+                raise IntegrityError(
+                    "'%s' уже используется в БД с другой родительской категорией." % obj.category.category
+                )
+
+            elif category.slug != obj.category.cat_slug:
+                category.slug = obj.category.cat_slug
+                category.save()
+
+            return category
+
+        return self.main_category_create(obj.category.category, obj.category.cat_slug)
+
+    def main_category_create(self, name: str, slug: str) -> Category:
+        """
+        Получение или создание родительской категории.
+        Категория могла быть создана параллельным импортом, get_or_create получает её при конфликте.
+        """
+        category = self._categories.get(name)
+
+        if category is None:
+            category, created = Category.objects.get_or_create(name=name, defaults={"slug": slug})
+            self._categories[name] = category
+            if created:
+                return category
+
+        if category.parent_id:
+            raise IntegrityError("'%s' уже используется в БД, как подкатегория." % name)
+
+        if category.slug != slug:
+            category.slug = slug
+            category.save()
+
+        return category
+
+    def write_rows(
+        self,
+        items: List[Tuple],
+        unchanged: List[Tuple],
+        manufacturers: Dict[str, Manufacturer],
+        tags: Dict[str, Tag],
+        details: Dict[str, Detail],
+    ) -> Tuple[List[Tuple], List[Tuple], set]:
+        """
+        Запись продуктов пачки по одному, каждый в своей точке сохранения.
+        Продукты, запись которых нарушила ограничения БД, учитываются как ошибки.
+        Возвращает записанные измененные и неизмененные продукты и названия созданных продуктов.
+        """
+        written, written_unchanged, created = [], [], set()
+        rows = [(item, False) for item in items] + [(item, True) for item in unchanged]
+
+        for item, is_unchanged in rows:
+            try:
+                with transaction.atomic():
+                    if is_unchanged:
+                        created |= self.write([], [item], manufacturers, tags, details)
+                    else:
+                        created |= self.write([item], [], manufacturers, tags, details)
+
+            except IntegrityError as e:
+                self.fail(item[0], item[1].name, e)
+
+            else:
+                (written_unchanged if is_unchanged else written).append(item)
+
+        return written, written_unchanged, created
+
+    def write(
+        self,
+        items: List[Tuple],
+        unchanged: List[Tuple],
+        manufacturers: Dict[str, Manufacturer],
+        tags: Dict[str, Tag],
+        details: Dict[str, Detail],
+    ) -> set:
+        """
+        Запись продуктов, тегов, свойств, изображений, предложений и отпечатков пачки.
+        У неизмененных продуктов записываются только предложения.
+        Возвращает названия созданных продуктов.
+        """
+        # Один продукт может встречаться в пачке несколько раз (например, у разных магазинов),
+        # поля продукта берутся из последнего вхождения.
+        products_data = {obj.name: (obj, img, category) for _, obj, img, _, category in items}
+        names = set(products_data).union(obj.name for _, obj, *_ in unchanged)
+
+        existing = {p.name: p for p in Product.objects.filter(name__in=products_data)}
+
+        searchable = self.upsert_products(products_data, manufacturers, existing)
+        products = {p.name: p for p in Product.objects.filter(name__in=names)}
+        update_search_vector(products[name].pk for name in searchable)
+
+        self.write_tags(products_data, products, tags, existing)
+        self.write_details(products_data, products, details, existing)
+        self.write_previews(products_data, products)
+        self.write_offers([(obj, shop) for _, obj, _, shop, *_ in items + unchanged], products)
+        self.write_fingerprints({obj.name: self._fingerprints[number] for number, obj, *_ in items}, products)
+        # пакетная запись не вызывает сигналы моделей, сводки каталога обновляются явно
+        refresh_offer_summary(Q(product_id__in=[p.pk for p in products.values()]))
+
+        return set(products_data) - set(existing)
+
+    def upsert_products(
+        self,
+        products_data: Dict[str, Tuple],
+        manufacturers: Dict[str, Manufacturer],
+        existing: Dict[str, Product],
+    ) -> set:
+        """
+        Создание и обновление продуктов.
+        У существующих продуктов обновляются только изменившиеся поля.
+        Возвращает названия продуктов, у которых нужно обновить поисковый вектор.
+        """
+        attnames = {field: Product._meta.get_field(field).attname for field in PRODUCT_UPDATE_FIELDS}
+        search_fields = {field for field, _ in SEARCH_FIELDS}
+        created, updated, fields, searchable = [], [], set(), set()
+        for name, (obj, img, category) in products_data.items():
+            product = Product(
+                name=name,
+                category=category,
+                about=obj.about,
+                description=obj.description,
+                manufacturer=manufacturers[obj.manufacturer.name],
+            )
+
+            current = existing.get(name)
+            if current is None:
+                created.append(product)
+                searchable.add(name)
+                continue
+
+            changed = [
+                field for field, attname in attnames.items() if getattr(product, attname) != getattr(current, attname)
+            ]
+            if changed:
+                product.pk = current.pk
+                updated.append(product)
+                fields.update(changed)
+                if search_fields.intersection(changed):
+                    searchable.add(name)
+
+        if connection.features.supports_update_conflicts_with_target:
+            # продукт мог быть создан параллельным импортом после чтения existing
+            Product.objects.bulk_create(
+                created,
+                update_conflicts=True,
+                unique_fields=["name"],
+                update_fields=PRODUCT_UPDATE_FIELDS,
+            )
+        else:
+            Product.objects.bulk_create(created)
+
+        if updated:
+            Product.objects.bulk_update(updated, sorted(fields))
+
+        return searchable
+
+    def write_tags(
+        self,
+        products_data: Dict[str, Tuple],
+        products: Dict[str, Product],
+        tags: Dict[str, Tag],
+        existing: Dict[str, Product],
+    ) -> None:
+        """
+        Обновление тегов продуктов пачки.
+        Удаляются только снятые теги и добавляются только новые.
+        """
+        through = Product.tags.through
+        desired = {
+            (products[name].pk, tags[tag_name].pk)
+            for name, (obj, *_) in products_data.items()
+            for tag_name in obj.tags or []
+        }
+        current = {
+            (product_id, tag_id): pk
+            for pk, product_id, tag_id in through.objects.filter(
+                product_id__in=[products[name].pk for name in existing]
+            ).values_list("pk", "product_id", "tag_id")
+        }
+
+        stale = [pk for key, pk in current.items() if key not in desired]
+        if stale:
+            through.objects.filter(pk__in=stale).delete()
+
+        through.objects.bulk_create(
+            [through(product_id=product_id, tag_id=tag_id) for product_id, tag_id in desired - set(current)],
+            ignore_conflicts=True,
+        )
+
+    def write_details(
+        self,
+        products_data: Dict[str, Tuple],
+        products: Dict[str, Product],
+        details: Dict[str, Detail],
+        existing: Dict[str, Product],
+    ) -> None:
+        """
+        Обновление значений свойств продуктов пачки.
+        Неизмененные значения не перезаписываются.
+        """
+        desired = {
+            (products[name].pk, details[item.name].pk): item.value
+            for name, (obj, *_) in products_data.items()
+            for item in obj.details
+        }
+        current = {
+            (product_id, detail_id): (pk, value)
+            for pk, product_id, detail_id, value in ProductDetail.objects.filter(
+                product_id__in=[products[name].pk for name in existing]
+            ).values_list("pk", "product_id", "detail_id", "value")
+        }
+
+        stale = [pk for key, (pk, _) in current.items() if key not in desired]
+        if stale:
+            ProductDetail.objects.filter(pk__in=stale).delete()
+
+        changed = [
+            ProductDetail(pk=current[key][0], value=value)
+            for key, value in desired.items()
+            if key in current and current[key][1] != value
+        ]
+        if changed:
+            ProductDetail.objects.bulk_update(changed, ["value"])
+
+        ProductDetail.objects.bulk_create(
+            [
+                ProductDetail(product_id=product_id, detail_id=detail_id, value=value)
+                for (product_id, detail_id), value in desired.items()
+                if (product_id, detail_id) not in current
+            ]
+        )
+
+    def write_previews(self, products_data: Dict[str, Tuple], products: Dict[str, Product]) -> None:
+        """
+        Замена превью продуктов пачки и создание ProductImage от превью,
+        как это делает Product.save.
+        Превью хранятся по хэшу содержимого, неизмененные превью не перезаписываются.
+        """
+        updated = []
+        for name, (obj, (img_name, img_path), _) in products_data.items():
+            product = products[name]
+            preview = self.images.get(img_path)
+
+            if product.preview.name == preview:
+                continue
+
+            if not is_content_addressed(product.preview.name):
+                product.preview.delete(save=False)
+            product.preview.name = preview
+            updated.append(product)
+
+        if not updated:
+            return
+
+        Product.objects.bulk_update(updated, ["preview"])
+
+        images = set(
+            ProductImage.objects.filter(
+                product_id__in=[p.pk for p in updated], image__in=[p.preview.name for p in updated]
+            ).values_list("product_id", "image")
+        )
+        ProductImage.objects.bulk_create(
+            [ProductImage(product=p, image=p.preview.name) for p in updated if (p.pk, p.preview.name) not in images]
+        )
+
+    def write_offers(self, items: List[Tuple[ProductBaseModel, Shop]], products: Dict[str, Product]) -> None:
+        """
+        Создание и обновление предложений магазинов.
+        """
+        product_ids = {p.pk for p in products.values()}
+        shop_ids = {shop.pk for _, shop in items}
+        offers = {
+            (offer.product_id, offer.shop_id): offer
+            for offer in Offer.objects.filter(product_id__in=product_ids, shop_id__in=shop_ids).order_by("-pk")
+        }
+
+        updated, created = {}, {}
+        for obj, shop in items:
+            key = (products[obj.name].pk, shop.pk)
+            offer = offers.get(key) or created.get(key)
+
+            if offer is None:
+                created[key] = Offer(
+                    product=products[obj.name], shop=shop, price=obj.offer.price, remains=obj.offer.quantity
+                )
+            else:
+                offer.price = obj.offer.price
+                offer.remains += obj.offer.quantity
+                if key in offers:
+                    updated[key] = offer
+
+        Offer.objects.bulk_update(list(updated.values()), ["price", "remains"])
+        Offer.objects.bulk_create(list(created.values()))
+
+    def write_fingerprints(self, fingerprints: Dict[str, str], products: Dict[str, Product]) -> None:
+        """
+        Сохранение отпечатков записанных продуктов.
+        """
+        objs = [
+            ProductFingerprint(product=products[name], fingerprint=fingerprint)
+            for name, fingerprint in fingerprints.items()
+        ]
+
+        if connection.features.supports_update_conflicts_with_target:
+            ProductFingerprint.objects.bulk_create(
+                objs,
+                update_conflicts=True,
+                unique_fields=["product"],
+                update_fields=["fingerprint", "modified_at"],
+            )
+        else:
+            ProductFingerprint.objects.filter(product__in=[f.product for f in objs]).delete()
+            ProductFingerprint.objects.bulk_create(objs)
+
+
+def load_bulk(
+    products: Iterable[Dict[str, Any]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress: Optional[Callable[..., None]] = None,
+    delta: bool = False,
+    workers: Optional[int] = None,
+) -> Tuple[int, int, int, List[Optional[Exception]]]:
+    """
+    Пакетный импорт проудктов из файла.
+    """
+    return BulkLoader(batch_size=batch_size, progress=progress, delta=delta, workers=workers).load(products)
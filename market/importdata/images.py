@@ -0,0 +1,111 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+
+
+PREVIEW_DIRECTORY: str = "img/products/previews"
+
+HASH_BLOCK_SIZE: int = 64 * 1024
+
+
+def content_name(file_path: str) -> str:
+    """
+    Получение имени изображения в хранилище по хэшу его содержимого.
+    """
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            sha256.update(block)
+
+    digest = sha256.hexdigest()
+    extension = os.path.splitext(file_path)[1].lower()
+    return "{directory}/{prefix}/{digest}{extension}".format(
+        directory=PREVIEW_DIRECTORY, prefix=digest[:2], digest=digest, extension=extension
+    )
+
+
+def is_content_addressed(name: Optional[str]) -> bool:
+    """
+    Проверка, что изображение сохранено по хэшу содержимого и может использоваться несколькими продуктами.
+    """
+    return bool(name) and name.startswith(PREVIEW_DIRECTORY + "/")
+
+
+def store_image(file_path: str) -> str:
+    """
+    Сохранение изображения в хранилище по хэшу содержимого.
+    Если изображение с таким содержимым уже сохранено, то файл не копируется.
+    В файловом хранилище файл пишется во временный файл и переименовывается в имя по хэшу,
+    поэтому параллельное сохранение того же содержимого (потоки пула, задачи импорта файлов)
+    не создает копию под другим именем.
+    """
+    name = content_name(file_path)
+
+    if default_storage.exists(name):
+        return name
+
+    try:
+        target = default_storage.path(name)
+    except NotImplementedError:
+        with open(file_path, "rb") as f:
+            return default_storage.save(name, File(f))
+
+    directory = os.path.dirname(target)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+
+    try:
+        with os.fdopen(fd, "wb") as tmp, open(file_path, "rb") as f:
+            shutil.copyfileobj(f, tmp)
+        os.chmod(tmp_path, getattr(default_storage, "file_permissions_mode", None) or 0o644)
+        # одинаковое содержимое, поэтому замена файла, сохраненного параллельно, безопасна
+        os.replace(tmp_path, target)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+    return name
+
+
+class ImageStore:
+    """
+    Пул потоков для сохранения изображений при импорте.
+    Изображения копируются в фоне, пока импорт выполняет запросы к БД.
+    Каждый исходный файл обрабатывается один раз за импорт.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or settings.IMPORT_IMAGE_WORKERS)
+        self._futures: Dict[str, Future] = {}
+
+    def submit(self, file_path: str) -> Future:
+        """
+        Постановка изображения в очередь на сохранение.
+        """
+        future = self._futures.get(file_path)
+        if future is None:
+            future = self._executor.submit(store_image, file_path)
+            self._futures[file_path] = future
+        return future
+
+    def get(self, file_path: str) -> str:
+        """
+        Получение имени сохраненного изображения, с ожиданием окончания копирования.
+        """
+        return self.submit(file_path).result()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "ImageStore":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.shutdown()
@@ -0,0 +1,144 @@
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+class ImportLease:
+    """
+    Аренда запуска импорта.
+    Пока аренда не истекла или не освобождена, новый импорт не запускается.
+    Срок аренды продлевается при каждом обновлении прогресса, поэтому упавший
+    воркер не блокирует импорт навсегда.
+    Прогресс каждого файла хранится под отдельным ключом, чтобы параллельные
+    задачи не перезаписывали данные друг друга.
+    Прогресс файла: status, size (размер файла в байтах), position (байт прочитано),
+    started_at, updated_at и счетчики продуктов total (обработано), loaded, failed.
+    """
+
+    cache_key: str = "import_is_running"
+
+    def __init__(self, token: Optional[str] = None) -> None:
+        self.token = token or uuid.uuid4().hex
+        self.timeout: int = settings.IMPORT_LEASE_TIMEOUT
+
+    def file_key(self, file: str) -> str:
+        return "import_lease:%s:%s" % (self.token, file)
+
+    def acquire(self, files: List[str], sizes: Optional[Dict[str, int]] = None) -> bool:
+        """
+        Получение аренды. Возвращает False, если импорт уже запущен.
+        sizes - размеры файлов в байтах для расчета оставшегося времени импорта.
+        """
+        sizes = sizes or {}
+        data = {"token": self.token, "started_at": time.time(), "files": list(files)}
+        if not cache.add(self.cache_key, data, timeout=self.timeout):
+            return False
+
+        cache.set_many(
+            {self.file_key(file): {"status": "pending", "size": sizes.get(file)} for file in files},
+            timeout=self.timeout,
+        )
+        return True
+
+    def is_owner(self) -> bool:
+        data = cache.get(self.cache_key)
+        return bool(data) and data["token"] == self.token
+
+    def update(self, file: str, **progress: Any) -> None:
+        """
+        Обновление прогресса импорта файла с продлением аренды.
+        """
+        key = self.file_key(file)
+        data = cache.get(key) or {}
+        data.update(progress, updated_at=time.time())
+        if progress.get("status") == "running":
+            data["started_at"] = data["updated_at"]
+        cache.set(key, data, timeout=self.timeout)
+        cache.touch(self.cache_key, timeout=self.timeout)
+
+    def progress(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Получение прогресса импорта по файлам.
+        """
+        data = cache.get(self.cache_key)
+        if not data or data["token"] != self.token:
+            return {}
+
+        keys = {self.file_key(file): file for file in data["files"]}
+        return {keys[key]: value for key, value in cache.get_many(keys).items()}
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Получение состояния импорта: прогресс файлов, общие счетчики, скорость (продуктов в секунду)
+        и оценка оставшегося времени в секундах.
+        Оставшееся время оценивается по доле прочитанных байт, так как число продуктов
+        в файле до окончания его чтения неизвестно.
+        """
+        data = cache.get(self.cache_key)
+        if not data or data["token"] != self.token:
+            return {"running": False}
+
+        now = time.time()
+        files = self.progress()
+        summary = {"total": 0, "loaded": 0, "failed": 0, "position": 0, "remaining": 0}
+
+        for file, progress in files.items():
+            for counter in ("total", "loaded", "failed", "position"):
+                summary[counter] += progress.get(counter) or 0
+
+            elapsed = (progress.get("updated_at") or now) - (progress.get("started_at") or now)
+            progress["rate"] = rate(progress.get("total"), elapsed)
+            progress["eta"] = None
+
+            if progress["status"] in ("done", "failed"):
+                continue
+
+            remaining = max((progress.get("size") or 0) - (progress.get("position") or 0), 0)
+            summary["remaining"] += remaining
+            if progress.get("position"):
+                progress["eta"] = remaining * elapsed / progress["position"]
+
+        elapsed = now - data["started_at"]
+        byte_rate = rate(summary["position"], elapsed)
+
+        return {
+            "running": True,
+            "started_at": data["started_at"],
+            "elapsed": elapsed,
+            "processed": summary["total"],
+            "loaded": summary["loaded"],
+            "failed": summary["failed"],
+            "rate": rate(summary["total"], elapsed),
+            "eta": summary["remaining"] / byte_rate if byte_rate else None,
+            "files": files,
+        }
+
+    def release(self) -> None:
+        """
+        Освобождение аренды, если она принадлежит текущему импорту.
+        """
+        data = cache.get(self.cache_key)
+        if data and data["token"] == self.token:
+            cache.delete_many([self.cache_key] + [self.file_key(file) for file in data["files"]])
+
+    @classmethod
+    def current(cls) -> Optional["ImportLease"]:
+        """
+        Получение действующей аренды, если импорт запущен.
+        """
+        data = cache.get(cls.cache_key)
+        if not data:
+            return None
+        return cls(token=data["token"])
+
+
+def rate(count: Optional[int], elapsed: float) -> float:
+    """
+    Расчет скорости в единицах в секунду.
+    """
+    if not count or elapsed <= 0:
+        return 0.0
+    return count / elapsed
@@ -0,0 +1,137 @@
+import logging
+import os
+import resource
+import tempfile
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+
+from shops.models import Shop
+from importdata.bench import FeedGenerator, QueryCounter
+from importdata.bulk import DEFAULT_BATCH_SIZE, load_bulk
+from importdata.readers import JsonArrayReader
+from importdata.tasks import load
+
+
+class Command(BaseCommand):
+    """
+    Замер производительности импорта на синтетическом файле.
+    Файл генерируется во временной папке, импорт выполняется в текущем процессе,
+    без Celery. Все изменения в БД по окончании откатываются (если не указан --keep),
+    изображения сохраняются во временную папку.
+    """
+
+    help = (
+        "Benchmark product import on a synthetic feed. Reports rows/sec, "
+        "queries per product and peak RSS. Database changes are rolled back unless --keep is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("-n", "--products", type=int, default=1000, help="Number of products in the feed.")
+        parser.add_argument("--tags", type=int, default=3, help="Tags per product.")
+        parser.add_argument("--tag-pool", type=int, default=100, help="Number of distinct tags.")
+        parser.add_argument("--details", type=int, default=5, help="Details per product.")
+        parser.add_argument("--detail-pool", type=int, default=50, help="Number of distinct details.")
+        parser.add_argument("--categories", type=int, default=20, help="Number of distinct categories.")
+        parser.add_argument(
+            "--category-depth", type=int, choices=[1, 2], default=2, help="1 - categories only, 2 - with parents."
+        )
+        parser.add_argument(
+            "--existing",
+            type=float,
+            default=0.0,
+            help="Share of feed products (0..1) imported before the measured run.",
+        )
+        parser.add_argument(
+            "-b",
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Measure batched import (importdata.bulk) instead of importdata.tasks.load.",
+        )
+        parser.add_argument("-d", "--delta", action="store_true", help="Measure batched import in delta mode.")
+        parser.add_argument("-w", "--workers", type=int, default=None, help="Validation processes for batched import.")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed of the feed.")
+        parser.add_argument("--keep", action="store_true", help="Do not roll back imported data.")
+
+    def handle(self, *args, **options):
+        count = options["products"]
+        existing = int(count * options["existing"])
+
+        # логи каждого продукта искажают замер, оставляем их только при подробном выводе
+        if options["verbosity"] < 2:
+            logging.disable(logging.INFO)
+
+        try:
+            with tempfile.TemporaryDirectory() as folder, override_settings(MEDIA_ROOT=os.path.join(folder, "media")):
+                preview = os.path.join(folder, "preview.webp")
+                with open(preview, "wb") as f:
+                    f.write(os.urandom(1024))
+
+                with transaction.atomic():
+                    generator = FeedGenerator(
+                        shop=self.get_shop().name,
+                        preview=preview,
+                        tags=options["tags"],
+                        tag_pool=options["tag_pool"],
+                        details=options["details"],
+                        detail_pool=options["detail_pool"],
+                        categories=options["categories"],
+                        category_depth=options["category_depth"],
+                        seed=options["seed"],
+                    )
+                    feed = os.path.join(folder, "feed.json")
+                    generator.write(feed, count)
+
+                    if existing:
+                        self.stdout.write("Предварительный импорт %d продуктов..." % existing)
+                        load_bulk(generator.products(existing))
+
+                    self.stdout.write("Импорт %d продуктов (%.1f МБ)..." % (count, os.path.getsize(feed) / 2**20))
+                    self.run(feed, options)
+
+                    if not options["keep"]:
+                        transaction.set_rollback(True)
+        finally:
+            logging.disable(logging.NOTSET)
+
+    def run(self, feed: str, options) -> None:
+        bulk = bool(options["batch_size"] or options["delta"] or options["workers"])
+        batch_size = options["batch_size"] or DEFAULT_BATCH_SIZE
+
+        with open(feed, "rb") as f, QueryCounter() as queries:
+            started = time.perf_counter()
+            if bulk:
+                loaded, failed, total, excp = load_bulk(
+                    JsonArrayReader(f), batch_size=batch_size, delta=options["delta"], workers=options["workers"]
+                )
+            else:
+                loaded, failed, total, excp = load(JsonArrayReader(f))
+            elapsed = time.perf_counter() - started
+
+        if bulk:
+            self.stdout.write(
+                "Режим: importdata.bulk, batch_size=%d, delta=%s, workers=%s"
+                % (batch_size, options["delta"], options["workers"])
+            )
+        else:
+            self.stdout.write("Режим: importdata.tasks.load")
+        self.stdout.write("Импортировано: %d, с ошибками: %d, всего: %d" % (loaded, failed, total))
+        self.stdout.write("Время: %.2f сек" % elapsed)
+        self.stdout.write("Скорость: %.1f rows/sec" % (total / elapsed if elapsed else 0))
+        self.stdout.write("Запросов: %d, на продукт: %.2f" % (queries.count, queries.count / total if total else 0))
+        # ru_maxrss в Linux измеряется в килобайтах
+        self.stdout.write("Пиковый RSS: %.1f МБ" % (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+
+        for error in excp[:10]:
+            self.stderr.write(str(error))
+
+    def get_shop(self) -> Shop:
+        user, _ = get_user_model().objects.get_or_create(
+            username="bench_import_user", defaults={"email": "bench_import@mail.com"}
+        )
+        shop, _ = Shop.objects.get_or_create(user=user, name="bench shop")
+        return shop
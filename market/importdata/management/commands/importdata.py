@@ -1,11 +1,18 @@
+import logging
+import os
+
 from django.core.management import BaseCommand
-from importdata.tasks import load_files
+from importdata.bulk import DEFAULT_BATCH_SIZE
+from importdata.planner import ImportPlanner
+from importdata.readers import open_reader, supported_formats
+from importdata.tasks import file_format_validator, get_files, load_files
 from django.conf import settings
 
 
 class Command(BaseCommand):
     help = (
-        "Import products data into the database from json"
+        "Import products data into the database from json, ndjson or csv "
+        "(optionally gz compressed) "
         "file(s) located at '%s' folder. *If no files are selected,"
         "the import will be initiated from all files in the directory."
         "**WARNING For task works properly Celery should be running" % settings.IMPORT_FOLDER
@@ -27,8 +34,41 @@ class Command(BaseCommand):
             help="Address to mail a report to.",
         )
 
+        parser.add_argument(
+            "-b",
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Import products in batches of given size using bulk queries.",
+        )
+
+        parser.add_argument(
+            "-d",
+            "--delta",
+            action="store_true",
+            help="Skip products unchanged since the previous import, only their offers are updated.",
+        )
+
+        parser.add_argument(
+            "-w",
+            "--workers",
+            type=int,
+            default=None,
+            help="Number of processes validating upcoming batches during batched import.",
+        )
+
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Validate file(s) and print an import plan without writing to the database.",
+        )
+
     def handle(self, *files, **options):
-        load_files.delay(files, options["email"])
+        if options["dry_run"]:
+            self.dry_run(files, options)
+            return
+
+        load_files.delay(files, options["email"], options["batch_size"], options["delta"], options["workers"])
         if options["email"]:
             self.stdout.write(
                 "Команда 'Importdata' поставлена в очередь задач на выполнение. "
@@ -36,3 +76,39 @@ class Command(BaseCommand):
             )
         else:
             self.stdout.write("Команда 'Importdata' поставлена в очередь задач на выполнение. ")
+
+    def dry_run(self, files, options):
+        """
+        Построение плана импорта файлов без записи в БД. Выполняется в текущем процессе, без Celery.
+        """
+        folder: str = settings.IMPORT_FOLDER
+        files = files or get_files(folder)
+
+        # логи каждого продукта не нужны, выводится только план
+        if options["verbosity"] < 2:
+            logging.disable(logging.INFO)
+
+        try:
+            for file in files:
+                self.stdout.write("Файл '%s':" % file)
+                planner = ImportPlanner(
+                    batch_size=options["batch_size"] or DEFAULT_BATCH_SIZE, workers=options["workers"]
+                )
+
+                try:
+                    file_format_validator(file=file, formats=supported_formats())
+                    with open(os.path.join(folder, file), "rb") as f:
+                        plan = planner.plan(open_reader(f, file))
+
+                except (OSError, EOFError, ValueError) as e:
+                    self.stderr.write("  файл не может быть импортирован: %s" % e)
+                    continue
+
+                self.stdout.write(
+                    "  всего: {total}, создать: {create}, обновить: {update}, без изменений: {unchanged}, "
+                    "конфликтов категорий: {category_conflicts}, с ошибками: {invalid}".format(**plan)
+                )
+                for error in plan["errors"]:
+                    self.stdout.write("  %s" % error)
+        finally:
+            logging.disable(logging.NOTSET)
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        ("products", "0004_limitedoffer"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductFingerprint",
+            fields=[
+                (
+                    "product",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="import_fingerprint",
+                        serialize=False,
+                        to="products.product",
+                        verbose_name="продукт",
+                    ),
+                ),
+                ("fingerprint", models.CharField(max_length=64, verbose_name="отпечаток")),
+                ("modified_at", models.DateTimeField(auto_now=True, verbose_name="дата изменения")),
+            ],
+            options={
+                "verbose_name": "отпечаток импорта",
+                "verbose_name_plural": "отпечатки импорта",
+            },
+        ),
+    ]
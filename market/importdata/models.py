@@ -0,0 +1,23 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class ProductFingerprint(models.Model):
+    """Отпечаток данных продукта из последнего импорта"""
+
+    product = models.OneToOneField(
+        "products.Product",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="import_fingerprint",
+        verbose_name=_("продукт"),
+    )
+    fingerprint = models.CharField(max_length=64, verbose_name=_("отпечаток"))
+    modified_at = models.DateTimeField(auto_now=True, verbose_name=_("дата изменения"))
+
+    class Meta:
+        verbose_name = _("отпечаток импорта")
+        verbose_name_plural = _("отпечатки импорта")
+
+    def __str__(self) -> str:
+        return f"Отпечаток (product_id={self.product_id}, fingerprint={self.fingerprint!r})"
@@ -0,0 +1,148 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.db import IntegrityError
+from django.db.models import Q
+
+from products.models import Category, Product
+from importdata.bulk import DEFAULT_BATCH_SIZE, BulkLoader, chunked
+from importdata.services import ProductBaseModel, product_fingerprint
+
+
+class ImportPlanner(BulkLoader):
+    """
+    План импорта без записи в БД (dry-run).
+    Валидация и получение магазинов совпадают с пакетным импортом, продукты, их отпечатки
+    и категории пачки получаются несколькими запросами с IN.
+    Создание категорий моделируется в памяти по тем же правилам, что и в category_create,
+    поэтому конфликты категорий выявляются без обращения к БД на каждую запись.
+    Продукт без сохраненного отпечатка считается обновляемым.
+    """
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE, workers: Optional[int] = None) -> None:
+        super().__init__(batch_size=batch_size, workers=workers)
+        self.create_count: int = 0
+        self.update_count: int = 0
+        self.unchanged_count: int = 0
+        self.conflicts: List[Exception] = []
+        # отпечатки продуктов, уже учтенных в плане
+        self._planned: Dict[str, Optional[str]] = {}
+        # название категории -> название родительской категории
+        self._parents: Dict[str, Optional[str]] = {}
+        # слаг -> название категории и обратно
+        self._slugs: Dict[str, str] = {}
+        self._category_slugs: Dict[str, str] = {}
+        self._loaded_names: set = set()
+        self._loaded_slugs: set = set()
+
+    def plan(self, products: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Построение плана импорта продуктов.
+        """
+        for batch, results in self.validated(chunked(products, self.batch_size)):
+            self.plan_batch(batch, results)
+
+        return {
+            "total": self.total_objects,
+            "create": self.create_count,
+            "update": self.update_count,
+            "unchanged": self.unchanged_count,
+            "category_conflicts": len(self.conflicts),
+            "invalid": self.failed_object_count - len(self.conflicts),
+            "errors": self.excp,
+        }
+
+    def plan_batch(self, batch: List[Dict[str, Any]], results: Optional[List] = None) -> None:
+        items = self.validate(batch, results)
+        items = self.resolve_shops(items)
+        if not items:
+            return
+
+        self.load_categories(items)
+        stored = dict(
+            Product.objects.filter(name__in={obj.name for _, obj, *_ in items}).values_list(
+                "name", "import_fingerprint__fingerprint"
+            )
+        )
+
+        for number, obj, *_ in items:
+            try:
+                self.plan_category(obj)
+            except IntegrityError as e:
+                self.conflicts.append(e)
+                self.fail(number, obj.name, e)
+                continue
+
+            fingerprint = product_fingerprint(obj)
+            if obj.name in self._planned:
+                previous = self._planned[obj.name]
+            elif obj.name in stored:
+                previous = stored[obj.name]
+            else:
+                self.create_count += 1
+                self._planned[obj.name] = fingerprint
+                continue
+
+            if previous == fingerprint:
+                self.unchanged_count += 1
+            else:
+                self.update_count += 1
+            self._planned[obj.name] = fingerprint
+
+    def load_categories(self, items: List[Tuple]) -> None:
+        """
+        Получение категорий пачки, совпадающих по названию или слагу, одним запросом.
+        """
+        names, slugs = set(), set()
+        for _, obj, *_ in items:
+            names.update(name for name in (obj.category.category, obj.category.subcategory) if name)
+            slugs.update(slug for slug in (obj.category.cat_slug, obj.category.sub_slug) if slug)
+
+        names.difference_update(self._loaded_names)
+        slugs.difference_update(self._loaded_slugs)
+        if not names and not slugs:
+            return
+
+        categories = Category.objects.filter(Q(name__in=names) | Q(slug__in=slugs)).values_list(
+            "name", "slug", "parent__name"
+        )
+        for name, slug, parent in categories:
+            # категории, уже учтенные в плане, не перезаписываются данными из БД
+            if name not in self._parents:
+                self._parents[name] = parent
+                if slug:
+                    self._slugs.setdefault(slug, name)
+                    self._category_slugs[name] = slug
+
+        self._loaded_names.update(names)
+        self._loaded_slugs.update(slugs)
+
+    def plan_category(self, obj: ProductBaseModel) -> None:
+        """
+        Моделирование category_create: проверка конфликтов и учет создаваемых категорий.
+        Если есть конфликт, то план не изменяется, как при откате точки сохранения.
+        """
+        if obj.category.subcategory:
+            categories = [
+                (obj.category.subcategory, obj.category.sub_slug, None),
+                (obj.category.category, obj.category.cat_slug, obj.category.subcategory),
+            ]
+        else:
+            categories = [(obj.category.category, obj.category.cat_slug, None)]
+
+        for name, slug, parent in categories:
+            if name in self._parents and self._parents[name] != parent:
+                if parent is None:
+                    raise IntegrityError("'%s' уже используется в БД, как подкатегория." % name)
+                raise IntegrityError("'%s' уже используется в БД с другой родительской категорией." % name)
+
+            owner = self._slugs.get(slug)
+            if owner is not None and owner != name:
+                raise IntegrityError("Слаг '%s' уже используется категорией '%s'." % (slug, owner))
+
+        for name, slug, parent in categories:
+            self._parents[name] = parent
+            previous = self._category_slugs.get(name)
+            if previous != slug:
+                self._slugs.pop(previous, None)
+            self._slugs[slug] = name
+            self._category_slugs[name] = slug
@@ -0,0 +1,335 @@
+import codecs
+import csv
+import gzip
+import json
+import re
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional
+
+
+DEFAULT_BUFFER_SIZE: int = 64 * 1024
+
+WHITESPACE = re.compile(r"\s*")
+
+# Ошибка разбора ближе этого количества символов к концу буфера может означать обрезанную блоком запись
+# (литерал -Infinity, escape \uXXXX), тогда дочитывается следующий блок
+INCOMPLETE_TAIL: int = 10
+
+
+class Record(dict):
+    """
+    Продукт из файла импорта с байтовым смещением начала записи в файле.
+    Если запись не является json объектом, то is_object=False.
+    Если запись не удалось разобрать, то error содержит описание ошибки.
+    """
+
+    def __init__(self, data: Any, offset: Optional[int] = None, error: Optional[str] = None) -> None:
+        self.is_object = isinstance(data, dict)
+        super().__init__(data if self.is_object else {})
+        self.offset = offset
+        self.error = error
+
+
+def record_validator(product_data: Any) -> None:
+    """
+    Валидация того, что запись файла импорта разобрана и является json объектом.
+    """
+    error = getattr(product_data, "error", None)
+    if error:
+        raise ValueError(error)
+    if not getattr(product_data, "is_object", isinstance(product_data, dict)):
+        raise ValueError("Запись не является json объектом")
+
+
+class RecordError(ValueError):
+    """
+    Ошибка в записи файла импорта с указанием её байтового смещения.
+    """
+
+    def __init__(self, error: Exception, offset: Optional[int]) -> None:
+        super().__init__(error, offset)
+        self.error = error
+        self.offset = offset
+
+    def __str__(self) -> str:
+        return "Запись со смещением %s байт: %s" % (self.offset, self.error)
+
+
+def with_offset(error: Exception, product_data: Any) -> Exception:
+    """
+    Добавление к ошибке смещения записи, если оно известно.
+    """
+    offset = getattr(product_data, "offset", None)
+    if offset is None:
+        return error
+    return RecordError(error, offset)
+
+
+class JsonArrayReader:
+    """
+    Потоковое чтение массива продуктов из json файла.
+    Файл читается блоками по buffer_size байт, записи отдаются по одной,
+    поэтому расход памяти не зависит от размера файла.
+    """
+
+    def __init__(self, file: BinaryIO, buffer_size: int = DEFAULT_BUFFER_SIZE) -> None:
+        self.file = file
+        self.buffer_size = buffer_size
+        self.decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer: str = ""
+        self._pos: int = 0
+        self._offset: int = 0
+        self._eof: bool = False
+
+    def __iter__(self) -> Iterator[Record]:
+        self._expect("[", "Файл импорта должен содержать массив продуктов")
+
+        if self._peek() == "]":
+            self._advance(self._pos + 1)
+            return
+
+        while True:
+            self._peek()
+            offset = self._offset
+            data = self._decode()
+            yield Record(data, offset)
+
+            if self._peek() == "]":
+                self._advance(self._pos + 1)
+                return
+            self._expect(",", "Ожидалась ',' или ']' после записи")
+
+    @property
+    def position(self) -> int:
+        """
+        Количество прочитанных байт файла, включая последнюю отданную запись.
+        """
+        return self._offset
+
+    def _read(self) -> bool:
+        """
+        Чтение следующего блока файла.
+        Прочитанная часть буфера отбрасывается.
+        """
+        if self._eof:
+            return False
+
+        chunk = self.file.read(self.buffer_size)
+        pos, self._pos = self._pos, 0
+        self._buffer = self._buffer[pos:] + self._text_decoder.decode(chunk, final=not chunk)
+        self._eof = not chunk
+        return True
+
+    def _advance(self, end: int) -> None:
+        """
+        Сдвиг позиции в буфере с пересчетом байтового смещения.
+        """
+        start, self._pos = self._pos, end
+        self._offset += len(self._buffer[start:end].encode("utf-8"))
+
+    def _peek(self) -> str:
+        """
+        Получение следующего непробельного символа без его чтения.
+        """
+        while True:
+            self._advance(WHITESPACE.match(self._buffer, self._pos).end())
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._read():
+                raise self._error("Неожиданный конец файла")
+
+    def _expect(self, char: str, message: str) -> None:
+        if self._peek() != char:
+            raise self._error(message)
+        self._advance(self._pos + 1)
+
+    def _decode(self) -> Any:
+        """
+        Разбор одной записи. Если запись не поместилась в буфер, то дочитывается файл.
+        Ошибка внутри буфера означает некорректную запись, файл при этом дальше не читается.
+        """
+        while True:
+            try:
+                data, end = self.decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                if self._is_incomplete(e) and self._read():
+                    continue
+                raise self._error(e.msg)
+
+            # число или литерал в конце буфера могут быть обрезаны
+            if end == len(self._buffer) and self._read():
+                continue
+
+            self._advance(end)
+            return data
+
+    def _is_incomplete(self, error: json.JSONDecodeError) -> bool:
+        """
+        Может ли ошибка разбора означать, что запись обрезана концом буфера.
+        Незакрытая строка всегда дочитывается (перевод строки внутри строки - отдельная ошибка).
+        """
+        return error.pos >= len(self._buffer) - INCOMPLETE_TAIL or error.msg.startswith("Unterminated string")
+
+    def _error(self, message: str) -> ValueError:
+        return ValueError("Некорректный json (смещение %d байт): %s" % (self._offset, message))
+
+
+class LineReader:
+    """
+    Базовый класс построчного чтения файла с учетом байтового смещения строк.
+    """
+
+    def __init__(self, file: BinaryIO) -> None:
+        self.file = file
+        self._offset: int = 0
+
+    @property
+    def position(self) -> int:
+        return self._offset
+
+    def lines(self) -> Iterator[str]:
+        encoding = "utf-8-sig"
+        for line in self.file:
+            self._offset += len(line)
+            yield line.decode(encoding)
+            encoding = "utf-8"
+
+
+class NdjsonReader(LineReader):
+    """
+    Потоковое чтение продуктов из ndjson файла, по одному json объекту в строке.
+    Некорректная строка не прерывает импорт файла, а становится ошибкой записи.
+    """
+
+    def __iter__(self) -> Iterator[Record]:
+        offset = self._offset
+        for line in self.lines():
+            if line.strip():
+                try:
+                    yield Record(json.loads(line), offset)
+                except json.JSONDecodeError as e:
+                    yield Record(None, offset, "Некорректный json: %s" % e.msg)
+            offset = self._offset
+
+
+class CsvReader(LineReader):
+    """
+    Потоковое чтение продуктов из csv файла с заголовком.
+    Вложенные поля задаются колонками через точку (manufacturer.name, category.cat_slug, offer.price),
+    теги перечисляются в колонке tags через '|', свойства задаются колонками details.<название свойства>.
+    Пустые ячейки, кроме тегов, не передаются в запись.
+    """
+
+    tags_separator: str = "|"
+
+    def __iter__(self) -> Iterator[Record]:
+        reader = csv.reader(self.lines())
+        header = next(reader, None)
+        if header is None:
+            return
+
+        while True:
+            offset = self._offset
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                raise ValueError("Некорректный csv (смещение %d байт): %s" % (offset, e))
+
+            if not any(row):
+                continue
+            if len(row) != len(header):
+                yield Record(None, offset, "Количество колонок не совпадает с заголовком")
+                continue
+
+            yield Record(self.to_product(header, row), offset)
+
+    def to_product(self, header: List[str], row: List[str]) -> Dict[str, Any]:
+        product: Dict[str, Any] = {"details": []}
+        for column, value in zip(header, row):
+            key, _, field = column.strip().partition(".")
+            if key == "tags":
+                product["tags"] = [tag.strip() for tag in value.split(self.tags_separator) if tag.strip()]
+            elif value == "":
+                continue
+            elif key == "details" and field:
+                product["details"].append({"name": field, "value": value})
+            elif field:
+                product.setdefault(key, {})[field] = value
+            else:
+                product[key] = value
+
+        return product
+
+
+class CompressedReader:
+    """
+    Чтение записей из сжатого файла. Файл распаковывается на лету,
+    позиция считается по сжатому файлу, чтобы оценка прогресса совпадала с его размером.
+    Смещения записей указываются в распакованных данных.
+    """
+
+    def __init__(self, reader: Iterable[Record], file: BinaryIO) -> None:
+        self.reader = reader
+        self.file = file
+
+    def __iter__(self) -> Iterator[Record]:
+        return iter(self.reader)
+
+    @property
+    def position(self) -> int:
+        return self.file.tell()
+
+
+READERS: Dict[str, Callable[[BinaryIO], Iterable[Record]]] = {
+    "json": JsonArrayReader,
+    "ndjson": NdjsonReader,
+    "jsonl": NdjsonReader,
+    "csv": CsvReader,
+}
+
+DECOMPRESSORS: Dict[str, Callable[[BinaryIO], BinaryIO]] = {
+    "gz": lambda file: gzip.GzipFile(fileobj=file, mode="rb"),
+}
+
+
+def register_reader(extension: str, reader: Callable[[BinaryIO], Iterable[Record]]) -> None:
+    """
+    Регистрация чтения файлов импорта с расширением extension.
+    reader принимает бинарный файл и отдает записи Record.
+    """
+    READERS[extension] = reader
+
+
+def register_decompressor(extension: str, decompressor: Callable[[BinaryIO], BinaryIO]) -> None:
+    """
+    Регистрация распаковки файлов импорта с расширением extension.
+    decompressor принимает сжатый бинарный файл и возвращает распакованный файловый объект.
+    """
+    DECOMPRESSORS[extension] = decompressor
+
+
+def supported_formats() -> List[str]:
+    """
+    Получение поддерживаемых форматов файлов импорта, включая сжатые (например, ndjson.gz).
+    """
+    formats = list(READERS)
+    formats += ["%s.%s" % (extension, compression) for extension in READERS for compression in DECOMPRESSORS]
+    return formats
+
+
+def open_reader(file: BinaryIO, file_name: str) -> Iterable[Record]:
+    """
+    Получение чтения записей файла импорта по расширению его имени.
+    """
+    parts = file_name.lower().rsplit(".", 2)
+    extension = parts[-1] if len(parts) > 1 else ""
+
+    if extension in DECOMPRESSORS and len(parts) > 2 and parts[-2] in READERS:
+        return CompressedReader(READERS[parts[-2]](DECOMPRESSORS[extension](file)), file)
+
+    if extension in READERS:
+        return READERS[extension](file)
+
+    raise OSError("Формат файла '%s' не поддерживается." % extension)
@@ -1,3 +1,6 @@
+import hashlib
+import json
+import os
 from typing import List, Optional
 from decimal import Decimal
 
@@ -37,3 +40,52 @@ class ProductBaseModel(BaseModel):
     tags: Optional[List[str]] = Field(max_length=64)
     offer: OfferBaseModel
     details: List[DetailsBaseModel]
+
+
+def detail_must_be_unique_validator(v: List[Optional[DetailsBaseModel]]) -> None:
+    """
+    Валидация параметров продукта по уникальности.
+    """
+    details = []
+    for item in v:
+        if item.name not in details:
+            details.append(item.name)
+        else:
+            raise ValueError("Свойство продукта '%s' дублируется" % item.name)
+
+
+def parse_img_name_and_validate(file_path: str) -> tuple[str, str]:
+    """
+    Получение названия изображения, валидация формата изображения и его пути.
+    """
+    allowed_extensions: List[str] = ["jpg", "jpeg", "img", "webp", "png", "gif", "svg", "bmp"]
+
+    # Валидация пути
+    if len(file_path) == 0:
+        raise ValueError("Не задан путь к изображению.")
+    if len(file_path) < 5:
+        raise ValueError("Путь '%s' к изображению короче 4 символов." % file_path)
+
+    if os.path.isfile(file_path):
+        file_extension = os.path.splitext(file_path)[1].lower()
+        if file_extension[1:] in allowed_extensions:
+            file_name = os.path.basename(file_path)
+
+            return file_name, file_path
+
+        else:
+            raise ValueError("Формат изображения '%s' не поддерживается." % file_extension)
+    else:
+        raise FileNotFoundError("Файл изображения не существует или путь '%s' недействителен." % file_path)
+
+
+def product_fingerprint(obj: ProductBaseModel) -> str:
+    """
+    Получение отпечатка данных продукта.
+    Магазин и предложение не учитываются, так как предложения записываются при каждом импорте.
+    Изменение файла превью учитывается по его размеру и времени изменения.
+    """
+    data = obj.model_dump(mode="json", exclude={"shop", "offer"})
+    stat = os.stat(obj.preview)
+    data["preview_stat"] = [stat.st_size, stat.st_mtime_ns]
+    return hashlib.sha256(json.dumps(data, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
@@ -1,110 +1,201 @@
 import os
-import json
-import time
-from typing import List, Dict, Optional, Tuple, Union
+from typing import Any, Callable, Iterable, List, Dict, Optional, Tuple, Union
 
 from django.core.mail import EmailMessage
 from django.conf import settings
-from django.core.cache import cache
 from django.db import transaction, DatabaseError, IntegrityError
+from celery import chord, group
 from config.celery import app
 from celery.utils.log import get_task_logger
 from pydantic import ValidationError
 from json.decoder import JSONDecodeError
 
+from catalog.caching import invalidate_catalog_cache
+from catalog.price_stats import update_price_stats
 from products.models import Product, ProductDetail, Detail, Manufacturer, Category, Tag
+from products.tasks import update_autocomplete_index
 from shops.models import Offer, Shop
-from importdata.services import ProductBaseModel, DetailsBaseModel
+from importdata.bulk import DEFAULT_BATCH_SIZE, load_bulk
+from importdata.images import ImageStore, is_content_addressed
+from importdata.lease import ImportLease
+from importdata.readers import open_reader, record_validator, supported_formats, with_offset
+from importdata.services import ProductBaseModel, detail_must_be_unique_validator, parse_img_name_and_validate
 
 
 logger = get_task_logger(__name__)
 
 
-# noqa: C901
 @app.task(ignore_result=True, name="importdata.tasks.load_files")
-def load_files(files: Tuple[Optional[str]], email_to: Optional[str]) -> None:  # noqa: C901
+def load_files(
+    files: Tuple[Optional[str]],
+    email_to: Optional[str],
+    batch_size: Optional[int] = None,
+    delta: bool = False,
+    workers: Optional[int] = None,
+) -> None:
     """
     Задача Сelery. Импорт файлов.
+    Каждый файл импортируется отдельной задачей import_file, задачи выполняются
+    параллельно (celery chord), по их завершению import_report формирует отчет.
+    Если задан batch_size, то продукты импортируются пачками (см. importdata.bulk).
+    Если задан delta, то неизмененные с прошлого импорта продукты не перезаписываются,
+    импорт при этом выполняется пачками.
+    workers - количество процессов валидации при импорте пачками (по умолчанию IMPORT_VALIDATION_WORKERS).
     """
-    file_total: int = 0
-    failed_file: int = 0
-    successed_file: int = 0
-    total_product: int = 0
-    total_loaded_product: int = 0
-    total_failed_product: int = 0
-    formats: List[str] = ["json"]
     folder: str = settings.IMPORT_FOLDER
-    excp: Optional[Dict] = {}
-
-    cache_key = "import_is_running"
-    cache.set(key=cache_key, value=True)
-
-    # set delay to imitate a complicated task
-    time.sleep(10)
 
     try:
         dir_files = get_files(folder)
     except FileNotFoundError as e:
         logger.critical(e)
-    else:
-        if not files:
-            files = dir_files
-            logger.warning("Файлы не выбраны, импорт инициирован из всех файлов находящихся в '%s'." % folder)
+        return
 
-        for file in files:
-            logger.info("Импорт файла %s..." % file)
-            file_total += 1
+    if not files:
+        files = dir_files
+        logger.warning("Файлы не выбраны, импорт инициирован из всех файлов находящихся в '%s'." % folder)
 
-            try:
-                if file in dir_files:
-                    file_format_validator(file=file, formats=formats)
-                    file_path = os.path.join(folder, file)
+    files = list(files)
+    lease = ImportLease()
+    sizes = {file: os.path.getsize(os.path.join(folder, file)) for file in files if file in dir_files}
 
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        products = json.load(f)
+    if not lease.acquire(files, sizes):
+        logger.warning("Импорт не запущен. Предыдущий импорт ещё не завершен.")
+        return
 
-                        l, f, t, e = load(products)
-                else:
-                    raise FileNotFoundError("Файла нет папке '%s'" % folder)
-
-            except (DatabaseError, JSONDecodeError, FileNotFoundError, OSError, ValueError) as e:
-                failed_file += 1
-                excp[file] = [e]
-                if not isinstance(e, FileNotFoundError):
-                    os.rename(
-                        os.path.join(folder, file),
-                        os.path.join(folder, "failed_import_files", file),
-                    )
-                logger.critical("Файл '%s' не импортирован. %s: %s" % (file, type(e), e))
-
-            else:
-                total_loaded_product += l
-                total_failed_product += f
-                total_product += t
-                successed_file += 1
-                os.rename(file_path, os.path.join(folder, "success_import_files", file))
-
-                if f > 0:
-                    excp[file] = e
-                    logger.warning(
-                        "Файл %s импортирован не полностью. Импортировано %d из %d продуктов." % (file, l, t)
+    try:
+        header = group(import_file.s(file, lease.token, batch_size, delta, workers) for file in files)
+        chord(header)(import_report.s(files, email_to, lease.token))
+    except Exception:
+        lease.release()
+        raise
+
+
+@app.task(name="importdata.tasks.import_file")
+def import_file(
+    file: str, token: str, batch_size: Optional[int] = None, delta: bool = False, workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Задача Сelery. Импорт одного файла.
+    Возвращает счетчики и ошибки импорта файла для отчета.
+    """
+    formats: List[str] = supported_formats()
+    folder: str = settings.IMPORT_FOLDER
+    lease = ImportLease(token)
+    result: Dict[str, Any] = {"file": file, "success": False, "loaded": 0, "failed": 0, "total": 0, "errors": []}
+    # счетчики последнего прогресса: продукты, записанные до ошибки в файле, уже сохранены в БД
+    counters: Dict[str, int] = {}
+
+    logger.info("Импорт файла %s..." % file)
+    lease.update(file, status="running")
+
+    try:
+        if file in get_files(folder):
+            file_format_validator(file=file, formats=formats)
+            file_path = os.path.join(folder, file)
+            lease.update(file, size=os.path.getsize(file_path))
+
+            with open(file_path, "rb") as f:
+                products = open_reader(f, file)
+
+                def progress(**values: int) -> None:
+                    counters.update(values)
+                    lease.update(file, position=products.position, **values)
+
+                if batch_size or delta:
+                    l, f, t, e = load_bulk(
+                        products,
+                        batch_size=batch_size or DEFAULT_BATCH_SIZE,
+                        progress=progress,
+                        delta=delta,
+                        workers=workers,
                     )
                 else:
-                    logger.info("Импорт файла '%s' завершен. Импортировано %d из %d продуктов." % (file, l, t))
+                    l, f, t, e = load(products, progress=progress)
+        else:
+            raise FileNotFoundError("Файла нет папке '%s'" % folder)
+
+    except (DatabaseError, JSONDecodeError, FileNotFoundError, OSError, EOFError, ValueError) as e:
+        result.update(errors=[str(e)], **get_partial_counters(counters))
+        if not isinstance(e, FileNotFoundError):
+            move_failed_file(folder, file)
+        logger.critical("Файл '%s' не импортирован. %s: %s" % (file, type(e), e))
+
+    except Exception as e:
+        result.update(errors=[str(e)], **get_partial_counters(counters))
+        move_failed_file(folder, file)
+        logger.critical("Файл '%s' не импортирован, необработаная ошибка: %s %s" % (file, type(e), e))
+
+    else:
+        result.update(success=True, loaded=l, failed=f, total=t)
+        os.rename(file_path, os.path.join(folder, "success_import_files", file))
+
+        if f > 0:
+            result["errors"] = [str(error) for error in e]
+            logger.warning("Файл %s импортирован не полностью. Импортировано %d из %d продуктов." % (file, l, t))
+        else:
+            logger.info("Импорт файла '%s' завершен. Импортировано %d из %d продуктов." % (file, l, t))
+
+    lease.update(
+        file,
+        status="done" if result["success"] else "failed",
+        loaded=result["loaded"],
+        failed=result["failed"],
+        total=result["total"],
+    )
+
+    return result
+
+
+def get_partial_counters(counters: Dict[str, int]) -> Dict[str, int]:
+    """
+    Счетчики файла, импорт которого прерван ошибкой. Импортированные до ошибки продукты
+    остаются в БД и учитываются в отчете.
+    """
+    return {key: counters.get(key, 0) for key in ("loaded", "failed", "total")}
+
+
+def move_failed_file(folder: str, file: str) -> None:
+    """
+    Перенос неимпортированного файла в папку failed_import_files, чтобы он не импортировался повторно.
+    """
+    file_path = os.path.join(folder, file)
+
+    if os.path.isfile(file_path):
+        os.rename(file_path, os.path.join(folder, "failed_import_files", file))
+
+
+@app.task(ignore_result=True, name="importdata.tasks.import_report")
+def import_report(results: List[Dict[str, Any]], files: List[str], email_to: Optional[str], token: str) -> None:
+    """
+    Задача Сelery. Сведение результатов импорта файлов и отправка отчета.
+    """
+    try:
+        successed_file = sum(1 for result in results if result["success"])
+        total_loaded_product = sum(result["loaded"] for result in results)
+        total_product = sum(result["total"] for result in results)
+        excp = {result["file"]: result["errors"] for result in results if result["errors"]}
 
-        logger.info("Всего импортированно %d файлов из %d" % (successed_file, file_total))
+        logger.info("Всего импортированно %d файлов из %d" % (successed_file, len(files)))
         logger.info(
             "Всего импортированно %d из %d продуктов из %d файлов"
             % (total_loaded_product, total_product, successed_file)
         )
 
-        mail_report(files, file_total, successed_file, excp, email_to)
+        mail_report(files, len(files), successed_file, excp, email_to)
+
+        if total_loaded_product:
+            # пакетный импорт не вызывает сигналы моделей
+            invalidate_catalog_cache()
+            update_price_stats()
+            update_autocomplete_index.delay()
 
     finally:
-        cache.set(key=cache_key, value=False)
+        ImportLease(token).release()
 
 
-def load(products) -> tuple[int, int, int, List[Optional[Exception]]]:
+def load(  # noqa: C901
+    products: Iterable[Dict[str, Any]], progress: Optional[Callable[..., None]] = None
+) -> tuple[int, int, int, List[Optional[Exception]]]:
     """
     Импорт проудктов из файла.
     """
@@ -114,57 +205,67 @@ def load(products) -> tuple[int, int, int, List[Optional[Exception]]]:
     obj_count: int = 0
     excp: List[Union[Exception]] = []
 
-    for product_data in products:
-        total_objects += 1
-        obj_count += 1
-        logger.info("Импорт продукта №%d..." % obj_count)
-        try:
-            obj: ProductBaseModel = ProductBaseModel(**product_data)
-
-            with transaction.atomic():
-                shop = get_and_validate_shop(obj)
-                manufacturer = get_or_create_manufacturer(obj)
-                tags = get_or_create_tag(obj)
-
-                try:
-                    product = (
-                        Product.objects.select_related("manufacturer", "category")
-                        .prefetch_related("details", "tags")
-                        .get(name=obj.name)
-                    )
-
-                except Product.DoesNotExist:
-                    create_product(obj, manufacturer, shop, tags)
-                    logger.info("Продукт №%d(%s) импортирован успешно" % (obj_count, obj.name))
-                else:
-                    update_product(obj, manufacturer, product, shop, tags)
-                    logger.info("Продукт №%d(%s) обновлен успешно" % (obj_count, obj.name))
-
-                loaded_object_count += 1
-
-        except ValidationError as e:
-            failed_object_count += 1
-            excp.append(e)
-            logger.error(
-                "Продукт №%d не импортирован. %s: продукт содержит ошибки валидации в кол-ве: %s шт"
-                % (obj_count, type(e), e.error_count())
-            )
-
-        except (ValueError, FileNotFoundError, IntegrityError) as e:
-            failed_object_count += 1
-            excp.append(e)
-            logger.error("Продукт №%d(%s) не импортирован: %s %s" % (obj_count, product_data["name"], type(e), e))
-
-        except DatabaseError:
-            raise
-
-        except Exception as e:
-            failed_object_count += 1
-            excp.append(e)
-            logger.critical(
-                "Продукт №%d(%s) не импортирован, необработаная ошибка: %s %s"
-                % (obj_count, product_data["name"], type(e), e)
-            )
+    with ImageStore() as images:
+        for product_data in products:
+            total_objects += 1
+            obj_count += 1
+            logger.info("Импорт продукта №%d..." % obj_count)
+            try:
+                record_validator(product_data)
+                obj: ProductBaseModel = ProductBaseModel(**product_data)
+                # превью копируется в фоне, пока выполняются запросы к БД
+                img_name, img_path = parse_img_name_and_validate(obj.preview)
+                images.submit(img_path)
+
+                with transaction.atomic():
+                    shop = get_and_validate_shop(obj)
+                    manufacturer = get_or_create_manufacturer(obj)
+                    tags = get_or_create_tag(obj)
+
+                    try:
+                        product = (
+                            Product.objects.select_related("manufacturer", "category")
+                            .prefetch_related("details", "tags")
+                            .get(name=obj.name)
+                        )
+
+                    except Product.DoesNotExist:
+                        create_product(obj, manufacturer, shop, tags, images)
+                        logger.info("Продукт №%d(%s) импортирован успешно" % (obj_count, obj.name))
+                    else:
+                        update_product(obj, manufacturer, product, shop, tags, images)
+                        logger.info("Продукт №%d(%s) обновлен успешно" % (obj_count, obj.name))
+
+                    loaded_object_count += 1
+
+            except ValidationError as e:
+                failed_object_count += 1
+                excp.append(with_offset(e, product_data))
+                logger.error(
+                    "Продукт №%d не импортирован. %s: продукт содержит ошибки валидации в кол-ве: %s шт"
+                    % (obj_count, type(e), e.error_count())
+                )
+
+            except (ValueError, FileNotFoundError, IntegrityError) as e:
+                failed_object_count += 1
+                excp.append(with_offset(e, product_data))
+                logger.error(
+                    "Продукт №%d(%s) не импортирован: %s %s" % (obj_count, product_data.get("name"), type(e), e)
+                )
+
+            except DatabaseError:
+                raise
+
+            except Exception as e:
+                failed_object_count += 1
+                excp.append(with_offset(e, product_data))
+                logger.critical(
+                    "Продукт №%d(%s) не импортирован, необработаная ошибка: %s %s"
+                    % (obj_count, product_data.get("name"), type(e), e)
+                )
+
+            if progress:
+                progress(loaded=loaded_object_count, failed=failed_object_count, total=total_objects)
 
     if total_objects == failed_object_count:
         raise ValueError("Ни один продукт не был добавлен")
@@ -172,7 +273,9 @@ def load(products) -> tuple[int, int, int, List[Optional[Exception]]]:
     return loaded_object_count, failed_object_count, total_objects, excp
 
 
-def create_product(obj: ProductBaseModel, manufacturer: Manufacturer, shop: Shop, tags: Optional[List[Tag]]) -> None:
+def create_product(
+    obj: ProductBaseModel, manufacturer: Manufacturer, shop: Shop, tags: Optional[List[Tag]], images: ImageStore
+) -> None:
     """
     Создание сущности Продукт.
     """
@@ -186,12 +289,11 @@ def create_product(obj: ProductBaseModel, manufacturer: Manufacturer, shop: Shop
     )
     # add tags if any
     product.tags.add(*tags)
-    product.save()
 
     img_name, img_path = parse_img_name_and_validate(obj.preview)
-    # add image
-    with open(img_path, "rb") as f:
-        product.preview.save(img_name, f, save=True)
+    # add image, stored once per content
+    product.preview = images.get(img_path)
+    product.save()
 
     # get or create details and create product_details
     product_details_create_or_update(obj, product)
@@ -201,7 +303,9 @@ def create_product(obj: ProductBaseModel, manufacturer: Manufacturer, shop: Shop
     offer.save()
 
 
-def update_product(obj: ProductBaseModel, manufacturer: Manufacturer, product: Product, shop: Shop, tags) -> None:
+def update_product(
+    obj: ProductBaseModel, manufacturer: Manufacturer, product: Product, shop: Shop, tags, images: ImageStore
+) -> None:
     """
     Обнавление сущности Продукт.
     """
@@ -213,15 +317,15 @@ def update_product(obj: ProductBaseModel, manufacturer: Manufacturer, product: P
     # clear current tags if any and add new if any
     product.tags.clear()
     product.tags.add(*tags)
-    product.save()
-
-    # delete image if any
-    product.preview.delete(save=True)
 
     img_name, img_path = parse_img_name_and_validate(obj.preview)
-    # add image
-    with open(img_path, "rb") as f:
-        product.preview.save(img_name, f, save=True)
+    preview = images.get(img_path)
+    # replace image if its content has changed, shared images are kept
+    if product.preview.name != preview:
+        if not is_content_addressed(product.preview.name):
+            product.preview.delete(save=False)
+        product.preview = preview
+    product.save()
 
     product_details_create_or_update(obj, product, update=True)
 
@@ -250,10 +354,10 @@ def get_or_create_manufacturer(obj: ProductBaseModel) -> Manufacturer:
     """
     Получение или создание сущности Производитель.
     """
-    try:
-        manufacturer = Manufacturer.objects.get(name=obj.manufacturer.name)
-    except Manufacturer.DoesNotExist:
-        manufacturer = Manufacturer.objects.create(name=obj.manufacturer.name, slug=obj.manufacturer.slug)
+    # производитель мог быть создан параллельным импортом, get_or_create получает его при конфликте
+    manufacturer, created = Manufacturer.objects.get_or_create(
+        name=obj.manufacturer.name, defaults={"slug": obj.manufacturer.slug}
+    )
 
     return manufacturer
 
@@ -276,19 +380,17 @@ def main_category_create(obj: ProductBaseModel, has_sub_cat=False) -> Category:
     else:
         category_data = (obj.category.category, obj.category.cat_slug)
 
-    try:
-        category = Category.objects.get(name=category_data[0])
-        if category.parent:
-            raise IntegrityError("'%s' уже используется в БД, как подкатегория." % category_data[0])
+    category, created = Category.objects.get_or_create(name=category_data[0], defaults={"slug": category_data[1]})
+    if created:
+        return category
 
-        category.slug = category_data[1]
-        category.save()
+    if category.parent:
+        raise IntegrityError("'%s' уже используется в БД, как подкатегория." % category_data[0])
 
-        return category
+    category.slug = category_data[1]
+    category.save()
 
-    except Category.DoesNotExist:
-        category = Category.objects.create(name=category_data[0], slug=category_data[1])
-        return category
+    return category
 
 
 def category_create(obj: ProductBaseModel) -> Category:
@@ -329,51 +431,14 @@ def product_details_create_or_update(obj: ProductBaseModel, product: Product, up
         product_detail.save()
 
 
-def detail_must_be_unique_validator(v: List[Optional[DetailsBaseModel]]) -> None:
-    """
-    Валидация параметров продукта по уникальности.
-    """
-    details = []
-    for item in v:
-        if item.name not in details:
-            details.append(item.name)
-        else:
-            raise ValueError("Свойство продукта '%s' дублируется" % item.name)
-
-
-def parse_img_name_and_validate(file_path: str) -> tuple[str, str]:
-    """
-    Получение названия изображения, валидация формата изображения и его пути.
-    """
-    allowed_extensions: List[str] = ["jpg", "jpeg", "img", "webp", "png", "gif", "svg", "bmp"]
-
-    # Валидация пути
-    if len(file_path) == 0:
-        raise ValueError("Не задан путь к изображению.")
-    if len(file_path) < 5:
-        raise ValueError("Путь '%s' к изображению короче 4 символов." % file_path)
-
-    if os.path.isfile(file_path):
-        file_extension = os.path.splitext(file_path)[1].lower()
-        if file_extension[1:] in allowed_extensions:
-            file_name = os.path.basename(file_path)
-
-            return file_name, file_path
-
-        else:
-            raise ValueError("Формат изображения '%s' не поддерживается." % file_extension)
-    else:
-        raise FileNotFoundError("Файл изображения не существует или путь '%s' недействителен." % file_path)
-
-
 def file_format_validator(file: str, formats: List[str]) -> None:
     """
-    Валидация формата файла.
+    Валидация формата файла. Формат сжатого файла задается двумя расширениями (например, ndjson.gz).
     """
     parts = file.rsplit(".", 2)
 
     if len(parts) > 1:
-        if not parts[-1] in formats:
+        if not parts[-1] in formats and ".".join(parts[-2:]) not in formats:
             raise OSError("Формат файла '%s' не поддерживается." % parts[-1])
     else:
         raise OSError("Формат файла не задан")
@@ -1,19 +1,637 @@
-from django.test import TestCase
-from .tasks import load_files
+import copy
+import gzip
+import io
+import json
+import os
+import re
+import shutil
+import tempfile
+from unittest import mock
 
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from pydantic import ValidationError
+
+from config.celery import app
+
+from products.models import Product, ProductDetail, ProductImage
+from products.services.search_services import search_products
+from shops.models import Offer, Shop
+from .bench import FeedGenerator
+from .bulk import BulkLoader, load_bulk
+from .images import content_name, store_image
+from .lease import ImportLease
+from .models import ProductFingerprint
+from .planner import ImportPlanner
+from .readers import JsonArrayReader, RecordError, open_reader, record_validator, supported_formats
+from .services import ProductBaseModel, product_fingerprint
+from .tasks import file_format_validator, import_file, load_files
+
+User = get_user_model()
+
+PRODUCT_DATA = {
+    "shop": "тестовый магазин",
+    "name": "тестовый продукт",
+    "about": "краткое описание",
+    "description": "описание",
+    "preview": "import_folder/product_img/airpods_pro3.webp",
+    "tags": ["тег 1", "тег 2"],
+    "offer": {"price": "100.00", "quantity": 10},
+    "details": [{"name": "свойство 1", "value": "значение 1"}, {"name": "свойство 2", "value": "значение 2"}],
+    "manufacturer": {"name": "тестовый производитель", "slug": "test-manufacturer"},
+    "category": {"category": "подкатегория", "cat_slug": "sub-test", "subcategory": "категория", "sub_slug": "test"},
+}
+
+
+class TempMediaMixin:
+    """Сохранение превью импорта во временную папку вместо MEDIA_ROOT проекта"""
+
+    def setUp(self):
+        super().setUp()
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        self.override = override_settings(MEDIA_ROOT=self.media.name)
+        self.override.enable()
+        self.addCleanup(self.override.disable)
+
+
+class ImportTest(TempMediaMixin, TestCase):
+    """Тест импорта файлов из import_folder по одному продукту"""
+
+    files = {
+        "successed_file.json": "import_folder/successed_file.json",
+        "format_error_file.jsn": "import_folder/format_error_file.jsn",
+        "json_error_file.json": "import_folder/json_error_file.json",
+        "partially_successed_file.json": "import_folder/success_import_files/partially_successed_file.json",
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username="test_import_user", password="QWerty1234", email="import@mail.com")
+        for name in ("DNS", "YANDEX", "OZON"):
+            Shop.objects.create(user=cls.user, name=name)
+
+    def setUp(self):
+        super().setUp()
+        self.folder = tempfile.TemporaryDirectory()
+        self.addCleanup(self.folder.cleanup)
+        for subfolder in ("success_import_files", "failed_import_files"):
+            os.mkdir(os.path.join(self.folder.name, subfolder))
+        for file, source in self.files.items():
+            shutil.copy(source, os.path.join(self.folder.name, file))
+
+        self.always_eager = app.conf.task_always_eager
+        app.conf.task_always_eager = True
+        self.addCleanup(setattr, app.conf, "task_always_eager", self.always_eager)
+        cache.delete(ImportLease.cache_key)
 
-class ImportTest(TestCase):
     def test_load_data(self):
-        email = "example@gmail.com"
-        files = (
-            "file_not_founded_error",
-            "successed_file.json",
-            "format_error_file.jsn",
-            "format_error_file_2",
-            "json_error_file.json",
-            "partially_successed_file.json",
+        with override_settings(IMPORT_FOLDER=self.folder.name):
+            load_files(["file_not_founded_error", *self.files], "example@gmail.com")
+
+        for folder, files in (
+            ("success_import_files", ["partially_successed_file.json", "successed_file.json"]),
+            ("failed_import_files", ["format_error_file.jsn", "json_error_file.json"]),
+        ):
+            self.assertEqual(sorted(os.listdir(os.path.join(self.folder.name, folder))), files)
+
+        self.assertTrue(Product.objects.filter(name="Amazon Kindle 11").exists())
+        self.assertFalse(Offer.objects.filter(shop__name="Wildberries").exists())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("Импортированно 2 файлов из 5", mail.outbox[0].body)
+        self.assertIn("file_not_founded_error", mail.outbox[0].body)
+        self.assertIsNone(ImportLease.current())
+
+
+class ParallelImportTest(TempMediaMixin, TestCase):
+    """Тесты параллельного импорта файлов"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username="test_import_user", password="QWerty1234", email="import@mail.com")
+        cls.shop = Shop.objects.create(user=cls.user, name="тестовый магазин")
+
+    def setUp(self):
+        super().setUp()
+        self.folder = tempfile.TemporaryDirectory()
+        for subfolder in ("success_import_files", "failed_import_files"):
+            os.mkdir(os.path.join(self.folder.name, subfolder))
+
+        with open(os.path.join(self.folder.name, "products.json"), "w", encoding="utf-8") as f:
+            json.dump([PRODUCT_DATA], f)
+        with open(os.path.join(self.folder.name, "broken.json"), "w", encoding="utf-8") as f:
+            f.write("[{")
+
+        self.always_eager = app.conf.task_always_eager
+        app.conf.task_always_eager = True
+        cache.delete(ImportLease.cache_key)
+
+    def tearDown(self):
+        app.conf.task_always_eager = self.always_eager
+        self.folder.cleanup()
+
+    def test_files_imported_and_reported(self):
+        with override_settings(IMPORT_FOLDER=self.folder.name):
+            load_files(["products.json", "broken.json", "missing.json"], "example@gmail.com", 10)
+
+        self.assertTrue(Product.objects.filter(name=PRODUCT_DATA["name"]).exists())
+        self.assertTrue(os.path.isfile(os.path.join(self.folder.name, "success_import_files", "products.json")))
+        self.assertTrue(os.path.isfile(os.path.join(self.folder.name, "failed_import_files", "broken.json")))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("Импортированно 1 файлов из 3", mail.outbox[0].body)
+        self.assertIn("missing.json", mail.outbox[0].body)
+        self.assertIsNone(ImportLease.current())
+
+    def test_file_with_unexpected_error_is_moved_to_failed(self):
+        with override_settings(IMPORT_FOLDER=self.folder.name):
+            with mock.patch("importdata.tasks.load_bulk", side_effect=RuntimeError("ошибка")):
+                load_files(["products.json"], None, 10)
+
+        self.assertFalse(os.path.exists(os.path.join(self.folder.name, "products.json")))
+        self.assertTrue(os.path.isfile(os.path.join(self.folder.name, "failed_import_files", "products.json")))
+        self.assertIsNone(ImportLease.current())
+
+    def test_partially_imported_file_reports_loaded_products(self):
+        with open(os.path.join(self.folder.name, "partial.json"), "w", encoding="utf-8") as f:
+            f.write("[%s, {" % json.dumps(PRODUCT_DATA))
+
+        lease = ImportLease()
+        self.assertTrue(lease.acquire(["partial.json"]))
+        with override_settings(IMPORT_FOLDER=self.folder.name):
+            result = import_file("partial.json", lease.token, batch_size=1, workers=0)
+        lease.release()
+
+        self.assertTrue(Product.objects.filter(name=PRODUCT_DATA["name"]).exists())
+        self.assertFalse(result["success"])
+        self.assertEqual((result["loaded"], result["failed"], result["total"]), (1, 0, 1))
+        self.assertTrue(os.path.isfile(os.path.join(self.folder.name, "failed_import_files", "partial.json")))
+
+    def test_import_not_started_while_lease_is_held(self):
+        lease = ImportLease()
+        self.assertTrue(lease.acquire(["products.json"]))
+        self.assertFalse(ImportLease().acquire(["products.json"]))
+
+        with override_settings(IMPORT_FOLDER=self.folder.name):
+            load_files(["products.json"], None)
+
+        self.assertFalse(Product.objects.filter(name=PRODUCT_DATA["name"]).exists())
+        self.assertEqual(ImportLease.current().token, lease.token)
+
+        lease.release()
+        self.assertIsNone(ImportLease.current())
+
+
+class ImportProgressTest(TestCase):
+    """Тесты прогресса импорта"""
+
+    def setUp(self):
+        cache.delete(ImportLease.cache_key)
+        self.lease = ImportLease()
+        self.lease.acquire(["first.json", "second.json"], {"first.json": 1000, "second.json": 1000})
+        self.addCleanup(self.lease.release)
+
+    def test_status_counters_and_eta(self):
+        with mock.patch("importdata.lease.time.time", return_value=self.lease_started_at() + 10):
+            self.lease.update("first.json", status="running")
+        with mock.patch("importdata.lease.time.time", return_value=self.lease_started_at() + 20):
+            self.lease.update("first.json", position=500, total=50, loaded=40, failed=10)
+            status = self.lease.status()
+
+        self.assertTrue(status["running"])
+        self.assertEqual((status["processed"], status["loaded"], status["failed"]), (50, 40, 10))
+        self.assertEqual(status["rate"], 2.5)
+        self.assertEqual(status["files"]["first.json"]["rate"], 5.0)
+        self.assertEqual(status["files"]["first.json"]["eta"], 10.0)
+        self.assertIsNone(status["files"]["second.json"]["eta"])
+        # осталось 500 байт первого файла и 1000 байт второго при скорости 25 байт/сек
+        self.assertEqual(status["eta"], 60.0)
+
+    def test_progress_view(self):
+        user = User.objects.create_superuser(username="admin", password="QWerty1234", email="admin@mail.com")
+        self.client.force_login(user)
+        self.lease.update("first.json", status="running", position=100, total=10, loaded=10, failed=0)
+
+        response = self.client.get(reverse("importdata:progress"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["loaded"], 10)
+        self.assertEqual(response.json()["files"]["second.json"]["status"], "pending")
+
+        self.lease.release()
+        self.assertEqual(self.client.get(reverse("importdata:progress")).json(), {"running": False})
+
+    def lease_started_at(self):
+        return cache.get(ImportLease.cache_key)["started_at"]
+
+
+class BulkLoadTest(TempMediaMixin, TestCase):
+    """Тесты пакетного импорта продуктов"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username="test_import_user", password="QWerty1234", email="import@mail.com")
+        cls.shop = Shop.objects.create(user=cls.user, name="тестовый магазин")
+
+    def get_products(self, count, start=0):
+        products = []
+        for i in range(start, start + count):
+            product = copy.deepcopy(PRODUCT_DATA)
+            product["name"] = "тестовый продукт %d" % i
+            products.append(product)
+        return products
+
+    def test_load_creates_and_updates(self):
+        products = self.get_products(5)
+
+        loaded, failed, total, excp = load_bulk(products, batch_size=2)
+
+        self.assertEqual((loaded, failed, total, excp), (5, 0, 5, []))
+        self.assertEqual(Product.objects.filter(name__startswith="тестовый продукт").count(), 5)
+        self.assertEqual(ProductDetail.objects.count(), 10)
+        self.assertEqual(Offer.objects.filter(shop=self.shop).count(), 5)
+
+        products[0]["details"] = [{"name": "свойство 1", "value": "новое значение"}]
+        loaded, failed, total, excp = load_bulk(products, batch_size=2)
+
+        product = Product.objects.get(name="тестовый продукт 0")
+        self.assertEqual(loaded, 5)
+        self.assertEqual(list(product.productdetail_set.values_list("value", flat=True)), ["новое значение"])
+        self.assertEqual(Offer.objects.get(product=product).remains, 20)
+        self.assertEqual(product.tags.count(), 2)
+
+    def test_load_reports_row_errors(self):
+        products = self.get_products(3)
+        products[0]["offer"]["quantity"] = 0
+        products[1]["shop"] = "несуществующий магазин"
+
+        loaded, failed, total, excp = load_bulk(products)
+
+        self.assertEqual((loaded, failed, total), (1, 2, 3))
+        self.assertEqual(len(excp), 2)
+
+    def test_integrity_error_fails_only_conflicting_rows(self):
+        products = self.get_products(3)
+        write_offers = BulkLoader.write_offers
+
+        def conflicting_write_offers(loader, items, written):
+            if any(obj.name == "тестовый продукт 1" for obj, _ in items):
+                raise IntegrityError("конфликт")
+            write_offers(loader, items, written)
+
+        with mock.patch.object(BulkLoader, "write_offers", conflicting_write_offers):
+            loaded, failed, total, excp = load_bulk(products)
+
+        self.assertEqual((loaded, failed, total), (2, 1, 3))
+        self.assertEqual([str(e) for e in excp], ["конфликт"])
+        self.assertFalse(Product.objects.filter(name="тестовый продукт 1").exists())
+        written = ["тестовый продукт 0", "тестовый продукт 2"]
+        self.assertEqual(Offer.objects.filter(product__name__in=written).count(), 2)
+
+    def test_load_reports_record_offset(self):
+        products = self.get_products(2)
+        products[1]["shop"] = "несуществующий магазин"
+        content = json.dumps(products).encode("utf-8")
+
+        loaded, failed, total, excp = load_bulk(JsonArrayReader(io.BytesIO(content)))
+
+        self.assertEqual((loaded, failed, total), (1, 1, 2))
+        self.assertIsInstance(excp[0], RecordError)
+        self.assertEqual(excp[0].offset, content.index(b'{"shop"', 2))
+
+    def test_validation_in_process_pool(self):
+        products = self.get_products(6)
+        products[1]["offer"]["quantity"] = 0
+        products[4]["details"].append(products[4]["details"][0])
+        content = json.dumps(products).encode("utf-8")
+
+        loaded, failed, total, excp = load_bulk(JsonArrayReader(io.BytesIO(content)), batch_size=2, workers=2)
+
+        self.assertEqual((loaded, failed, total), (4, 2, 6))
+        self.assertEqual([type(e.error) for e in excp], [ValidationError, ValueError])
+        offsets = [m.start() for m in re.finditer(b'{"shop"', content)]
+        self.assertEqual([e.offset for e in excp], [offsets[1], offsets[4]])
+        self.assertEqual(Product.objects.filter(name__startswith="тестовый продукт").count(), 4)
+
+    def test_load_updates_search_vector(self):
+        products = self.get_products(2)
+        load_bulk(products)
+
+        products[0]["about"] = "wireless headphones"
+        load_bulk(products)
+
+        found = search_products(Product.objects.all(), "headphone").values_list("name", flat=True)
+        self.assertEqual(list(found), ["тестовый продукт 0"])
+
+    def test_queries_do_not_depend_on_batch_size(self):
+        load_bulk(self.get_products(1))
+
+        with CaptureQueriesContext(connection) as small_batch:
+            load_bulk(self.get_products(2, start=1))
+
+        with CaptureQueriesContext(connection) as large_batch:
+            load_bulk(self.get_products(20, start=3))
+
+        self.assertEqual(len(small_batch), len(large_batch))
+
+
+class DeltaImportTest(TempMediaMixin, TestCase):
+    """Тесты импорта только изменившихся продуктов"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username="test_import_user", password="QWerty1234", email="import@mail.com")
+        cls.shop = Shop.objects.create(user=cls.user, name="тестовый магазин")
+
+    def setUp(self):
+        super().setUp()
+        self.products = []
+        for i in range(3):
+            product = copy.deepcopy(PRODUCT_DATA)
+            product["name"] = "тестовый продукт %d" % i
+            self.products.append(product)
+        load_bulk(self.products, delta=True)
+
+    def test_fingerprints_are_stored(self):
+        self.assertEqual(ProductFingerprint.objects.count(), 3)
+
+    def test_unchanged_products_are_not_rewritten(self):
+        with CaptureQueriesContext(connection) as queries:
+            loaded, failed, total, excp = load_bulk(self.products, delta=True)
+
+        self.assertEqual((loaded, failed, total), (3, 0, 3))
+        written = [
+            q["sql"]
+            for q in queries
+            # предложения и их сводки каталога записываются всегда
+            if q["sql"].startswith(("INSERT", "UPDATE", "DELETE"))
+            and "shops_offer" not in q["sql"]
+            and "catalog_offersummary" not in q["sql"]
+        ]
+        self.assertEqual(written, [])
+        self.assertEqual(Offer.objects.get(product__name="тестовый продукт 0").remains, 20)
+
+    def test_only_changed_details_are_updated(self):
+        product = Product.objects.get(name="тестовый продукт 0")
+        details = dict(product.productdetail_set.values_list("detail__name", "pk"))
+        self.products[0]["details"][1]["value"] = "новое значение"
+        self.products[0]["about"] = "новое краткое описание"
+
+        with CaptureQueriesContext(connection) as queries:
+            load_bulk(self.products, delta=True)
+
+        product.refresh_from_db()
+        self.assertEqual(product.about, "новое краткое описание")
+        self.assertEqual(dict(product.productdetail_set.values_list("detail__name", "pk")), details)
+        self.assertEqual(product.productdetail_set.get(detail__name="свойство 2").value, "новое значение")
+        self.assertFalse([q for q in queries if q["sql"].startswith('DELETE FROM "products_productdetail"')])
+        self.assertEqual(
+            ProductFingerprint.objects.get(product=product).fingerprint,
+            product_fingerprint(ProductBaseModel(**self.products[0])),
+        )
+
+
+class ImportBenchTest(TempMediaMixin, TestCase):
+    """Тесты замера производительности импорта"""
+
+    def test_bench_reports_and_rolls_back(self):
+        stdout = io.StringIO()
+
+        call_command("importbench", products=20, existing=0.5, batch_size=5, stdout=stdout)
+
+        output = stdout.getvalue()
+        self.assertIn("Импортировано: 20, с ошибками: 0, всего: 20", output)
+        self.assertIn("rows/sec", output)
+        self.assertIn("на продукт", output)
+        self.assertFalse(Product.objects.filter(name__startswith="bench product").exists())
+
+    def test_feed_is_reproducible(self):
+        generator = FeedGenerator(shop="магазин", preview="preview.webp", seed=1)
+        self.assertEqual(
+            generator.product(5), FeedGenerator(shop="магазин", preview="preview.webp", seed=1).product(5)
+        )
+        ProductBaseModel(**generator.product(5))
+
+
+class ImportPlannerTest(TestCase):
+    """Тесты плана импорта без записи в БД"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username="test_import_user", password="QWerty1234", email="import@mail.com")
+        cls.shop = Shop.objects.create(user=cls.user, name="тестовый магазин")
+
+    def setUp(self):
+        super().setUp()
+        self.products = []
+        for i in range(3):
+            product = copy.deepcopy(PRODUCT_DATA)
+            product["name"] = "тестовый продукт %d" % i
+            self.products.append(product)
+        load_bulk(self.products[:2])
+
+    def test_plan(self):
+        self.products[1]["about"] = "новое краткое описание"
+        conflict = copy.deepcopy(PRODUCT_DATA)
+        conflict["name"] = "продукт с конфликтом"
+        conflict["category"] = {"category": "подкатегория", "cat_slug": "sub-test"}
+        invalid = copy.deepcopy(PRODUCT_DATA)
+        invalid["shop"] = "несуществующий магазин"
+        products = self.products + [conflict, invalid]
+
+        with CaptureQueriesContext(connection) as queries:
+            plan = ImportPlanner().plan(products)
+
+        self.assertEqual(
+            {key: value for key, value in plan.items() if key != "errors"},
+            {"total": 5, "create": 1, "update": 1, "unchanged": 1, "category_conflicts": 1, "invalid": 1},
+        )
+        self.assertTrue(any("как подкатегория" in str(e) for e in plan["errors"]))
+        self.assertFalse([q for q in queries if not q["sql"].startswith("SELECT")])
+
+    def test_repeated_product_is_planned_once(self):
+        new = copy.deepcopy(PRODUCT_DATA)
+        new["name"] = "новый продукт"
+
+        plan = ImportPlanner(batch_size=1).plan([new, new, dict(new, about="другое описание")])
+
+        self.assertEqual((plan["create"], plan["unchanged"], plan["update"]), (1, 1, 1))
+
+    def test_dry_run_command(self):
+        with tempfile.TemporaryDirectory() as folder, override_settings(IMPORT_FOLDER=folder):
+            with open(os.path.join(folder, "products.json"), "w", encoding="utf-8") as f:
+                json.dump(self.products, f)
+            stdout = io.StringIO()
+
+            call_command("importdata", "products.json", dry_run=True, stdout=stdout)
+
+            self.assertTrue(os.path.isfile(os.path.join(folder, "products.json")))
+
+        self.assertIn("создать: 1, обновить: 0, без изменений: 2", stdout.getvalue())
+        self.assertFalse(Product.objects.filter(name="тестовый продукт 2").exists())
+
+
+class ImageIngestionTest(TempMediaMixin, TestCase):
+    """Тесты сохранения превью по хэшу содержимого"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username="test_import_user", password="QWerty1234", email="import@mail.com")
+        cls.shop = Shop.objects.create(user=cls.user, name="тестовый магазин")
+
+    def test_shared_preview_is_stored_once(self):
+        products = [dict(PRODUCT_DATA, name="продукт 1"), dict(PRODUCT_DATA, name="продукт 2")]
+
+        load_bulk(products)
+
+        previews = set(Product.objects.values_list("preview", flat=True))
+        self.assertEqual(previews, {content_name(PRODUCT_DATA["preview"])})
+        self.assertEqual(ProductImage.objects.count(), 2)
+
+    def test_unchanged_preview_is_not_rewritten(self):
+        products = [dict(PRODUCT_DATA, name="продукт 1")]
+        load_bulk(products)
+
+        with mock.patch("importdata.images.default_storage.save") as save:
+            load_bulk(products)
+
+        save.assert_not_called()
+        self.assertEqual(ProductImage.objects.count(), 1)
+
+    def test_concurrently_stored_preview_is_not_duplicated(self):
+        name = store_image(PRODUCT_DATA["preview"])
+
+        # изображение сохранено параллельно после проверки наличия
+        with mock.patch("importdata.images.default_storage.exists", return_value=False):
+            self.assertEqual(store_image(PRODUCT_DATA["preview"]), name)
+
+        self.assertEqual(os.listdir(os.path.dirname(os.path.join(self.media.name, name))), [os.path.basename(name)])
+
+    def test_changed_preview_is_replaced(self):
+        load_bulk([dict(PRODUCT_DATA, name="продукт 1")])
+
+        load_bulk([dict(PRODUCT_DATA, name="продукт 1", preview="import_folder/product_img/airpods_pro2.webp")])
+
+        product = Product.objects.get(name="продукт 1")
+        self.assertEqual(product.preview.name, content_name("import_folder/product_img/airpods_pro2.webp"))
+        self.assertTrue(os.path.isfile(os.path.join(self.media.name, product.preview.name)))
+
+
+class JsonArrayReaderTest(TestCase):
+    """Тесты потокового чтения файла импорта"""
+
+    def read(self, content: bytes, buffer_size: int = 7):
+        return list(JsonArrayReader(io.BytesIO(content), buffer_size=buffer_size))
+
+    def test_records_and_offsets(self):
+        records = [{"name": "продукт"}, {"name": "product", "tags": ["тег"]}, 12345]
+        content = json.dumps(records, ensure_ascii=False, indent=2).encode("utf-8")
+
+        result = self.read(content)
+
+        self.assertEqual([dict(r) for r in result], [records[0], records[1], {}])
+        self.assertFalse(result[2].is_object)
+        self.assertEqual([content[r.offset] for r in result], [ord("{"), ord("{"), ord("1")])
+        offset = result[1].offset
+        decoded, _ = json.JSONDecoder().raw_decode(content[offset:].decode("utf-8"))
+        self.assertEqual(decoded, records[1])
+
+    def test_empty_array(self):
+        self.assertEqual(self.read(b" [ ] "), [])
+
+    def test_truncated_file(self):
+        content = b'[{"name": "first"}, {"name": "sec'
+
+        with self.assertRaisesRegex(ValueError, "смещение 20 байт"):
+            self.read(content)
+
+    def test_not_array(self):
+        with self.assertRaises(ValueError):
+            self.read(b'{"name": "product"}')
+
+    def test_malformed_record_does_not_read_rest_of_file(self):
+        records = ",".join('{"name": "product %d"}' % number for number in range(10000))
+        file = io.BytesIO(('[{"name": "first"}, {"name": "bad",, "x": 1}, %s]' % records).encode("utf-8"))
+        reader = JsonArrayReader(file, buffer_size=64)
+
+        with self.assertRaisesRegex(ValueError, "смещение 20 байт"):
+            list(reader)
+
+        self.assertLessEqual(file.tell(), 64 * 2)
+
+    def test_record_error_message(self):
+        error = RecordError(ValueError("ошибка"), 42)
+
+        self.assertEqual(str(error), "Запись со смещением 42 байт: ошибка")
+
+
+class ReaderRegistryTest(TestCase):
+    """Тесты чтения файлов импорта разных форматов"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username="test_import_user", password="QWerty1234", email="import@mail.com")
+        cls.shop = Shop.objects.create(user=cls.user, name="тестовый магазин")
+
+    def get_csv(self):
+        header = (
+            "shop,name,about,description,preview,tags,offer.price,offer.quantity,"
+            "manufacturer.name,manufacturer.slug,category.category,category.cat_slug,"
+            "category.subcategory,category.sub_slug,details.свойство 1,details.свойство 2\n"
         )
+        row = (
+            '{shop},"{name}",{about},{description},{preview},тег 1|тег 2,100.00,10,'
+            "тестовый производитель,test-manufacturer,подкатегория,sub-test,категория,test,значение 1,\n"
+        )
+        return (header + row.format(**PRODUCT_DATA) + "\n" + "несколько,колонок\n").encode("utf-8")
+
+    def test_csv_records(self):
+        content = self.get_csv()
+
+        records = list(open_reader(io.BytesIO(content), "products.csv"))
+
+        self.assertEqual(len(records), 2)
+        obj = ProductBaseModel(**records[0])
+        self.assertEqual(obj.tags, PRODUCT_DATA["tags"])
+        self.assertEqual([(d.name, d.value) for d in obj.details], [("свойство 1", "значение 1")])
+        self.assertEqual(obj.category.subcategory, "категория")
+        self.assertEqual(records[0].offset, content.index(b"\n") + 1)
+        with self.assertRaisesRegex(ValueError, "Количество колонок"):
+            record_validator(records[1])
+
+    def test_ndjson_bad_line_is_record_error(self):
+        content = b'{"name": "1"}\n\n{"name": \n[1]\n'
+
+        records = list(open_reader(io.BytesIO(content), "products.ndjson"))
+
+        self.assertEqual([r.offset for r in records], [0, 15, 25])
+        self.assertEqual(dict(records[0]), {"name": "1"})
+        with self.assertRaisesRegex(ValueError, "Некорректный json"):
+            record_validator(records[1])
+        with self.assertRaisesRegex(ValueError, "не является json объектом"):
+            record_validator(records[2])
+
+    def test_gzip_is_decoded_on_the_fly(self):
+        content = gzip.compress((json.dumps(PRODUCT_DATA) + "\n").encode("utf-8") * 2)
+        file = io.BytesIO(content)
+
+        reader = open_reader(file, "products.ndjson.gz")
+        loaded, failed, total, excp = load_bulk(reader)
 
-        result = load_files(files, email)
+        self.assertEqual((loaded, failed, total), (2, 0, 2))
+        self.assertEqual(reader.position, len(content))
 
-        self.assertIsNone(result)
+    def test_formats(self):
+        self.assertIn("csv.gz", supported_formats())
+        file_format_validator("products.ndjson.gz", supported_formats())
+        file_format_validator("products.v2.csv", supported_formats())
+        for file in ("products.gz", "products.xml", "products.xml.gz"):
+            with self.assertRaises(OSError):
+                file_format_validator(file, supported_formats())
+            with self.assertRaises(OSError):
+                open_reader(io.BytesIO(b""), file)
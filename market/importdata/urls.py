@@ -1,10 +1,11 @@
 from django.urls import path
 
-from .views import ImportView
+from .views import ImportProgressView, ImportView
 
 
 app_name = "importdata"
 
 urlpatterns = [
     path("", ImportView.as_view(), name="importdata"),
+    path("progress/", ImportProgressView.as_view(), name="progress"),
 ]
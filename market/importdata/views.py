@@ -1,16 +1,31 @@
 import os
 
 from django.contrib.auth.mixins import UserPassesTestMixin
+from django.http import HttpRequest, JsonResponse
 from django.urls import reverse_lazy
 from django.core import management
-from django.core.cache import cache
 from django.conf import settings
+from django.views import View
 from django.views.generic.edit import FormView
 
 from .forms import ImportForm
+from .lease import ImportLease
 
 
-class ImportView(UserPassesTestMixin, FormView):
+class ImportAccessMixin(UserPassesTestMixin):
+    def test_func(self):
+        """
+        Проверка доступа к странице импорта товаров.
+        Если пользователь авторизирован и у него есть магазин
+        или пользователь является суперюзером - доступ открыт,
+        иначе -  403 Forbidden.
+        """
+        return (
+            self.request.user.is_authenticated and self.request.user.shops.exists() or self.request.user.is_superuser
+        )
+
+
+class ImportView(ImportAccessMixin, FormView):
     """
     View class для отображения страницы с формой для импорта товаров.
     Если форма валидна - запускается команда импорта товаров.
@@ -30,7 +45,7 @@ class ImportView(UserPassesTestMixin, FormView):
         context = super().get_context_data(**kwargs)
         context.update(
             {
-                "import_is_running": cache.get("import_is_running"),
+                "import_is_running": ImportLease.current() is not None,
                 "import_files": [
                     file
                     for file in os.listdir(os.path.abspath(settings.IMPORT_FOLDER))
@@ -40,13 +55,13 @@ class ImportView(UserPassesTestMixin, FormView):
         )
         return context
 
-    def test_func(self):
-        """
-        Проверка доступа к странице импорта товаров.
-        Если пользователь авторизирован и у него есть магазин
-        или пользователь является суперюзером - доступ открыт,
-        иначе -  403 Forbidden.
-        """
-        return (
-            self.request.user.is_authenticated and self.request.user.shops.exists() or self.request.user.is_superuser
-        )
+
+class ImportProgressView(ImportAccessMixin, View):
+    """
+    View class для получения прогресса текущего импорта в формате json.
+    Опрашивается страницей импорта, пока импорт выполняется.
+    """
+
+    def get(self, request: HttpRequest) -> JsonResponse:
+        lease = ImportLease.current()
+        return JsonResponse(lease.status() if lease else {"running": False})
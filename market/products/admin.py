@@ -17,6 +17,7 @@ from .models import (
     Manufacturer,
     LimitedOffer,
 )
+from .services.review_services import update_review_count
 
 
 class DetailInline(admin.StackedInline):
@@ -163,11 +164,13 @@ admin.site.register(Tag)
 @admin.action(description=_("Архивировать отзыв"))
 def mark_archived_review(modeladmin: admin.ModelAdmin, request: HttpRequest, queryset: QuerySet):
     queryset.update(archived=True, modified_at=timezone.now())
+    update_review_count(queryset.values_list("product_id", flat=True).distinct())
 
 
 @admin.action(description=_("Разархивировать отзыв"))
 def mark_unarchived_review(modeladmin: admin.ModelAdmin, request: HttpRequest, queryset: QuerySet):
     queryset.update(archived=False, modified_at=timezone.now())
+    update_review_count(queryset.values_list("product_id", flat=True).distinct())
 
 
 @admin.register(Review)
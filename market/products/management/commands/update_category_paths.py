@@ -0,0 +1,15 @@
+from django.core.management import BaseCommand
+
+from products.services.category_services import update_category_paths
+
+
+class Command(BaseCommand):
+    """
+    Команда пересчета материализованных путей категорий.
+    """
+
+    help = "Rebuilds Category.path used by the catalog category subtree filter."
+
+    def handle(self, *args, **options):
+        updated = update_category_paths()
+        self.stdout.write("Путь обновлен для %d категорий" % updated)
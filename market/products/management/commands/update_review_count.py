@@ -0,0 +1,15 @@
+from django.core.management import BaseCommand
+
+from products.services.review_services import update_review_count
+
+
+class Command(BaseCommand):
+    """
+    Команда пересчета количества опубликованных отзывов всех товаров.
+    """
+
+    help = "Recalculates Product.review_count from published non-archived reviews."
+
+    def handle(self, *args, **options):
+        updated = update_review_count()
+        self.stdout.write("Количество отзывов пересчитано для %d товаров" % updated)
@@ -0,0 +1,19 @@
+from django.core.management import BaseCommand
+
+from catalog.summary import refresh_offer_summary
+from products.services.search_services import update_search_vector
+
+
+class Command(BaseCommand):
+    """
+    Команда пересчета поискового вектора всех товаров.
+    """
+
+    help = "Rebuilds Product.search_vector used by the catalog full-text search."
+
+    def handle(self, *args, **options):
+        updated = update_search_vector()
+        self.stdout.write("Поисковый вектор обновлен для %d товаров" % updated)
+
+        refreshed = refresh_offer_summary()
+        self.stdout.write("Сводки каталога обновлены для %d предложений" % refreshed)
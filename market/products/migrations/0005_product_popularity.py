@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("products", "0004_limitedoffer"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="popularity",
+            field=models.PositiveIntegerField(db_index=True, default=0, verbose_name="популярность"),
+        ),
+    ]
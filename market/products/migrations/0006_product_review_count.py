@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:20
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_review_count(apps, schema_editor):
+    Product = apps.get_model("products", "Product")
+    Review = apps.get_model("products", "Review")
+
+    reviews = (
+        Review.objects.filter(product=OuterRef("pk"), is_published=True, archived=False)
+        .order_by()
+        .values("product")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    Product.objects.update(review_count=Coalesce(Subquery(reviews, output_field=IntegerField()), Value(0)))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("products", "0005_product_popularity"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="review_count",
+            field=models.PositiveIntegerField(db_index=True, default=0, verbose_name="количество отзывов"),
+        ),
+        migrations.RunPython(backfill_review_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:22
+
+from functools import reduce
+
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+INDEX_NAME = "products_product_search_gin"
+
+
+def create_search_index(apps, schema_editor):
+    """GIN индекс и заполнение поискового вектора (только PostgreSQL)"""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    Product = apps.get_model("products", "Product")
+    table = schema_editor.quote_name(Product._meta.db_table)
+    schema_editor.execute(f"CREATE INDEX {INDEX_NAME} ON {table} USING gin (search_vector)")
+
+    vectors = [
+        SearchVector(field, config=config, weight=weight)
+        for field, weight in (("name", "A"), ("about", "B"), ("description", "C"))
+        for config in ("russian", "english")
+    ]
+    Product.objects.update(search_vector=reduce(lambda left, right: left + right, vectors))
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute(f"DROP INDEX IF EXISTS {INDEX_NAME}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("products", "0006_product_review_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True, verbose_name="поисковый вектор"
+            ),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
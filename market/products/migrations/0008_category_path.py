@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:34
+
+from django.db import migrations, models
+
+
+def fill_category_path(apps, schema_editor):
+    """Заполнение материализованных путей существующих категорий"""
+    Category = apps.get_model("products", "Category")
+    parents = dict(Category.objects.values_list("pk", "parent_id"))
+    paths = {}
+
+    def get_path(pk):
+        if pk not in paths:
+            parent = parents[pk]
+            paths[pk] = f"{get_path(parent) if parent else '/'}{pk}/"
+        return paths[pk]
+
+    categories = list(Category.objects.only("pk", "parent_id"))
+    for category in categories:
+        category.path = get_path(category.pk)
+
+    Category.objects.bulk_update(categories, ["path"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("products", "0007_product_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="path",
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=255, verbose_name="путь"),
+        ),
+        migrations.RunPython(fill_category_path, migrations.RunPython.noop),
+    ]
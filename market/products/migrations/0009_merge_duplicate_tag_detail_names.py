@@ -0,0 +1,57 @@
+# Generated by Django 4.2.30 on 2026-10-17 12:10
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def merge_duplicates(model, relation, field):
+    """
+    Объединение записей model с одинаковым названием: связи relation переносятся на запись с наименьшим pk,
+    связи, которые после переноса повторились бы, удаляются.
+    Возвращает соответствие pk удаленных записей pk оставленных.
+    """
+    merged = {}
+    duplicates = model.objects.values("name").annotate(keep=Min("pk"), count=Count("pk")).filter(count__gt=1)
+
+    for row in duplicates:
+        pks = list(model.objects.filter(name=row["name"]).exclude(pk=row["keep"]).values_list("pk", flat=True))
+        linked = relation.objects.filter(**{field: row["keep"]}).values("product_id")
+
+        # по одной записи, чтобы связи одного товара с несколькими дубликатами не повторились
+        for pk in pks:
+            relation.objects.filter(**{field: pk}).exclude(product_id__in=linked).update(**{field: row["keep"]})
+
+        relation.objects.filter(**{f"{field}__in": pks}).delete()
+        model.objects.filter(pk__in=pks).delete()
+        merged.update(dict.fromkeys(pks, row["keep"]))
+
+    return merged
+
+
+def merge_duplicate_names(apps, schema_editor):
+    """Объединение тегов и свойств с одинаковыми названиями перед добавлением уникальности названий"""
+    Product = apps.get_model("products", "Product")
+    Tag = apps.get_model("products", "Tag")
+    Detail = apps.get_model("products", "Detail")
+    ProductDetail = apps.get_model("products", "ProductDetail")
+    OfferSummary = apps.get_model("catalog", "OfferSummary")
+
+    merge_duplicates(Detail, ProductDetail, "detail_id")
+    tags = merge_duplicates(Tag, Product.tags.through, "tag_id")
+
+    if tags:
+        summaries = list(OfferSummary.objects.filter(tag_ids__overlap=list(tags)))
+        for summary in summaries:
+            summary.tag_ids = sorted({tags.get(tag_id, tag_id) for tag_id in summary.tag_ids})
+        OfferSummary.objects.bulk_update(summaries, ["tag_ids"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("products", "0008_category_path"),
+        ("catalog", "0001_offer_summary"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_names, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-17 12:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("products", "0009_merge_duplicate_tag_detail_names"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="tag",
+            name="name",
+            field=models.CharField(max_length=64, unique=True, verbose_name="название тега"),
+        ),
+        migrations.AlterField(
+            model_name="detail",
+            name="name",
+            field=models.CharField(max_length=512, unique=True, verbose_name="наименование"),
+        ),
+    ]
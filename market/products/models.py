@@ -2,9 +2,12 @@ import os
 from typing import Union
 
 from django.db import models
+from django.db.models import Value
 from django.db.models.constraints import UniqueConstraint
+from django.db.models.functions import Concat, Substr
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import FileExtensionValidator
 from django.urls import reverse
 
@@ -33,9 +36,13 @@ class ProductImage(models.Model):
         verbose_name_plural = _("изображения")
 
     def delete(self, using=None, keep_parents=False):
-        """Удаление файла изображения при удалении экземпляра модели"""
+        """
+        Удаление файла изображения при удалении экземпляра модели.
+        Файл, который используется другими изображениями (импорт хранит превью по хэшу содержимого), не удаляется.
+        """
         try:
-            os.remove(f"{settings.MEDIA_ROOT}/{self.image}")
+            if not ProductImage.objects.filter(image=self.image.name).exclude(pk=self.pk).exists():
+                os.remove(f"{settings.MEDIA_ROOT}/{self.image}")
         except FileNotFoundError:
             pass
         finally:
@@ -57,6 +64,10 @@ class Product(models.Model):
     category = models.ForeignKey(on_delete=models.PROTECT, to="products.category", verbose_name="категория товаров")
     preview = models.ImageField(null=True, blank=True, upload_to=product_images_directory_path)
     tags = models.ManyToManyField(to="Tag", verbose_name=_("теги"), related_name="products", blank=True)
+    popularity = models.PositiveIntegerField(default=0, db_index=True, verbose_name=_("популярность"))
+    review_count = models.PositiveIntegerField(default=0, db_index=True, verbose_name=_("количество отзывов"))
+    # GIN индекс создается миграцией только в PostgreSQL, вектор обновляет update_search_vector
+    search_vector = SearchVectorField(null=True, editable=False, verbose_name=_("поисковый вектор"))
 
     def save(self, force_insert=False, force_update=False, using=None, update_fields=None):
         """Попутное создание экземпляра ProductImage от preview"""
@@ -75,7 +86,7 @@ class Product(models.Model):
 class Tag(models.Model):
     """Модель Тег"""
 
-    name = models.CharField(max_length=64, verbose_name=_("название тега"))
+    name = models.CharField(max_length=64, unique=True, verbose_name=_("название тега"))
 
     def __str__(self) -> str:
         return f"Тег (pk={self.pk}, name={self.name!r})"
@@ -84,7 +95,7 @@ class Tag(models.Model):
 class Detail(models.Model):
     """Свойство продукта"""
 
-    name = models.CharField(max_length=512, verbose_name=_("наименование"))
+    name = models.CharField(max_length=512, unique=True, verbose_name=_("наименование"))
 
     class Meta:
         verbose_name = _("свойство продуктов")
@@ -115,6 +126,9 @@ def category_icon_directory_path(instance: "Category", filename: str) -> str:
     )
 
 
+CATEGORY_PATH_SEPARATOR = "/"
+
+
 class Category(models.Model):
     """Категория продукта"""
 
@@ -125,6 +139,8 @@ class Category(models.Model):
     archived = models.BooleanField(default=False, verbose_name=_("архивировано"))
     is_active = models.BooleanField(default=True, verbose_name=_("активно"))
     parent = models.ForeignKey("self", blank=True, null=True, verbose_name=_("родитель"), on_delete=models.CASCADE)
+    # Материализованный путь "/pk_корня/.../pk/", поддерева выбираются по префиксу пути
+    path = models.CharField(max_length=255, blank=True, db_index=True, editable=False, verbose_name=_("путь"))
     foreground = models.BooleanField(default=False, verbose_name=_("приоритетный"))
     icon = models.FileField(
         null=True,
@@ -140,6 +156,35 @@ class Category(models.Model):
         app_label = "products"
         constraints = [UniqueConstraint(fields=["name", "parent"], name="unique_parent_name")]
 
+    def save(self, force_insert=False, force_update=False, using=None, update_fields=None):
+        """
+        Попутное обновление материализованного пути категории и путей её потомков.
+        Пути сохраненной категории обновляются до записи, чтобы обработчики post_save видели актуальные пути,
+        новая категория получает путь после получения pk.
+        """
+        if self.pk is None:
+            super().save(force_insert, force_update, using, update_fields)
+            self.path = self.get_path()
+            Category.objects.filter(pk=self.pk).update(path=self.path)
+            return
+
+        old_path, self.path = self.path, self.get_path()
+
+        if old_path and old_path != self.path:
+            Category.objects.filter(path__startswith=old_path).exclude(pk=self.pk).update(
+                path=Concat(Value(self.path), Substr("path", len(old_path) + 1))
+            )
+
+        if update_fields is not None:
+            update_fields = {*update_fields, "path"}
+
+        super().save(force_insert, force_update, using, update_fields)
+
+    def get_path(self) -> str:
+        """Материализованный путь категории по пути родителя"""
+        parent_path = self.parent.path if self.parent_id else CATEGORY_PATH_SEPARATOR
+        return f"{parent_path}{self.pk}{CATEGORY_PATH_SEPARATOR}"
+
     def get_absolute_url(self):
         """Method returns a string that can be used to refer to the object over HTTP"""
         return reverse("catalog:index") + f"?category_id={self.pk}"
@@ -0,0 +1,198 @@
+import heapq
+import re
+import time
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.db.models import Max
+from django.urls import reverse
+
+from products.models import Category, Manufacturer, Product
+
+
+INDEX_CACHE_KEY: str = "autocomplete_index"
+VERSION_CACHE_KEY: str = "autocomplete_index_version"
+
+# Порядок типов подсказок в выдаче и модели, из которых они строятся
+KINDS: Tuple[str, ...] = ("category", "manufacturer", "product")
+KIND_MODELS: Dict[str, Any] = {"category": Category, "manufacturer": Manufacturer, "product": Product}
+
+# Подсказка ищется по началу названия и по началу первых MAX_WORDS слов названия
+MAX_WORDS: int = 4
+MIN_QUERY_LENGTH: int = 2
+MAX_LIMIT: int = 20
+# Сколько совпадений просматривается для ранжирования, остальные отбрасываются
+MAX_SCAN: int = 200
+
+BATCH_SIZE: int = 2000
+
+# Копия индекса в памяти процесса, обновляется при изменении версии индекса в кэше
+_local: Dict[str, Any] = {"version": None, "index": None}
+
+
+def normalize(value: str) -> str:
+    """
+    Приведение строки к виду ключей индекса: без учета регистра, ё = е, одиночные пробелы.
+    """
+    return " ".join(value.casefold().replace("ё", "е").split())
+
+
+def get_keys(label: str) -> Iterable[Tuple[str, int]]:
+    """
+    Ключи индекса названия: название целиком и названия, начиная с каждого следующего слова.
+    :return: ключ и номер слова, с которого он начинается
+    """
+    words = re.split(r"[\s\-/,()]+", normalize(label))
+    words = [word for word in words if word]
+    for position in range(min(len(words), MAX_WORDS)):
+        yield " ".join(words[position:]), position
+
+
+def get_items(until: Dict[str, int], since: Optional[Dict[str, int]] = None) -> Iterable[Tuple[str, int, str]]:
+    """
+    Названия активных категорий, производителей и товаров с pk в диапазоне (since, until].
+    """
+    for kind in KINDS:
+        queryset = KIND_MODELS[kind].objects.filter(pk__lte=until[kind]).order_by("pk")
+        if kind == "category":
+            queryset = queryset.filter(archived=False, is_active=True)
+        elif kind == "manufacturer":
+            queryset = queryset.filter(archived=False)
+        if since:
+            queryset = queryset.filter(pk__gt=since[kind])
+
+        for pk, name in queryset.values_list("pk", "name").iterator(chunk_size=BATCH_SIZE):
+            yield kind, pk, name
+
+
+def get_watermarks() -> Dict[str, int]:
+    return {kind: model.objects.aggregate(value=Max("pk"))["value"] or 0 for kind, model in KIND_MODELS.items()}
+
+
+def make_index(items: List[Tuple[str, int, str]], pairs: Iterable[Tuple[str, int, int]], **extra) -> Dict[str, Any]:
+    """
+    Индекс подсказок: отсортированный массив ключей и параллельный ему массив ссылок на items.
+    Ссылка хранит номер названия и номер слова одним числом, поэтому индекс компактен в кэше.
+    """
+    keys, refs = [], []
+    for key, ref, position in pairs:
+        keys.append(key)
+        refs.append(ref * MAX_WORDS + position)
+    return {"keys": keys, "refs": refs, "items": items, **extra}
+
+
+def index_pairs(items: List[Tuple[str, int, str]], start: int = 0) -> List[Tuple[str, int, int]]:
+    return sorted(
+        (key, ref, position)
+        for ref, (_, _, label) in enumerate(items[start:], start)
+        for key, position in get_keys(label)
+    )
+
+
+def next_version() -> int:
+    """
+    Новая версия индекса. Версия увеличивается атомарно (cache.incr), поэтому параллельные построения
+    получают разные версии. Начальная версия берется от времени, как в catalog.caching.get_catalog_version.
+    """
+    try:
+        return cache.incr(VERSION_CACHE_KEY)
+    except ValueError:
+        cache.add(VERSION_CACHE_KEY, int(time.time() * 1000), timeout=None)
+        return cache.incr(VERSION_CACHE_KEY)
+
+
+def store_index(index: Dict[str, Any]) -> None:
+    index["version"] = next_version()
+    cache.set(INDEX_CACHE_KEY, index, timeout=None)
+
+
+def rebuild_index() -> int:
+    """
+    Полное построение индекса подсказок.
+    :return: количество названий в индексе
+    """
+    watermarks = get_watermarks()
+    items = list(get_items(watermarks))
+    store_index(make_index(items, index_pairs(items), watermarks=watermarks))
+    return len(items)
+
+
+def update_index() -> int:
+    """
+    Добавление в индекс категорий, производителей и товаров, созданных после прошлого обновления.
+    Переименованные и удаленные объекты учитываются только при полном построении индекса.
+    Если индекса нет, то он строится полностью.
+    :return: количество добавленных названий
+    """
+    index = cache.get(INDEX_CACHE_KEY)
+    if index is None:
+        return rebuild_index()
+
+    watermarks = get_watermarks()
+    start = len(index["items"])
+    items = index["items"] + list(get_items(watermarks, index["watermarks"]))
+    if len(items) == start:
+        return 0
+
+    current = ((key, *divmod(ref, MAX_WORDS)) for key, ref in zip(index["keys"], index["refs"]))
+    pairs = heapq.merge(current, index_pairs(items, start))
+    store_index(make_index(items, pairs, watermarks=watermarks))
+    return len(items) - start
+
+
+def get_index() -> Dict[str, Any]:
+    """
+    Индекс подсказок из памяти процесса. Из кэша индекс загружается только при изменении версии,
+    при отсутствии индекса он строится.
+    """
+    version = cache.get(VERSION_CACHE_KEY)
+    if version is None or version != _local["version"]:
+        index = cache.get(INDEX_CACHE_KEY)
+        if index is None:
+            rebuild_index()
+            index = cache.get(INDEX_CACHE_KEY)
+        _local.update(version=index["version"], index=index)
+
+    return _local["index"]
+
+
+def get_url(kind: str, pk: int, label: str) -> str:
+    if kind == "product":
+        return reverse("products:product-detail", kwargs={"pk": pk})
+    if kind == "category":
+        return reverse("catalog:index") + "?" + urlencode({"category_id": pk})
+    return reverse("catalog:index") + "?" + urlencode({"search": label})
+
+
+def autocomplete(query: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    Подсказки строки поиска по началу названий категорий, производителей и товаров.
+    Совпадения с началом названия выводятся раньше совпадений с началом слова,
+    категории и производители раньше товаров, короткие названия раньше длинных.
+    :param query: строка поиска
+    :param limit: количество подсказок
+    :return: список подсказок с типом, названием и ссылкой
+    """
+    query = normalize(query)
+    if len(query) < MIN_QUERY_LENGTH:
+        return []
+    limit = min(limit, MAX_LIMIT)
+
+    index = get_index()
+    keys, refs, items = index["keys"], index["refs"], index["items"]
+
+    found: Dict[int, int] = {}
+    position = bisect_left(keys, query)
+    stop = min(position + MAX_SCAN, len(keys))
+    while position < stop and keys[position].startswith(query):
+        ref, word = divmod(refs[position], MAX_WORDS)
+        found[ref] = min(word, found.get(ref, word))
+        position += 1
+
+    ranked = sorted(found, key=lambda ref: (found[ref] > 0, KINDS.index(items[ref][0]), len(items[ref][2]), ref))
+    return [
+        {"type": kind, "label": label, "url": get_url(kind, pk, label)}
+        for kind, pk, label in (items[ref] for ref in ranked[:limit])
+    ]
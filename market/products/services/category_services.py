@@ -0,0 +1,31 @@
+from typing import Dict, Optional
+
+from products.models import CATEGORY_PATH_SEPARATOR, Category
+
+
+def update_category_paths() -> int:
+    """
+    Пересчет материализованных путей всех категорий по родителям.
+    Нужен для категорий, сохраненных без Category.save (фикстуры, массовые обновления).
+    :return: количество обновленных категорий
+    """
+    categories = {category.pk: category for category in Category.objects.only("pk", "parent_id", "path")}
+    paths: Dict[int, str] = {}
+
+    def get_path(pk: Optional[int]) -> str:
+        if pk is None or pk not in categories:
+            return CATEGORY_PATH_SEPARATOR
+        if pk not in paths:
+            paths[pk] = f"{get_path(categories[pk].parent_id)}{pk}{CATEGORY_PATH_SEPARATOR}"
+        return paths[pk]
+
+    changed = []
+
+    for category in categories.values():
+        path = get_path(category.pk)
+        if category.path != path:
+            category.path = path
+            changed.append(category)
+
+    Category.objects.bulk_update(changed, ["path"], batch_size=1000)
+    return len(changed)
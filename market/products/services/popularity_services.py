@@ -0,0 +1,99 @@
+from typing import Dict, Iterable, Optional
+
+from django.core.cache import cache
+from django.db.models import Count, Max, Q, Sum
+from django.utils import timezone
+
+from catalog.summary import refresh_offer_summary
+from orders.models import OrderDetail
+from products.models import Product, Review
+from profiles.models import UserProductHistory
+
+
+# Вес заказанной единицы товара, опубликованного отзыва и просмотра страницы товара
+ORDER_WEIGHT: int = 5
+REVIEW_WEIGHT: int = 3
+VIEW_WEIGHT: int = 1
+
+WATERMARKS_CACHE_KEY: str = "products_popularity_watermarks"
+
+BATCH_SIZE: int = 1000
+
+
+def get_popularity_scores(product_ids: Optional[Iterable[int]] = None) -> Dict[int, int]:
+    """
+    Расчет популярности товаров по количеству заказанных единиц, просмотров и отзывов.
+    Если product_ids не задан, то популярность считается для всех товаров.
+    :param product_ids: идентификаторы товаров
+    :return: словарь идентификатор товара - популярность
+    """
+    orders = OrderDetail.objects.values_list("offer__product_id").annotate(value=Sum("quantity"))
+    views = UserProductHistory.objects.values_list("product_id").annotate(value=Count("pk"))
+    reviews = (
+        Review.objects.filter(is_published=True, archived=False).values_list("product_id").annotate(value=Count("pk"))
+    )
+
+    if product_ids is not None:
+        product_ids = list(product_ids)
+        orders = orders.filter(offer__product_id__in=product_ids)
+        views = views.filter(product_id__in=product_ids)
+        reviews = reviews.filter(product_id__in=product_ids)
+
+    scores: Dict[int, int] = {}
+    for queryset, weight in ((orders, ORDER_WEIGHT), (views, VIEW_WEIGHT), (reviews, REVIEW_WEIGHT)):
+        for product_id, value in queryset.order_by():
+            scores[product_id] = scores.get(product_id, 0) + value * weight
+
+    return scores
+
+
+def get_changed_product_ids(watermarks: Dict) -> set:
+    """
+    Получение товаров, у которых появились заказы, просмотры или изменились отзывы после прошлого расчета.
+    """
+    product_ids = set(
+        OrderDetail.objects.filter(pk__gt=watermarks["order_detail"]).values_list("offer__product_id", flat=True)
+    )
+    product_ids.update(
+        UserProductHistory.objects.filter(pk__gt=watermarks["history"]).values_list("product_id", flat=True)
+    )
+    product_ids.update(Review.objects.filter(modified_at__gte=watermarks["time"]).values_list("product_id", flat=True))
+    return product_ids
+
+
+def update_popularity(full: bool = False) -> int:
+    """
+    Обновление популярности товаров.
+    Популярность пересчитывается только для товаров, у которых появились заказы, просмотры
+    или изменились отзывы после прошлого обновления. Границы прошлого обновления хранятся в кэше,
+    если их нет или full=True, то популярность пересчитывается для всех товаров.
+    :param full: пересчитать популярность всех товаров
+    :return: количество товаров с измененной популярностью
+    """
+    watermarks = None if full else cache.get(WATERMARKS_CACHE_KEY)
+    current = {
+        "order_detail": OrderDetail.objects.aggregate(value=Max("pk"))["value"] or 0,
+        "history": UserProductHistory.objects.aggregate(value=Max("pk"))["value"] or 0,
+        "time": timezone.now(),
+    }
+
+    if watermarks is None:
+        scores = get_popularity_scores()
+        products = Product.objects.all()
+    else:
+        product_ids = get_changed_product_ids(watermarks)
+        scores = get_popularity_scores(product_ids)
+        products = Product.objects.filter(pk__in=product_ids)
+
+    updated = []
+    for product in products.only("pk", "popularity").iterator(chunk_size=BATCH_SIZE):
+        popularity = scores.get(product.pk, 0)
+        if product.popularity != popularity:
+            product.popularity = popularity
+            updated.append(product)
+
+    Product.objects.bulk_update(updated, ["popularity"], batch_size=BATCH_SIZE)
+    refresh_offer_summary(Q(product_id__in=[product.pk for product in updated]))
+    cache.set(WATERMARKS_CACHE_KEY, current, timeout=None)
+
+    return len(updated)
@@ -1,10 +1,39 @@
+from typing import Iterable, Optional
+
 from django.core.paginator import Paginator, Page
 from django.http import HttpRequest
-from django.db.models import QuerySet
+from django.db.models import Count, IntegerField, OuterRef, Q, QuerySet, Subquery, Value
+from django.db.models.functions import Coalesce
 
+from catalog.summary import refresh_offer_summary
 from products.models import Review, Product
 
 
+def update_review_count(product_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Пересчет количества опубликованных неархивированных отзывов товаров одним запросом.
+    :param product_ids: идентификаторы товаров, если не заданы - пересчитываются все товары
+    :return: количество обновленных товаров
+    """
+    reviews = (
+        Review.objects.filter(product=OuterRef("pk"), is_published=True, archived=False)
+        .order_by()
+        .values("product")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    products = Product.objects.all()
+
+    if product_ids is not None:
+        product_ids = list(product_ids)
+        products = products.filter(pk__in=product_ids)
+
+    updated = products.update(review_count=Coalesce(Subquery(reviews, output_field=IntegerField()), Value(0)))
+    refresh_offer_summary(None if product_ids is None else Q(product_id__in=product_ids))
+
+    return updated
+
+
 class ReviewServices:
     """Сервис для работы с отзывами"""
 
@@ -0,0 +1,66 @@
+from functools import reduce
+from operator import or_
+from typing import Iterable, Optional
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import F, QuerySet
+
+from products.models import Product
+
+
+# Конфигурации полнотекстового поиска PostgreSQL: стемминг русских и английских слов
+SEARCH_CONFIGS: tuple = ("russian", "english")
+
+# Поля товара, попадающие в поисковый вектор, и их веса для ранжирования
+SEARCH_FIELDS: tuple = (("name", "A"), ("about", "B"), ("description", "C"))
+
+
+def get_search_vector() -> SearchVector:
+    """
+    Выражение поискового вектора товара: поля товара во всех конфигурациях поиска с весами полей.
+    """
+    vectors = [
+        SearchVector(field, config=config, weight=weight)
+        for field, weight in SEARCH_FIELDS
+        for config in SEARCH_CONFIGS
+    ]
+    return reduce(lambda left, right: left + right, vectors)
+
+
+def get_search_query(value: str) -> SearchQuery:
+    """
+    Поисковый запрос во всех конфигурациях поиска.
+    Запрос в формате websearch, поэтому кавычки, OR и минус в строке поиска не вызывают ошибок.
+    """
+    queries = [SearchQuery(value, config=config, search_type="websearch") for config in SEARCH_CONFIGS]
+    return reduce(or_, queries)
+
+
+def update_search_vector(product_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Обновление поискового вектора товаров одним запросом.
+    :param product_ids: идентификаторы товаров, если не заданы - обновляются все товары
+    :return: количество обновленных товаров
+    """
+    products = Product.objects.all()
+
+    if product_ids is not None:
+        products = products.filter(pk__in=list(product_ids))
+
+    return products.update(search_vector=get_search_vector())
+
+
+def search_products(queryset: QuerySet, value: str, prefix: str = "") -> QuerySet:
+    """
+    Поиск товаров по названию, краткому описанию и описанию
+    по поисковому вектору товара (GIN индекс) с ранжированием SearchRank.
+    Результат аннотируется рангом search_rank.
+    :param queryset: запрос товаров или связанных с ними моделей
+    :param value: строка поиска
+    :param prefix: путь к товару в запросе, например "product__"
+    :return: отфильтрованный запрос
+    """
+    query = get_search_query(value)
+    return queryset.filter(**{f"{prefix}search_vector": query}).annotate(
+        search_rank=SearchRank(F(f"{prefix}search_vector"), query)
+    )
@@ -0,0 +1,130 @@
+from typing import Dict, List, Tuple
+
+from django.core.cache import cache
+from django.db.models import Count, Sum
+from django_redis import get_redis_connection
+
+from orders.models import OrderDetail
+from products.models import Product, Tag
+from products.services.popularity_services import ORDER_WEIGHT, VIEW_WEIGHT
+from profiles.models import UserProductHistory
+
+
+LEADERBOARD_CACHE_KEY: str = "tags_leaderboard"
+BUILT_CACHE_KEY: str = "tags_leaderboard_built"
+
+# Вес товара с тегом (заказанной единицы и просмотра - как в популярности товаров)
+PRODUCT_WEIGHT: int = 1
+
+# В рейтинге хранятся только первые LEADERBOARD_SIZE тегов
+LEADERBOARD_SIZE: int = 100
+
+
+def get_redis():
+    """Клиент Redis кэша по умолчанию, None - если кэш не Redis"""
+    try:
+        return get_redis_connection("default")
+    except NotImplementedError:
+        return None
+
+
+def get_tag_scores() -> Dict[int, int]:
+    """
+    Расчет популярности тегов по количеству товаров с тегом, заказанных единиц и просмотров этих товаров.
+    :return: словарь идентификатор тега - популярность
+    """
+    products = Product.tags.through.objects.values_list("tag_id").annotate(value=Count("product_id"))
+    orders = (
+        OrderDetail.objects.filter(offer__product__tags__isnull=False)
+        .values_list("offer__product__tags")
+        .annotate(value=Sum("quantity"))
+    )
+    views = (
+        UserProductHistory.objects.filter(product__tags__isnull=False)
+        .values_list("product__tags")
+        .annotate(value=Count("pk"))
+    )
+
+    scores: Dict[int, int] = dict.fromkeys(Tag.objects.values_list("pk", flat=True), 0)
+    for queryset, weight in ((products, PRODUCT_WEIGHT), (orders, ORDER_WEIGHT), (views, VIEW_WEIGHT)):
+        for tag_id, value in queryset.order_by():
+            if tag_id in scores:
+                scores[tag_id] += value * weight
+
+    return scores
+
+
+def update_tags_leaderboard() -> int:
+    """
+    Пересчет рейтинга популярных тегов.
+    В Redis рейтинг хранится сортированным множеством (элемент - "pk:название", вес - популярность),
+    множество заменяется целиком одной транзакцией. Для других кэшей хранится список первых тегов.
+    :return: количество тегов в рейтинге
+    """
+    scores = get_tag_scores()
+    names = dict(Tag.objects.filter(pk__in=list(scores)).values_list("pk", "name"))
+    leaders: List[Tuple[int, str, int]] = sorted(
+        ((pk, names[pk], score) for pk, score in scores.items()), key=lambda item: (-item[2], item[0])
+    )
+    del leaders[LEADERBOARD_SIZE:]
+
+    redis = get_redis()
+
+    if redis is None:
+        cache.set(LEADERBOARD_CACHE_KEY, [(pk, name) for pk, name, _ in leaders], timeout=None)
+        return len(leaders)
+
+    key = cache.make_key(LEADERBOARD_CACHE_KEY)
+    pipeline = redis.pipeline(transaction=True)
+    pipeline.delete(key)
+    if leaders:
+        pipeline.zadd(key, {f"{pk}:{name}": score for pk, name, score in leaders})
+    pipeline.execute()
+    cache.set(BUILT_CACHE_KEY, True, timeout=None)
+
+    return len(leaders)
+
+
+def invalidate_tags_leaderboard() -> None:
+    """Удаление рейтинга тегов, до следующего пересчета теги не выводятся"""
+    redis = get_redis()
+
+    if redis is not None:
+        redis.delete(cache.make_key(LEADERBOARD_CACHE_KEY))
+
+    cache.delete_many([LEADERBOARD_CACHE_KEY, BUILT_CACHE_KEY])
+
+
+def read_leaderboard(count: int) -> List[Tuple[int, str]] | None:
+    """Первые count тегов рейтинга (pk, название), None - если рейтинг не построен"""
+    redis = get_redis()
+
+    if redis is None:
+        leaders = cache.get(LEADERBOARD_CACHE_KEY)
+        return None if leaders is None else leaders[:count]
+
+    members = redis.zrevrange(cache.make_key(LEADERBOARD_CACHE_KEY), 0, count - 1)
+
+    if not members and not cache.get(BUILT_CACHE_KEY):
+        return None
+
+    leaders = []
+    for member in members:
+        pk, name = member.decode().split(":", 1)
+        leaders.append((int(pk), name))
+
+    return leaders
+
+
+def get_top_tags(count: int) -> List[Tag]:
+    """
+    Самые популярные теги из рейтинга без запросов к БД и без загрузки всех тегов.
+    Рейтинг только читается, пересчитывается он задачей products.tasks.update_tags_rating
+    (по расписанию и после изменения тегов), до пересчета выводится последний построенный рейтинг.
+    """
+    if count <= 0:
+        return []
+
+    leaders = read_leaderboard(count) or []
+
+    return [Tag(pk=pk, name=name) for pk, name in leaders]
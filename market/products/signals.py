@@ -1,19 +1,62 @@
-from django.core.cache import cache
+from django.db import transaction
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from .models import Category
+from context_processors.menu_context import invalidate_menu_cache
+from .models import Category, Product, Review, Tag
+from .services.category_services import update_category_paths
+from .services.review_services import update_review_count
+from .services.search_services import SEARCH_FIELDS, update_search_vector
+from .tasks import update_tags_rating
 
 
 @receiver(post_delete, sender=Category, dispatch_uid="category_post_deleted")
 def object_post_delete_handler(sender, **kwargs):
-    """Функция валидации кеша при DELETE запросе модели Категории"""
+    """Функция валидации кеша после фиксации DELETE запроса модели Категории"""
 
-    cache.delete("categories_data_export")
+    transaction.on_commit(invalidate_menu_cache)
 
 
 @receiver(post_save, sender=Category, dispatch_uid="category_posts_updated")
 def object_post_save_handler(sender, **kwargs):
-    """Функция валидации кеша при SAVE, UPDATE запросах модели Категории"""
+    """Функция валидации кеша после фиксации SAVE, UPDATE запросов модели Категории"""
 
-    cache.delete("categories_data_export")
+    transaction.on_commit(invalidate_menu_cache)
+
+
+@receiver(post_save, sender=Category, dispatch_uid="category_path_raw_saved")
+def category_path_handler(sender, raw=False, **kwargs):
+    """Функция заполнения путей категорий, загруженных фикстурами (loaddata не вызывает Category.save)"""
+
+    if raw:
+        update_category_paths()
+
+
+@receiver(post_save, sender=Review, dispatch_uid="review_post_saved")
+@receiver(post_delete, sender=Review, dispatch_uid="review_post_deleted")
+def review_count_handler(sender, instance: Review, **kwargs):
+    """Функция пересчета количества отзывов товара при изменении отзыва"""
+
+    update_review_count([instance.product_id])
+
+
+@receiver(post_save, sender=Product, dispatch_uid="product_search_vector_updated")
+def product_search_vector_handler(sender, instance: Product, update_fields=None, **kwargs):
+    """Функция обновления поискового вектора товара при изменении его текстовых полей"""
+
+    if update_fields is not None and not {field for field, _ in SEARCH_FIELDS}.intersection(update_fields):
+        return
+
+    update_search_vector([instance.pk])
+
+
+@receiver(post_save, sender=Tag, dispatch_uid="tag_post_saved")
+@receiver(post_delete, sender=Tag, dispatch_uid="tag_post_deleted")
+def tags_leaderboard_handler(sender, created: bool = False, **kwargs):
+    """
+    Функция пересчета рейтинга тегов в задаче Celery после переименования и удаления тега
+    (новый тег попадет в рейтинг при пересчете по расписанию). До пересчета выводится прежний рейтинг.
+    """
+
+    if not created:
+        transaction.on_commit(update_tags_rating.delay)
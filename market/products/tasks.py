@@ -0,0 +1,59 @@
+from django.db import DatabaseError
+from config.celery import app
+from celery.utils.log import get_task_logger
+
+from products.services.autocomplete_services import rebuild_index, update_index
+from products.services.popularity_services import update_popularity
+from products.services.tag_services import update_tags_leaderboard
+
+
+logger = get_task_logger(__name__)
+
+
+@app.task(ignore_result=True, name="products.tasks.update_products_popularity")
+def update_products_popularity(full: bool = False):
+    logger.info("Запущено обновление популярности товаров (full=%s)" % full)
+
+    try:
+        updated = update_popularity(full=full)
+
+    except DatabaseError as e:
+        logger.error("Ошибка %s: %s" % (type(e), e))
+
+    else:
+        logger.info("Обновление популярности завершено успешно, изменено товаров: %d" % updated)
+
+
+@app.task(ignore_result=True, name="products.tasks.update_autocomplete_index")
+def update_autocomplete_index(full: bool = False):
+    """
+    Задача Сelery. Обновление индекса подсказок строки поиска.
+    По умолчанию в индекс добавляются только новые товары, категории и производители.
+    """
+    logger.info("Запущено обновление индекса подсказок (full=%s)" % full)
+
+    try:
+        added = rebuild_index() if full else update_index()
+
+    except DatabaseError as e:
+        logger.error("Ошибка %s: %s" % (type(e), e))
+
+    else:
+        logger.info("Обновление индекса подсказок завершено успешно, добавлено названий: %d" % added)
+
+
+@app.task(ignore_result=True, name="products.tasks.update_tags_rating")
+def update_tags_rating():
+    """
+    Задача Сelery. Пересчет рейтинга популярных тегов по количеству товаров, заказов и просмотров.
+    """
+    logger.info("Запущен пересчет рейтинга тегов")
+
+    try:
+        count = update_tags_leaderboard()
+
+    except DatabaseError as e:
+        logger.error("Ошибка %s: %s" % (type(e), e))
+
+    else:
+        logger.info("Пересчет рейтинга тегов завершен успешно, тегов в рейтинге: %d" % count)
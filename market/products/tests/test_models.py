@@ -217,6 +217,22 @@ class CategoryModelTest(TestCase):
         subcategory = CategoryModelTest.subcategory
         self.assertEqual(subcategory.parent.pk, category.pk)
 
+    def test_path(self):
+        category = CategoryModelTest.category
+        subcategory = CategoryModelTest.subcategory
+        self.assertEqual(category.path, f"/{category.pk}/")
+        self.assertEqual(Category.objects.get(pk=subcategory.pk).path, f"/{category.pk}/{subcategory.pk}/")
+
+    def test_path_of_moved_subtree(self):
+        root = Category.objects.create(name="Новый корень")
+        child = Category.objects.create(name="Вложенная категория", parent=self.subcategory)
+
+        self.subcategory.parent = root
+        self.subcategory.save()
+
+        child.refresh_from_db()
+        self.assertEqual(child.path, f"/{root.pk}/{self.subcategory.pk}/{child.pk}/")
+
 
 class ReviewModelTest(TestCase):
     """Класс тестов модели Отзывов"""
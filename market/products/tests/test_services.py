@@ -1,6 +1,306 @@
+import io
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
 
+from config.celery import app
+from orders.models import Order, OrderDetail
+from products.admin import mark_archived_review, mark_unarchived_review
+from products.models import Category, Manufacturer, Product, Review, Tag
+from products.services import autocomplete_services
+from products.services.autocomplete_services import autocomplete, rebuild_index, update_index
+from products.services.category_services import update_category_paths
+from products.services.popularity_services import WATERMARKS_CACHE_KEY, update_popularity
+from products.services.search_services import search_products
+from products.services.tag_services import get_top_tags, invalidate_tags_leaderboard, update_tags_leaderboard
+from profiles.models import UserProductHistory
+from shops.models import Offer, Shop
+
+User = get_user_model()
+
 
 class ReviewsTestCase(TestCase):
     # in progress
     pass
+
+
+class PopularityServicesTestCase(TestCase):
+    """Тесты расчета популярности товаров"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username="test_popularity_user", email="popularity@mail.com")
+        cls.shop = Shop.objects.create(user=cls.user, name="магазин")
+        manufacturer = Manufacturer.objects.create(name="производитель")
+        category = Category.objects.create(name="категория")
+        cls.products = [
+            Product.objects.create(name="товар %d" % i, manufacturer=manufacturer, category=category) for i in range(3)
+        ]
+        cls.offers = [Offer.objects.create(shop=cls.shop, product=p, price=100, remains=10) for p in cls.products]
+
+    def setUp(self):
+        cache.delete(WATERMARKS_CACHE_KEY)
+        order = Order.objects.create(user=self.user, address="адрес", total_price=200)
+        OrderDetail.objects.create(offer=self.offers[0], quantity=2, user_order=order)
+        for _ in range(3):
+            UserProductHistory.objects.create(user=self.user, product=self.products[1])
+        Review.objects.create(user=self.user, product=self.products[2], review_content="отзыв", is_published=True)
+        Review.objects.create(user=self.user, product=self.products[2], review_content="отзыв", is_published=False)
+
+    def get_popularity(self):
+        return list(
+            Product.objects.filter(pk__in=[p.pk for p in self.products])
+            .order_by("pk")
+            .values_list("popularity", flat=True)
+        )
+
+    def test_full_update(self):
+        self.assertEqual(update_popularity(), 3)
+        self.assertEqual(self.get_popularity(), [10, 3, 3])
+
+    def test_incremental_update(self):
+        update_popularity()
+        UserProductHistory.objects.create(user=self.user, product=self.products[2])
+
+        self.assertEqual(update_popularity(), 1)
+        self.assertEqual(self.get_popularity(), [10, 3, 4])
+
+    def test_full_update_resets_removed_activity(self):
+        update_popularity()
+        self.assertEqual(update_popularity(), 0)
+
+        Review.objects.filter(product=self.products[2]).update(is_published=False)
+        update_popularity(full=True)
+        self.assertEqual(self.get_popularity(), [10, 3, 0])
+
+
+class TagsLeaderboardTestCase(TestCase):
+    """Тесты рейтинга популярных тегов"""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create(username="test_tags_user", email="tags@mail.com")
+        shop = Shop.objects.create(user=user, name="магазин")
+        manufacturer = Manufacturer.objects.create(name="производитель")
+        category = Category.objects.create(name="категория")
+        cls.tags = [Tag.objects.create(name="тег %d" % i) for i in range(4)]
+        products = [
+            Product.objects.create(name="товар %d" % i, manufacturer=manufacturer, category=category) for i in range(3)
+        ]
+        for product in products:
+            product.tags.add(cls.tags[0])
+        products[0].tags.add(cls.tags[1])
+        products[1].tags.add(cls.tags[2])
+
+        order = Order.objects.create(user=user, address="адрес", total_price=100)
+        OrderDetail.objects.create(
+            offer=Offer.objects.create(shop=shop, product=products[0], price=100, remains=1),
+            quantity=1,
+            user_order=order,
+        )
+        for _ in range(7):
+            UserProductHistory.objects.create(user=user, product=products[1])
+
+    def setUp(self):
+        invalidate_tags_leaderboard()
+        self.always_eager = app.conf.task_always_eager
+        app.conf.task_always_eager = True
+
+    def tearDown(self):
+        app.conf.task_always_eager = self.always_eager
+
+    def test_tags_are_ranked_by_popularity(self):
+        self.assertEqual(update_tags_leaderboard(), 4)
+        # тег 0: 3 товара, 1 заказ, 7 просмотров; тег 2: 1 товар, 7 просмотров; тег 1: 1 товар, 1 заказ
+        self.assertEqual([tag.pk for tag in get_top_tags(3)], [self.tags[i].pk for i in (0, 2, 1)])
+
+    def test_top_tags_without_queries(self):
+        update_tags_leaderboard()
+
+        with self.assertNumQueries(0):
+            tags = get_top_tags(2)
+
+        self.assertEqual([tag.name for tag in tags], ["тег 0", "тег 2"])
+
+    def test_missing_leaderboard_is_not_built_on_request(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(get_top_tags(2), [])
+
+    def test_renamed_tag(self):
+        update_tags_leaderboard()
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.tags[0].name = "новое название"
+            self.tags[0].save()
+            # до фиксации и пересчета выводится прежний рейтинг
+            self.assertEqual(get_top_tags(1)[0].name, "тег 0")
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(get_top_tags(1)[0].name, "новое название")
+
+
+class ReviewCountTestCase(TestCase):
+    """Тесты количества отзывов товара"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username="test_review_user", email="review@mail.com")
+        manufacturer = Manufacturer.objects.create(name="производитель")
+        category = Category.objects.create(name="категория")
+        cls.product = Product.objects.create(name="товар", manufacturer=manufacturer, category=category)
+
+    def create_review(self, **kwargs):
+        return Review.objects.create(user=self.user, product=self.product, review_content="отзыв", **kwargs)
+
+    def test_review_count_follows_reviews(self):
+        review = self.create_review(is_published=True)
+        self.create_review(is_published=False)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.review_count, 1)
+
+        review.archived = True
+        review.save()
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.review_count, 0)
+
+        self.create_review(is_published=True).delete()
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.review_count, 0)
+
+    def test_admin_actions_update_review_count(self):
+        self.create_review(is_published=True)
+        self.create_review(is_published=True)
+
+        mark_archived_review(None, None, Review.objects.all())
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.review_count, 0)
+
+        mark_unarchived_review(None, None, Review.objects.all())
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.review_count, 2)
+
+    def test_backfill_command(self):
+        self.create_review(is_published=True)
+        Product.objects.update(review_count=0)
+
+        call_command("update_review_count", stdout=io.StringIO())
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.review_count, 1)
+
+
+class SearchServicesTestCase(TestCase):
+    """Тесты полнотекстового поиска товаров"""
+
+    @classmethod
+    def setUpTestData(cls):
+        manufacturer = Manufacturer.objects.create(name="производитель")
+        category = Category.objects.create(name="категория")
+        cls.phone = Product.objects.create(
+            name="Aceline Smartphone", about="Phones with large screens", manufacturer=manufacturer, category=category
+        )
+        cls.case = Product.objects.create(
+            name="Case", description="Fits smartphones and phones", manufacturer=manufacturer, category=category
+        )
+        cls.watch = Product.objects.create(name="Smart Watches", manufacturer=manufacturer, category=category)
+
+    def search(self, value):
+        return list(search_products(Product.objects.all(), value).order_by("-search_rank", "pk"))
+
+    def test_search_uses_stemming_and_ignores_case(self):
+        self.assertEqual(self.search("PHONE"), [self.phone, self.case])
+        self.assertEqual(self.search("watch"), [self.watch])
+
+    def test_name_ranks_above_description(self):
+        self.assertEqual(self.search("smartphone"), [self.phone, self.case])
+
+    def test_search_vector_updated_on_save(self):
+        self.watch.about = "Fitness tracker"
+        self.watch.save()
+
+        self.assertEqual(self.search("trackers"), [self.watch])
+
+    def test_russian_stemming(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SHOW server_encoding")
+            if cursor.fetchone()[0] != "UTF8":
+                self.skipTest("Кириллица не поддерживается кодировкой БД")
+
+        self.case.about = "Чехлы для телефонов"
+        self.case.save()
+
+        self.assertEqual(self.search("Телефон"), [self.case])
+
+
+class CategoryPathTestCase(TestCase):
+    """Тесты пересчета материализованных путей категорий"""
+
+    def test_update_category_paths(self):
+        parent = Category.objects.create(name="родитель")
+        child = Category.objects.create(name="потомок", parent=parent)
+        Category.objects.update(path="")
+
+        self.assertEqual(update_category_paths(), 2)
+        self.assertEqual(Category.objects.get(pk=child.pk).path, f"/{parent.pk}/{child.pk}/")
+        self.assertEqual(update_category_paths(), 0)
+
+
+class AutocompleteServicesTestCase(TestCase):
+    """Тесты индекса подсказок строки поиска"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.manufacturer = Manufacturer.objects.create(name="Apple")
+        cls.category = Category.objects.create(name="Смартфоны")
+        for name in ("Apple iPhone 15", "Apple iPhone 15 Pro Max", "Чехол для iPhone", "Ёлочная гирлянда"):
+            Product.objects.create(name=name, manufacturer=cls.manufacturer, category=cls.category)
+
+    def setUp(self):
+        cache.delete_many([autocomplete_services.INDEX_CACHE_KEY, autocomplete_services.VERSION_CACHE_KEY])
+
+    def labels(self, query, limit=10):
+        return [item["label"] for item in autocomplete(query, limit)]
+
+    def test_prefix_of_name_and_of_word(self):
+        self.assertEqual(self.labels("APP"), ["Apple", "Apple iPhone 15", "Apple iPhone 15 Pro Max"])
+        self.assertEqual(self.labels("iphone"), ["Apple iPhone 15", "Чехол для iPhone", "Apple iPhone 15 Pro Max"])
+        self.assertEqual(self.labels("елоч"), ["Ёлочная гирлянда"])
+        self.assertEqual(self.labels("а"), [])
+
+    def test_result_types_and_limit(self):
+        results = autocomplete("смарт")
+        self.assertEqual(
+            results, [{"type": "category", "label": "Смартфоны", "url": self.category.get_absolute_url()}]
+        )
+        self.assertEqual(len(autocomplete("apple", limit=2)), 2)
+
+    def test_incremental_update(self):
+        self.assertEqual(rebuild_index(), 6)
+        self.assertEqual(update_index(), 0)
+
+        Product.objects.create(name="iPad Air", manufacturer=self.manufacturer, category=self.category)
+        self.assertEqual(update_index(), 1)
+
+        self.assertEqual(self.labels("ipa"), ["iPad Air"])
+        self.assertEqual(len(cache.get(autocomplete_services.INDEX_CACHE_KEY)["items"]), 7)
+
+    def test_rebuilds_get_distinct_versions(self):
+        rebuild_index()
+        first = cache.get(autocomplete_services.INDEX_CACHE_KEY)["version"]
+        rebuild_index()
+
+        self.assertEqual(cache.get(autocomplete_services.INDEX_CACHE_KEY)["version"], first + 1)
+        self.assertEqual(cache.get(autocomplete_services.VERSION_CACHE_KEY), first + 1)
+
+    def test_index_is_loaded_once_per_version(self):
+        rebuild_index()
+        autocomplete("apple")
+
+        with mock.patch.object(autocomplete_services.cache, "get", wraps=cache.get) as cache_get:
+            autocomplete("apple")
+
+        self.assertEqual([c.args[0] for c in cache_get.call_args_list], [autocomplete_services.VERSION_CACHE_KEY])
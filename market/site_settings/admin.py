@@ -19,5 +19,6 @@ class SiteSettingsAdmin(admin.ModelAdmin):
         "paginate_by",
         "pagination_on_each_side",
         "pagination_on_ends",
+        "pagination_mode",
         "categories_list_cache_timeout",
     )
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("site_settings", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="sitesettings",
+            name="pagination_mode",
+            field=models.CharField(
+                choices=[("offset", "По номеру страницы"), ("keyset", "По ключу последнего товара")],
+                default="offset",
+                max_length=16,
+                verbose_name="Режим пагинации каталога",
+            ),
+        ),
+    ]
@@ -52,6 +52,13 @@ class SortDesc(models.TextChoices):
     OFF = "off", _("Выключена")
 
 
+class PaginationMode(models.TextChoices):
+    """Класс режимов пагинации каталога"""
+
+    OFFSET = "offset", _("По номеру страницы")
+    KEYSET = "keyset", _("По ключу последнего товара")
+
+
 class SiteSettings(SingletonModel):
     """Модель настроек сайта"""
 
@@ -98,6 +105,12 @@ class SiteSettings(SingletonModel):
         verbose_name=_("Пагинация по краям"),
         default=1,
     )
+    pagination_mode = models.CharField(
+        verbose_name=_("Режим пагинации каталога"),
+        choices=PaginationMode.choices,
+        default=PaginationMode.OFFSET,
+        max_length=16,
+    )
 
     # Cache
     categories_list_cache_timeout = models.PositiveIntegerField(